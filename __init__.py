@@ -1,3 +1,6 @@
+import fnmatch
+import os
+
 import bpy
 
 bl_info = {
@@ -11,13 +14,58 @@ bl_info = {
     "category": "Material"
 }
 
-from bpy.types import Panel, Operator, PropertyGroup
-from bpy.props import PointerProperty, FloatVectorProperty, StringProperty, CollectionProperty, BoolProperty, EnumProperty
+from bpy.types import Panel, Operator, PropertyGroup, UIList, OperatorFileListElement
+from bpy_extras.io_utils import ExportHelper, ImportHelper
+from bpy.props import PointerProperty, FloatProperty, FloatVectorProperty, StringProperty, CollectionProperty, BoolProperty, EnumProperty, IntProperty
+
+from . import atlas, importers, library, livelink, previews, quantize, registry, search, stats, storage, transfer
+from .gradient_core import Gradient, FalloffCurve
+
+log = stats.log
 
 # Property groups
+def _select_unlocked(item, collection, index_prop):
+    """Make the row just unlocked the list's active row, which the copy buttons use."""
+    if not item.active:
+        return
+    color_ramp_manager = item.id_data.color_ramp_manager
+    for i, other in enumerate(getattr(color_ramp_manager, collection)):
+        if other == item:
+            if getattr(color_ramp_manager, index_prop) != i:
+                setattr(color_ramp_manager, index_prop, i)
+            return
+
+
+def _get_tags(item):
+    node = registry.node_lookup.get(item.id_data.color_ramp_manager, item.material, item.name)
+    return node.get(search.TAGS_PROPERTY, "") if node else ""
+
+
+def _set_tags(item, kind, value):
+    """Store the tags on the node, so they travel with the category, and re-index the row."""
+    color_ramp_manager = item.id_data.color_ramp_manager
+    node = registry.node_lookup.get(color_ramp_manager, item.material, item.name)
+    if node is None or storage.is_linked(storage.get_category(color_ramp_manager, item.material)):
+        return
+    node[search.TAGS_PROPERTY] = ", ".join(search.parse_tags(value))
+    search.index.stale.add((kind, item.material, item.name))
+
+
 class RGBCurveItem(PropertyGroup):
+    def update_active(self, context):
+        _select_unlocked(self, "curve_list", "curve_index")
+
+    def get_tags(self):
+        return _get_tags(self)
+
+    def set_tags(self, value):
+        _set_tags(self, 'CURVE', value)
+
     name: StringProperty(name="Curve Name", default="")
-    active: BoolProperty(name="Active", default=False)
+    material: StringProperty(name="Category", default="")
+    active: BoolProperty(name="Active", default=False, update=update_active)
+    selected: BoolProperty(name="Selected", description="Include this curve in bulk operations", default=False)
+    tags: StringProperty(name="Tags", description="Comma separated words the search finds this curve by", get=get_tags, set=set_tags)
 
     @property
     def locked(self):
@@ -28,8 +76,20 @@ class RGBCurveItem(PropertyGroup):
         self.active = not value
 
 class ColorRampItem(PropertyGroup):
+    def update_active(self, context):
+        _select_unlocked(self, "ramp_list", "ramp_index")
+
+    def get_tags(self):
+        return _get_tags(self)
+
+    def set_tags(self, value):
+        _set_tags(self, 'RAMP', value)
+
     name: StringProperty(name="Ramp Name", default="")
-    active: BoolProperty(name="Active", default=False)
+    material: StringProperty(name="Category", default="")
+    active: BoolProperty(name="Active", default=False, update=update_active)
+    selected: BoolProperty(name="Selected", description="Include this gradient in bulk operations", default=False)
+    tags: StringProperty(name="Tags", description="Comma separated words the search finds this gradient by", get=get_tags, set=set_tags)
 
 from bpy.types import PropertyGroup
 from bpy.props import StringProperty, CollectionProperty, EnumProperty
@@ -41,76 +101,460 @@ def get_active_horcrux(context):
     return bpy.data.objects.get(horcrux_name)
 
 
+def new_color_ramp_node(node_tree, name, gradient):
+    """Add a ColorRamp node holding the gradient to a category node tree."""
+    if len(gradient) > transfer.MAX_RAMP_ELEMENTS:
+        gradient, _error = gradient.reduce(0.0)
+    color_ramp_node = node_tree.nodes.new(type='ShaderNodeValToRGB')
+    color_ramp_node.location = (0, 0)
+    color_ramp_node.name = name
+    gradient.to_color_ramp(color_ramp_node.color_ramp)
+    return color_ramp_node
+
+
+def new_rgb_curve_node(node_tree, name, curve):
+    """Add an RGB Curve node holding the falloff curve on its composite channel."""
+    rgb_curve_node = node_tree.nodes.new(type='ShaderNodeRGBCurve')
+    rgb_curve_node.location = (0, 0)
+    rgb_curve_node.name = name
+    curve.to_curve_map(rgb_curve_node.mapping.curves[3])
+    rgb_curve_node.mapping.update()
+    return rgb_curve_node
+
+
+def copy_category_node(node, node_tree):
+    """Add a copy of a ColorRamp or RGB Curve node to node_tree, every curve channel included.
+
+    The copy keeps the node name when node_tree has no node of that name yet,
+    and the search tags of the node.
+    """
+    if node.type == 'VALTORGB':
+        copy = new_color_ramp_node(node_tree, node.name, Gradient.from_color_ramp(node.color_ramp))
+    else:
+        copy = new_rgb_curve_node(node_tree, node.name, FalloffCurve.from_curve_map(node.mapping.curves[3]))
+        for channel in range(3):
+            FalloffCurve.from_curve_map(node.mapping.curves[channel]).to_curve_map(copy.mapping.curves[channel])
+        copy.mapping.update()
+    if search.TAGS_PROPERTY in node:
+        copy[search.TAGS_PROPERTY] = node[search.TAGS_PROPERTY]
+    return copy
+
+
+def add_unique_node(content_index, material, name, item, skip_duplicates=True):
+    """Add a Gradient or FalloffCurve to a category unless the same content is already stored.
+
+    Returns the new node, or None when it was skipped as a duplicate.
+    """
+    node_tree = storage.node_tree(material)
+    if isinstance(item, Gradient):
+        node = new_color_ramp_node(node_tree, name, item)
+    else:
+        node = new_rgb_curve_node(node_tree, name, item)
+
+    # Hash what the node actually stores, so the check matches the index exactly
+    content = registry.node_content_hash(node)
+    if skip_duplicates and content_index.find(content):
+        node_tree.nodes.remove(node)
+        return None
+    content_index.add(material.name, node.name, content)
+    return node
+
+
+def category_item_count(node_tree):
+    """Number of ColorRamp and RGB Curve nodes in a category node tree."""
+    return sum(1 for node in node_tree.nodes if node.type in {'VALTORGB', 'CURVE_RGB'})
+
+
+def iter_category_items(material):
+    """Yield (node name, Gradient or FalloffCurve) for every ramp and curve in a category."""
+    node_tree = storage.node_tree(material)
+    if not node_tree:
+        return
+    for node in node_tree.nodes:
+        if node.type == 'VALTORGB':
+            yield node.name, Gradient.from_color_ramp(node.color_ramp)
+        elif node.type == 'CURVE_RGB':
+            yield node.name, FalloffCurve.from_curve_map(node.mapping.curves[3])
+
+
+def _reconcile_collection(color_ramp_manager, kind, found):
+    """Make the gradient or falloff list hold exactly the (material, name) keys in found.
+
+    Entries that still match a node keep their position and active flag, the
+    list index stays on the selected row, and the search index follows the
+    entries added and removed; returns how many were added and removed.
+    """
+    collection, index_prop, _category = category_list(color_ramp_manager, kind)
+    selected_index = getattr(color_ramp_manager, index_prop)
+    legacy = {name: (material, name) for material, name in found}
+    kept = set()
+    stale = []
+    for index, item in enumerate(collection):
+        key = (item.material, item.name)
+        if not item.material and item.name in legacy:
+            # Entries saved before categories were tracked only know their name
+            key = legacy[item.name]
+            item.material = key[0]
+        if key in found and key not in kept:
+            kept.add(key)
+        else:
+            stale.append(index)
+    selected = get_list_selection(collection, selected_index)
+    selected_key = (selected.material, selected.name) if selected else None
+
+    for index in reversed(stale):
+        item = collection[index]
+        if (item.material, item.name) not in kept:
+            search.index.remove((kind, item.material, item.name))
+        collection.remove(index)
+
+    added = 0
+    for material, name in found:
+        if (material, name) not in kept:
+            new_item = collection.add()
+            new_item.name = name
+            new_item.material = material
+            search.index.add((kind, material, name))
+            added += 1
+
+    if stale or added:
+        # Rows above the selection went away, or the selection itself did
+        follow_selection(color_ramp_manager, kind, selected_key, selected_index - sum(1 for i in stale if i < selected_index))
+    return added, len(stale)
+
+
+def reconcile_node_lists(color_ramp_manager, categories):
+    """Sync ramp_list and curve_list with the category node trees in a single pass.
+
+    Returns a dict with the number of ramps and curves added and removed.
+    """
+    ramps = {}
+    curves = {}
+    for material in categories:
+        node_tree = storage.node_tree(material)
+        if not node_tree:
+            continue
+        for node in node_tree.nodes:
+            if node.type == 'VALTORGB':
+                ramps[(material.name, node.name)] = None
+            elif node.type == 'CURVE_RGB':
+                curves[(material.name, node.name)] = None
+
+    ramps_added, ramps_removed = _reconcile_collection(color_ramp_manager, 'RAMP', ramps)
+    curves_added, curves_removed = _reconcile_collection(color_ramp_manager, 'CURVE', curves)
+    return {
+        "ramps_added": ramps_added,
+        "ramps_removed": ramps_removed,
+        "curves_added": curves_added,
+        "curves_removed": curves_removed,
+    }
+
+
+def _activate_only(collection, index):
+    """Unlock the entry at index and lock every other entry of the list."""
+    for i, item in enumerate(collection):
+        active = i == index
+        if item.active != active:
+            item.active = active
+
+
+LIST_KINDS = [
+    ('RAMP', "Gradients", "Rows of the displayed gradient category"),
+    ('CURVE', "Falloffs", "Rows of the displayed falloff category"),
+]
+
+
+def category_list(color_ramp_manager, kind):
+    """(list, index property name, displayed category) of the gradient or falloff list."""
+    if kind == 'RAMP':
+        return color_ramp_manager.ramp_list, "ramp_index", color_ramp_manager.selected_material
+    return color_ramp_manager.curve_list, "curve_index", color_ramp_manager.selected_curve_material
+
+
+def follow_selection(color_ramp_manager, kind, key, fallback):
+    """Point the list index at the row holding key, or at fallback when that row is gone.
+
+    The index is clamped to the list. A row found again keeps its lock, which
+    moving the index alone would lift; a fallback row is unlocked like any
+    newly selected row.
+    """
+    collection, index_prop, _category = category_list(color_ramp_manager, kind)
+    item = get_list_selection(collection, fallback)
+    if key is not None and (item is None or (item.material, item.name) != key):
+        for i, other in enumerate(collection):
+            if (other.material, other.name) == key:
+                item, fallback = other, i
+                break
+    found = item is not None and (item.material, item.name) == key
+    index = max(min(fallback, len(collection) - 1), 0)
+    if not found:
+        # Assigned even when unchanged, so the row now under the index is unlocked
+        setattr(color_ramp_manager, index_prop, index)
+    elif getattr(color_ramp_manager, index_prop) != index:
+        active = item.active
+        setattr(color_ramp_manager, index_prop, index)
+        item.active = active
+
+
+def selected_list_indices(collection, category):
+    """Indices of the ticked rows of a category, or of its first unlocked row when none is ticked."""
+    indices = [i for i, item in enumerate(collection) if item.selected and item.material == category]
+    if not indices:
+        indices = [i for i, item in enumerate(collection) if item.active and item.material == category][:1]
+    return indices
+
+
+def report_linked(operator, category):
+    """Warn and return True when category is linked from the library file, and so read-only."""
+    if storage.is_linked(category):
+        operator.report({'WARNING'}, f"'{category.name}' is linked from the library file and cannot be edited.")
+        return True
+    return False
+
+
+def remove_list_items(color_ramp_manager, kind, indices):
+    """Delete the rows at indices of the gradient or falloff list and their nodes.
+
+    Makes one pass over each category node tree; returns the number of nodes removed.
+    """
+    collection = category_list(color_ramp_manager, kind)[0]
+    names_by_material = {}
+    for i in indices:
+        item = collection[i]
+        names_by_material.setdefault(item.material, set()).add(item.name)
+        search.index.remove((kind, item.material, item.name))
+
+    removed = 0
+    for material_name, names in names_by_material.items():
+        node_tree = storage.get_category_tree(color_ramp_manager, material_name)
+        if not node_tree:
+            continue
+        nodes = node_tree.nodes
+        for node in [node for node in nodes if node.name in names]:
+            nodes.remove(node)
+            removed += 1
+        registry.content_index.mark_dirty(material_name)
+        registry.node_lookup.invalidate(material_name)
+
+    for i in sorted(indices, reverse=True):
+        collection.remove(i)
+    return removed
+
+
+def describe_search_row(color_ramp_manager, key):
+    """(tags, dominant hues) of the node behind a search index row."""
+    kind, category, name = key
+    node = registry.node_lookup.get(color_ramp_manager, category, name)
+    if node is None:
+        return (), ()
+    tags = search.parse_tags(node.get(search.TAGS_PROPERTY, ""))
+    if kind != 'RAMP' or node.type != 'VALTORGB':
+        return tags, ()
+    colors = Gradient.from_color_ramp(node.color_ramp).sample(search.HUE_SAMPLES)
+    return tags, search.dominant_hues(colors)
+
+
+def search_list(color_ramp_manager, kind, text):
+    """(kind, category, name) -> score of the gradient or falloff rows matching text, in every category."""
+    collection = category_list(color_ramp_manager, kind)[0]
+    index = search.index
+    if index.count(kind) != len(collection):
+        # Rows came or went without passing the index, e.g. after undo: catch up from the list alone
+        listed = {(kind, item.material, item.name) for item in collection}
+        for key in [key for key in index.keys() if key[0] == kind and key not in listed]:
+            index.remove(key)
+        for key in listed.difference(index.keys()):
+            index.add(key)
+    index.refresh(lambda key: describe_search_row(color_ramp_manager, key))
+    return index.query(text, kind)
+
+
 class ColorRampManagerProperties(PropertyGroup):
     ramp_list: CollectionProperty(type=ColorRampItem)
     curve_list: CollectionProperty(type=RGBCurveItem)
+
+    def update_ramp_index(self, context):
+        _activate_only(self.ramp_list, self.ramp_index)
+        # A search hit from another category brings that category into the editor
+        ramp = get_list_selection(self.ramp_list, self.ramp_index)
+        if ramp and ramp.material != self.selected_material and storage.get_category(self, ramp.material):
+            self.selected_material = ramp.material
+        livelink.schedule()
+
+    def update_curve_index(self, context):
+        _activate_only(self.curve_list, self.curve_index)
+        curve = get_list_selection(self.curve_list, self.curve_index)
+        if curve and curve.material != self.selected_curve_material and storage.get_category(self, curve.material):
+            self.selected_curve_material = curve.material
+        livelink.schedule()
+
+    ramp_index: IntProperty(name="Selected Ramp", default=0, update=update_ramp_index)
+    curve_index: IntProperty(name="Selected Curve", default=0, update=update_curve_index)
+    list_rows: IntProperty(
+        name="Rows",
+        description="Number of gradient and falloff rows shown at once",
+        default=8,
+        min=3,
+        max=40,
+    )
+
+    def get_stats_enabled(self):
+        return stats.is_enabled()
+
+    def set_stats_enabled(self, value):
+        stats.set_enabled(value)
+
+    stats_enabled: BoolProperty(
+        name="Time Operators",
+        description="Record call counts and latency of the manager's operators and panel draw for this session",
+        get=get_stats_enabled,
+        set=set_stats_enabled,
+    )
+
+    # Enum get/set work with item numbers, the index into livelink.TARGETS
+    def get_live_link(self):
+        return livelink.TARGETS.index(livelink.target)
+
+    def set_live_link(self, value):
+        set_live_link(livelink.TARGETS[value])
+
+    live_link: EnumProperty(
+        name="Live Link",
+        description="Keep pushing the active gradient or falloff to the brush while it is edited, for this session",
+        items=[
+            ('OFF', "Off", "Copy to the brush only with the row buttons"),
+            ('GRADIENT', "Brush Gradient", "Push the active gradient to the brush gradient"),
+            ('FALLOFF', "Brush Falloff", "Push the active falloff to the brush falloff curve"),
+            ('CAVITY', "Cavity Mask", "Push the active falloff to the cavity mask curve"),
+        ],
+        get=get_live_link,
+        set=set_live_link,
+    )
+
+    reduce_gradient_stops: BoolProperty(
+        name="Reduce Stops",
+        description="Drop gradient stops that are not needed to stay within the color error when copying or importing",
+        default=True,
+    )
+    gradient_max_error: FloatProperty(
+        name="Color Error",
+        description="Largest per-channel color difference allowed when reducing gradient stops",
+        default=0.005,
+        min=0.0,
+        max=0.25,
+        precision=4,
+    )
+
+    curve_fit_mode: EnumProperty(
+        name="Curve Fit",
+        description="How curves are reduced before they are copied to a brush, cavity mask or RGB Curve",
+        items=[
+            ('SIMPLIFY', "Simplify", "Keep the fewest original points that stay within the tolerance"),
+            ('UNIFORM', "Uniform", "Resample to evenly spaced points"),
+            ('ADAPTIVE', "Adaptive", "Resample with more points where the curve bends"),
+        ],
+        default='SIMPLIFY',
+    )
+    curve_tolerance: FloatProperty(
+        name="Tolerance",
+        description="Largest allowed difference between the original and the simplified curve",
+        default=0.002,
+        min=0.0,
+        max=0.1,
+        precision=4,
+    )
+    curve_max_points: IntProperty(
+        name="Max Points",
+        description="Upper bound on the points of any curve written by the add-on",
+        default=16,
+        min=2,
+        max=64,
+    )
     material_name: StringProperty(name="Material Name", default="")
     curve_material_name: StringProperty(name="Curve Material Name", default="")
 
+    def update_storage_backend(self, context):
+        # Material and node group names may overlap, so nothing hashed so far carries over
+        registry.content_index.clear()
+        registry.node_lookup.clear()
+        self.update_materials(context)
+
+    storage_backend: EnumProperty(
+        name="Storage",
+        description="Where gradient and falloff categories are kept",
+        items=storage.BACKEND_ITEMS,
+        default=storage.MATERIAL,
+        update=update_storage_backend,
+    )
+
+    def update_library_filepath(self, context):
+        # The same path entered again still lists the file anew if it changed on disk
+        storage.refresh_library_listing(self)
+        self.update_materials(context)
+
+    library_filepath: StringProperty(
+        name="Library File",
+        description="Shared .blend whose categories are listed too, each linked read-only the first time it is displayed",
+        subtype='FILE_PATH',
+        default="",
+        update=update_library_filepath,
+    )
+
     def get_materials(self, context):
-        horcrux_object = bpy.data.objects.get(self.selected_horcrux)
-        if horcrux_object and horcrux_object.data.materials:
-            return [(mat.name, mat.name, "") for mat in horcrux_object.data.materials]
-        return []
+        return registry.category_enum_items(self)
+
+    def update_displayed_category(self, context):
+        # Categories of the library file are linked the first time they are displayed
+        changed = False
+        for name in (self.selected_material, self.selected_curve_material):
+            if not name or storage.get_category(self, name) is not None:
+                continue
+            if storage.link_category(self, name) is None:
+                log.warning("'%s' in the library file is not a gradient category, it is no longer listed", name)
+            changed = True
+        if changed:
+            self.update_materials(context)
 
     selected_material: EnumProperty(
         name="Material",
         description="Select Material",
         items=get_materials,
+        update=update_displayed_category,
     )
 
     selected_curve_material: EnumProperty(
         name="Curve Material",
         description="Select Curve Material",
         items=get_materials,
+        update=update_displayed_category,
     )
 
     def update_materials(self, context):
-        horcrux_object = bpy.data.objects.get(self.selected_horcrux)
+        changes = None
         
-        if horcrux_object:
-            # Clear existing lists
-            self.ramp_list.clear()
-            self.curve_list.clear()
-            
-            # Populate ramp_list and curve_list with the appropriate nodes
-            if horcrux_object.data.materials:
-                for material in horcrux_object.data.materials:
-                    node_tree = material.node_tree
-                    
-                    if node_tree:
-                        # Populate ramp_list with color ramps
-                        for node in node_tree.nodes:
-                            if node.type == 'VALTORGB':
-                                new_ramp = self.ramp_list.add()
-                                new_ramp.name = node.name
-                                new_ramp.active = False  # Default inactive
-
-                        # Populate curve_list with RGB curves
-                        for node in node_tree.nodes:
-                            if node.type == 'CURVE_RGB':
-                                new_curve = self.curve_list.add()
-                                new_curve.name = node.name
-                                new_curve.active = False  # Default inactive
+        if storage.has_categories(self):
+            # Add and remove only the list entries whose nodes changed
+            changes = reconcile_node_lists(self, storage.categories(self))
                                 
-            # Update the selected material and curve material properties only if there are materials
-            materials = [(mat.name, mat.name, "") for mat in horcrux_object.data.materials]
+            # Keep the displayed categories unless they no longer exist
+            materials = registry.category_enum_items(self)
             if materials:
-                self.selected_material = materials[0][0] if materials else ""
-                self.selected_curve_material = materials[0][0] if materials else ""
+                names = {item[0] for item in materials}
+                if self.selected_material not in names:
+                    self.selected_material = materials[0][0]
+                if self.selected_curve_material not in names:
+                    self.selected_curve_material = materials[0][0]
         
-        else:
-            # Avoid setting to None; reset to empty string if no horcrux is selected
-            self.selected_material = ""
-            self.selected_curve_material = ""
+        # Without a horcrux the category enums have no items and read back as ""
 
         # Force UI refresh
         if context.area:
             context.area.tag_redraw()
 
+        return changes
+
     def get_horcrux_objects(self, context):
-        objects = [(obj.name, obj.name, "") for obj in bpy.data.objects if "horcrux" in obj.name.lower() and obj.type == 'MESH']
-        return objects if objects else [("NONE", "No Horcrux Found", "")]
+        return registry.horcrux_enum_items()
 
     def update_material_selection(self, context):
         self.update_materials(context)
@@ -132,36 +576,44 @@ def copy_brush_gradient_to_color_ramp(context):
     color_ramp_manager = context.scene.color_ramp_manager
     
     if not brush or brush.color_type != 'GRADIENT':
-        print("No valid brush gradient found.")
+        log.debug("No valid brush gradient found.")
         return None
 
     # Retrieve the active color ramp node
     color_ramp_node = get_active_color_ramp(context)
     if not color_ramp_node:
-        print("No active color ramp found.")
+        log.debug("No active color ramp found.")
         return None
 
-    # Access the color ramp elements
+    # Copy the stops from the brush gradient to the color ramp in one bulk transfer
     color_ramp = color_ramp_node.color_ramp
-    brush_gradient = brush.gradient
+    gradient, _error = fit_gradient(color_ramp_manager, Gradient.from_color_ramp(brush.gradient))
+    gradient.to_color_ramp(color_ramp)
 
-    # Copy the points from the brush gradient to the color ramp
-    new_elements = [(elem.position, elem.color) for elem in brush_gradient.elements]
+    return color_ramp
 
-    # Ensure there are enough elements in the color ramp
-    while len(color_ramp.elements) < len(new_elements):
-        color_ramp.elements.new(0)
 
-    # Update the color ramp elements
-    for i, (pos, color) in enumerate(new_elements):
-        color_ramp.elements[i].position = pos
-        color_ramp.elements[i].color = color
+def fit_gradient(color_ramp_manager, gradient):
+    """Reduce a Gradient to at most 32 stops within the manager's color error.
 
-    # Remove extra elements from the color ramp if necessary
-    while len(color_ramp.elements) > len(new_elements):
-        color_ramp.elements.remove(color_ramp.elements[-1])
+    Returns (gradient, error). The gradient comes back untouched, with an
+    error of 0.0, when reducing would not drop a single stop.
+    """
+    reduce_stops = color_ramp_manager.reduce_gradient_stops
+    if not reduce_stops and len(gradient) <= transfer.MAX_RAMP_ELEMENTS:
+        return gradient, 0.0
+    reduced, error = gradient.reduce(color_ramp_manager.gradient_max_error if reduce_stops else 0.0)
+    if len(reduced) < len(gradient):
+        return reduced, error
+    return gradient, 0.0
 
-    return color_ramp
+
+def fit_curve(color_ramp_manager, curve):
+    """Reduce a FalloffCurve with the manager's curve fit settings before it gets written."""
+    mode = color_ramp_manager.curve_fit_mode
+    if mode == 'SIMPLIFY':
+        return curve.simplify(color_ramp_manager.curve_tolerance, color_ramp_manager.curve_max_points)
+    return curve.resample(color_ramp_manager.curve_max_points, adaptive=mode == 'ADAPTIVE')
 
 
 def copy_brush_falloff_to_rgb_curve(context):
@@ -169,71 +621,92 @@ def copy_brush_falloff_to_rgb_curve(context):
     color_ramp_manager = context.scene.color_ramp_manager
     
     if not brush or not hasattr(brush, 'curve'):
-        print("No valid brush falloff curve found.")
+        log.debug("No valid brush falloff curve found.")
         return None
 
-    rgb_curve_node = get_active_rgb_curve(color_ramp_manager.selected_horcrux, color_ramp_manager.selected_curve_material)
+    rgb_curve_node = get_active_rgb_curve(context)
     if not rgb_curve_node:
-        print("No active RGB curve found.")
+        log.debug("No active RGB curve found.")
         return None
 
-    brush_curve = brush.curve.curves[0]
-    rgb_curve = rgb_curve_node.mapping.curves[3]
-
-    # Copy the points from the brush falloff to the RGB curve
-    for point in brush_curve.points:
-        new_point = rgb_curve.points.new(point.location[0], point.location[1])
-
-    # Set handle types, if necessary
-    for point in rgb_curve.points:
-        point.handle_type = 'AUTO'
+    # Replace the RGB curve points with the fitted brush falloff
+    curve = fit_curve(color_ramp_manager, FalloffCurve.from_curve_map(brush.curve.curves[0]))
+    curve.to_curve_map(rgb_curve_node.mapping.curves[3])
 
     rgb_curve_node.mapping.update()
 
     return rgb_curve_node
 
 
-def get_active_color_ramp(context):
-    horcrux_object = get_active_horcrux(context)
-    if not horcrux_object:
-        return None
+def get_list_selection(collection, index):
+    """Return the list entry at index, or None when the index is out of range."""
+    if 0 <= index < len(collection):
+        return collection[index]
+    return None
+
 
-    material = horcrux_object.active_material
-    if not material or not material.use_nodes:
+def _get_selected_node(color_ramp_manager, collection, index, category, node_type):
+    # The selected row only counts while it is unlocked and its category is the displayed one, like in the panel
+    item = get_list_selection(collection, index)
+    if item is None or not item.active or item.material != category:
         return None
+    node = registry.node_lookup.get(color_ramp_manager, item.material, item.name)
+    return node if node and node.type == node_type else None
+
 
+def get_active_color_ramp(context):
+    """The ColorRamp node of the selected gradient row, or None while that row is locked."""
     color_ramp_manager = context.scene.color_ramp_manager
+    return _get_selected_node(
+        color_ramp_manager, color_ramp_manager.ramp_list, color_ramp_manager.ramp_index,
+        color_ramp_manager.selected_material, 'VALTORGB',
+    )
 
-    for ramp in color_ramp_manager.ramp_list:
-        if ramp.active:
-            node_tree = material.node_tree
-            if ramp.name in node_tree.nodes:
-                node = node_tree.nodes[ramp.name]
-                if node.type == 'VALTORGB':
-                    return node  # Return the ShaderNodeValToRGB node itself
 
-    return None
+def get_active_rgb_curve(context):
+    """The RGB Curve node of the selected falloff row, or None while that row is locked."""
+    color_ramp_manager = context.scene.color_ramp_manager
+    return _get_selected_node(
+        color_ramp_manager, color_ramp_manager.curve_list, color_ramp_manager.curve_index,
+        color_ramp_manager.selected_curve_material, 'CURVE_RGB',
+    )
 
 
-def get_active_rgb_curve(horcrux_name, selected_curve_material):
-    """Retrieve the active RGB curve node from the Horcrux object."""
-    obj = bpy.data.objects.get(horcrux_name) #line 153
-    if not obj:
-        return None
-    
-    # Assuming selected_curve_material is the name of a material
-    material = obj.material_slots.get(selected_curve_material).material if obj.material_slots else None
-    if not material:
-        return None
-    
-    # Assuming the RGB curve is within a specific node group
-    for node in material.node_tree.nodes:
-        if node.type == 'CURVE_RGB':
-            return node
-    
-    return None
+def live_link_source(context):
+    if livelink.target == 'GRADIENT':
+        return get_active_color_ramp(context)
+    return get_active_rgb_curve(context)
 
 
+def push_live_link(context, node):
+    """Write the linked ramp or curve to the live link target, like the row buttons do."""
+    color_ramp_manager = context.scene.color_ramp_manager
+    image_paint = context.scene.tool_settings.image_paint
+    brush = image_paint.brush
+    if livelink.target == 'GRADIENT':
+        if brush:
+            brush.color_type = 'GRADIENT'
+            gradient, _error = fit_gradient(color_ramp_manager, Gradient.from_color_ramp(node.color_ramp))
+            gradient.to_color_ramp(brush.gradient)
+    elif livelink.target == 'FALLOFF':
+        if brush:
+            brush.curve_preset = 'CUSTOM'
+            curve = fit_curve(color_ramp_manager, FalloffCurve.from_curve_map(node.mapping.curves[3]))
+            curve.to_curve_map(brush.curve.curves[0])
+            brush.curve.update()
+    elif livelink.target == 'CAVITY':
+        image_paint.use_cavity = True
+        curve = fit_curve(color_ramp_manager, FalloffCurve.from_curve_map(node.mapping.curves[3]))
+        FalloffCurve(curve.locations).to_curve_map(image_paint.cavity_curve.curves[0])
+        image_paint.cavity_curve.update()
+    log.debug("Live link pushed '%s' to %s", node.name, livelink.target)
+
+
+def set_live_link(link_target):
+    if link_target == 'OFF':
+        livelink.stop()
+    else:
+        livelink.start(link_target, live_link_source, push_live_link)
 
 
 def set_brush_palette(colors, color_ramp_node_name):
@@ -247,13 +720,8 @@ def set_brush_palette(colors, color_ramp_node_name):
     if not palette:
         palette = bpy.data.palettes.new(palette_name)
 
-    # Clear any existing colors in the palette
-    palette.colors.clear()
-
-    # Add the new colors to the palette
-    for color in colors:
-        palette_color = palette.colors.new()
-        palette_color.color = color[:3]
+    # Replace the palette colors with the new ones in one bulk transfer
+    transfer.write_palette(palette, colors)
     
     return palette_name
 
@@ -272,8 +740,7 @@ class G2C_OT_GetColorRampPalette(Operator):
             return {'CANCELLED'}
 
         # Extract colors from the color ramp within the ShaderNodeValToRGB node
-        color_ramp = color_ramp_node.color_ramp
-        colors = [element.color for element in color_ramp.elements]
+        _positions, colors = transfer.read_ramp(color_ramp_node.color_ramp)
         
         # Use the node's name for the palette
         color_ramp_node_name = color_ramp_node.name
@@ -287,6 +754,98 @@ class G2C_OT_GetColorRampPalette(Operator):
         return {'FINISHED'}
 
 
+class G2C_OT_extract_image_colors(Operator):
+    """Extract a Palette or Gradient from the Dominant Colors of an Image"""
+    bl_idname = "paint.extract_image_colors"
+    bl_label = "Extract Image Colors"
+    bl_description = "Find the colors that best stand for an image and store them as a palette, or as a new gradient in the displayed category"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    image_name: StringProperty(name="Image", description="Image to take the colors from")
+    target: EnumProperty(
+        name="Target",
+        items=[
+            ('PALETTE', "Palette", "Write the colors to a palette named after the image"),
+            ('RAMP', "Gradient", "Add the colors, darkest to lightest, as a gradient in the displayed gradient category"),
+        ],
+        default='PALETTE',
+    )
+    method: EnumProperty(name="Method", items=quantize.METHOD_ITEMS, default=quantize.KMEANS)
+    color_count: IntProperty(name="Colors", default=8, min=2, max=transfer.MAX_RAMP_ELEMENTS)
+    max_samples: IntProperty(
+        name="Samples",
+        description="Pixels clustered at most, larger images are randomly subsampled; 0 uses every pixel",
+        default=quantize.DEFAULT_MAX_SAMPLES,
+        min=0,
+    )
+    by_coverage: BoolProperty(
+        name="Space by Coverage",
+        description="Give each color a stretch of the gradient as wide as its share of the image",
+        default=False,
+    )
+
+    def invoke(self, context, event):
+        if not self.image_name:
+            # The image open in the Image Editor, else the texture paint canvas
+            image = getattr(context.space_data, "image", None) or context.tool_settings.image_paint.canvas
+            if image is not None:
+                self.image_name = image.name
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop_search(self, "image_name", bpy.data, "images")
+        layout.prop(self, "method")
+        row = layout.row(align=True)
+        row.prop(self, "color_count")
+        row.prop(self, "max_samples")
+        layout.prop(self, "target", expand=True)
+        if self.target == 'RAMP':
+            layout.prop(self, "by_coverage")
+
+    def execute(self, context):
+        image = bpy.data.images.get(self.image_name)
+        if image is None or not all(image.size):
+            self.report({'WARNING'}, "Choose an image with pixels to extract colors from.")
+            return {'CANCELLED'}
+
+        color_ramp_manager = context.scene.color_ramp_manager
+        if self.target == 'RAMP':
+            material = storage.get_category(color_ramp_manager, color_ramp_manager.selected_material)
+            node_tree = storage.node_tree(material)
+            if not node_tree:
+                self.report({'WARNING'}, "Select a gradient category first.")
+                return {'CANCELLED'}
+            if report_linked(self, material):
+                return {'CANCELLED'}
+
+        # One foreach_get for the whole image; byte images hold sRGB display values
+        colors, weights = quantize.extract_colors(
+            transfer.read_pixels(image), self.color_count, self.method, self.max_samples, is_linear=image.is_float,
+        )
+        if not len(colors):
+            self.report({'WARNING'}, f"'{image.name}' has no opaque pixels.")
+            return {'CANCELLED'}
+
+        if self.target == 'PALETTE':
+            palette_name = set_brush_palette(colors, image.name)
+            context.scene.color_ramp_palette.color_ramp_name = palette_name
+            self.report({'INFO'}, f"Palette '{palette_name}' set from {len(colors)} colors of '{image.name}'.")
+            return {'FINISHED'}
+
+        gradient = Gradient(quantize.stop_positions(weights, self.by_coverage), colors)
+        color_ramp_node = new_color_ramp_node(node_tree, f"{image.name}_Gradient", gradient)
+        new_ramp = color_ramp_manager.ramp_list.add()
+        new_ramp.name = color_ramp_node.name
+        new_ramp.material = material.name
+        search.index.add(('RAMP', material.name, new_ramp.name))
+        registry.content_index.mark_dirty(material.name)
+        color_ramp_manager.ramp_index = len(color_ramp_manager.ramp_list) - 1
+
+        self.report({'INFO'}, f"Added '{color_ramp_node.name}' with {len(colors)} colors of '{image.name}' to '{material.name}'.")
+        return {'FINISHED'}
+
+
 
 
 class G2C_OT_CopyRGBCurveToBrushFalloff(Operator):
@@ -297,11 +856,7 @@ class G2C_OT_CopyRGBCurveToBrushFalloff(Operator):
 
     def execute(self, context):
         color_ramp_manager = context.scene.color_ramp_manager
-        horcrux_name = color_ramp_manager.selected_horcrux
-        selected_curve_material = color_ramp_manager.selected_curve_material
-
-        
-        rgb_curve_node = get_active_rgb_curve(horcrux_name, selected_curve_material)
+        rgb_curve_node = get_active_rgb_curve(context)
         if not rgb_curve_node:
             self.report({'WARNING'}, "No active RGB Curve node found in the selected horcrux object.")
             return {'CANCELLED'}
@@ -318,19 +873,12 @@ class G2C_OT_CopyRGBCurveToBrushFalloff(Operator):
             return {'CANCELLED'}
 
         curve_mapping = brush.curve
-        curve = curve_mapping.curves[0]
-        composite_curve = rgb_curve_node.mapping.curves[3]
-
-        points_list = [(point.location[0], point.location[1]) for point in composite_curve.points]
-
-        while len(curve.points) < len(points_list):
-            curve.points.new(0, 0)
-
-        for i, (x, y) in enumerate(points_list):
-            curve.points[i].location = (x, y)
+        curve = fit_curve(color_ramp_manager, FalloffCurve.from_curve_map(rgb_curve_node.mapping.curves[3]))
+        curve.to_curve_map(curve_mapping.curves[0])
 
         curve_mapping.update()
-        context.area.tag_redraw()
+        if context.area:
+            context.area.tag_redraw()
 
         self.report({'INFO'}, "Copied RGB Curve to Brush Falloff Curve successfully.")
         return {'FINISHED'}
@@ -342,28 +890,21 @@ class G2C_OT_CopyRGBCurveToCavityMask(bpy.types.Operator):
     bl_label = "Copy RGB Curve to Cavity Mask"
     bl_description = "Copy the active RGB curve from the Horcrux object to the cavity mask"
 
-    def enable_cavity_masking(self):
-        bpy.context.scene.tool_settings.image_paint.use_cavity = True
-        print("Cavity masking enabled in image paint settings.")
-
-    def print_curve_points(self, label, curve):
-        print(f"{label} Points:")
-        for i, point in enumerate(curve.points):
-            print(f"  Point {i}: {point.location}")
+    def enable_cavity_masking(self, context):
+        context.scene.tool_settings.image_paint.use_cavity = True
 
     def copy_rgb_curve_to_cavity_mask(self, context):
-        obj = get_active_horcrux(context)
-        if not obj:
+        color_ramp_manager = context.scene.color_ramp_manager
+        if not storage.has_library(color_ramp_manager):
             self.report({'WARNING'}, "No Horcrux object found.")
             return {'CANCELLED'}
 
-        color_ramp_manager = context.scene.color_ramp_manager
-        rgb_curve_node = get_active_rgb_curve(obj.name, color_ramp_manager.selected_curve_material)
+        rgb_curve_node = get_active_rgb_curve(context)
         if not rgb_curve_node:
             self.report({'WARNING'}, "No active RGB Curve node found in the selected Horcrux object.")
             return {'CANCELLED'}
 
-        self.enable_cavity_masking()
+        self.enable_cavity_masking(context)
 
         cavity_curve = context.scene.tool_settings.image_paint.cavity_curve.curves[0]
         composite_curve = rgb_curve_node.mapping.curves[3]
@@ -376,33 +917,15 @@ class G2C_OT_CopyRGBCurveToCavityMask(bpy.types.Operator):
             self.report({'WARNING'}, "Cavity Curve has no points.")
             return {'CANCELLED'}
 
-        points_list = [(point.location[0], point.location[1]) for point in composite_curve.points]
-
-        self.print_curve_points("RGB Curve", composite_curve)
-
-        while len(cavity_curve.points) < len(points_list):
-            cavity_curve.points.new(0, 0)
-
-        self.print_curve_points("Cavity Curve Before Update", cavity_curve)
-
-        for i, (x, y) in enumerate(points_list):
-            cavity_curve.points[i].location = (x, y)
-
-        self.print_curve_points("Cavity Curve After Update", cavity_curve)
-
-        while len(cavity_curve.points) > len(points_list):
-            cavity_curve.points.remove(cavity_curve.points[-1])
-
-        self.print_curve_points("Cavity Curve After Removing Excess", cavity_curve)
-
-        for point in cavity_curve.points:
-            point.handle_type = 'AUTO'
+        # The cavity mask always gets AUTO handles
+        curve = fit_curve(color_ramp_manager, FalloffCurve.from_curve_map(composite_curve))
+        FalloffCurve(curve.locations).to_curve_map(cavity_curve)
 
         context.scene.tool_settings.image_paint.cavity_curve.update()
+        if context.area:
+            context.area.tag_redraw()
 
-        bpy.ops.wm.redraw_timer(type='DRAW_WIN_SWAP', iterations=1)
-
-        self.print_curve_points("Cavity Curve After Forcing Update", cavity_curve)
+        log.debug("Cavity mask set from '%s' with %d points", rgb_curve_node.name, len(cavity_curve.points))
         self.report({'INFO'}, "Copied RGB Curve to Cavity Mask Curve successfully.")
         return {'FINISHED'}
 
@@ -418,8 +941,8 @@ class G2C_OT_create_horcrux(Operator):
     
     @classmethod
     def poll(cls, context):
-        # Check if any object in the scene has 'horcrux' in its name
-        return not any("horcrux" in obj.name for obj in bpy.data.objects)
+        # Only offered while the file holds no horcrux yet
+        return not registry.has_horcrux()
 
     def execute(self, context):
         scene = context.scene
@@ -442,6 +965,7 @@ class G2C_OT_create_horcrux(Operator):
                 collection.objects.unlink(horcrux_object)
             new_collection.objects.link(horcrux_object)
             bpy.context.view_layer.objects.active = horcrux_object
+            registry.invalidate_horcruxes()
         else:
             # If a horcrux object already exists, manage its collections
             horcrux_object = bpy.data.objects["horcrux"]
@@ -450,8 +974,8 @@ class G2C_OT_create_horcrux(Operator):
             new_collection.objects.link(horcrux_object)
 
         # Dynamically assign materials
-        self.assign_material_to_object(horcrux_object, scene.color_ramp_manager.material_name)
-        self.assign_material_to_object(horcrux_object, scene.color_ramp_manager.curve_material_name)
+        self.assign_material_to_object(scene.color_ramp_manager, horcrux_object, scene.color_ramp_manager.material_name)
+        self.assign_material_to_object(scene.color_ramp_manager, horcrux_object, scene.color_ramp_manager.curve_material_name)
 
         # Update materials in the manager
         context.scene.color_ramp_manager.update_materials(context)
@@ -465,63 +989,342 @@ class G2C_OT_create_horcrux(Operator):
         self.report({'INFO'}, "Horcrux created successfully.")
         return {'FINISHED'}
 
-    def assign_material_to_object(self, obj, material_name):
+    def assign_material_to_object(self, color_ramp_manager, obj, material_name):
         """Helper function to assign a material to the object."""
         if material_name:
-            if material_name not in bpy.data.materials:
-                material = bpy.data.materials.new(name=material_name)
-                material.use_nodes = True
-            else:
-                material = bpy.data.materials[material_name]
-                material.use_nodes = True
-
-            if obj.data.materials:
-                if material not in obj.data.materials:
-                    obj.data.materials.append(material)
-                else:
-                    obj.data.materials[0] = material
-            else:
-                obj.data.materials.append(material)
+            storage.get_or_create_category(color_ramp_manager, material_name, obj, backend=storage.MATERIAL)
 
 
 class G2C_OT_add_material(Operator):
     """Add a New Material to the Horcrux to Act as a New Category of Curve or Colorramp"""
     bl_idname = "object.add_material"
     bl_label = "Add Material"
-    bl_description = "Add a new material to the horcrux object"
+    bl_description = "Add the named gradient and falloff categories to the horcrux object or as node groups"
 
     def execute(self, context):
         scene = context.scene
         color_ramp_manager = scene.color_ramp_manager
         horcrux_object = get_active_horcrux(context)
 
-        if horcrux_object:
-            # Add or get the ramp material and assign it to the horcrux object
-            self.assign_material_to_object(horcrux_object, color_ramp_manager.material_name) 
-            # Add or get the curve material and assign it to the horcrux object
-            self.assign_material_to_object(horcrux_object, color_ramp_manager.curve_material_name)
+        if storage.has_library(color_ramp_manager):
+            # Add or get the ramp category, on the horcrux object when it stores them
+            self.assign_material_to_object(color_ramp_manager, horcrux_object, color_ramp_manager.material_name) 
+            # Add or get the curve category
+            self.assign_material_to_object(color_ramp_manager, horcrux_object, color_ramp_manager.curve_material_name)
 
             # Update the materials in the color ramp manager
-            color_ramp_manager.update_materials(context)
+            changes = color_ramp_manager.update_materials(context)
+            if changes and any(changes.values()):
+                self.report({'INFO'}, "Ramps +{ramps_added}/-{ramps_removed}, curves +{curves_added}/-{curves_removed}".format(**changes))
 
         return {'FINISHED'}
 
-    def assign_material_to_object(self, obj, material_name):
-        """Helper function to assign a material to the object."""
+    def assign_material_to_object(self, color_ramp_manager, obj, material_name):
+        """Helper function to assign a category to the object."""
         if material_name:
-            # Check if the material already exists in bpy.data.materials
-            if material_name not in bpy.data.materials:
-                # Create the material if it doesn't exist
-                material = bpy.data.materials.new(name=material_name)
-                material.use_nodes = True
-            else:
-                # Get the existing material
-                material = bpy.data.materials[material_name]
-                material.use_nodes = True
+            storage.get_or_create_category(color_ramp_manager, material_name, obj)
+
+
+class G2C_OT_export_library(Operator, ExportHelper):
+    """Export Horcrux Gradient and Falloff Categories to a .g2c Library File"""
+    bl_idname = "material.export_gradient_library"
+    bl_label = "Export Gradient Library"
+    bl_description = "Write the ramps and curves of horcrux categories to a .g2c library file"
+
+    filename_ext = library.FILE_EXTENSION
+    filter_glob: StringProperty(default="*" + library.FILE_EXTENSION, options={'HIDDEN'})
+
+    scope: EnumProperty(
+        name="Categories",
+        items=[
+            ('DISPLAYED', "Displayed", "Export the displayed gradient and falloff categories"),
+            ('SELECTED', "Selected", "Export the ticked rows of the displayed categories"),
+            ('ALL', "All", "Export every category on the horcrux"),
+        ],
+        default='DISPLAYED',
+    )
+
+    def execute(self, context):
+        color_ramp_manager = context.scene.color_ramp_manager
+        if not storage.has_categories(color_ramp_manager):
+            self.report({'WARNING'}, "No Horcrux object found.")
+            return {'CANCELLED'}
+
+        if self.scope == 'ALL':
+            materials = storage.categories(color_ramp_manager)
+        else:
+            names = dict.fromkeys((color_ramp_manager.selected_material, color_ramp_manager.selected_curve_material))
+            materials = [storage.get_category(color_ramp_manager, name) for name in names]
+            materials = [mat for mat in materials if mat]
+
+        entries = [
+            (material.name, name, item)
+            for material in materials
+            for name, item in iter_category_items(material)
+        ]
+        if self.scope == 'SELECTED':
+            keys = set()
+            for kind in ('RAMP', 'CURVE'):
+                collection, _index_prop, category = category_list(color_ramp_manager, kind)
+                keys.update((category, collection[i].name) for i in selected_list_indices(collection, category))
+            entries = [entry for entry in entries if entry[:2] in keys]
+        try:
+            count = library.write_library(self.filepath, entries)
+        except OSError as error:
+            self.report({'ERROR'}, f"Could not write library: {error}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Exported {count} gradients and curves from {len(materials)} categories.")
+        return {'FINISHED'}
+
+
+class G2C_OT_import_library(Operator, ImportHelper):
+    """Import Categories from a .g2c Library File into the Horcrux"""
+    bl_idname = "material.import_gradient_library"
+    bl_label = "Import Gradient Library"
+    bl_description = "Add the ramps and curves of a .g2c library file to the horcrux, one category per material"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filename_ext = library.FILE_EXTENSION
+    filter_glob: StringProperty(default="*" + library.FILE_EXTENSION, options={'HIDDEN'})
+
+    category_filter: StringProperty(
+        name="Categories",
+        description="Comma separated names of the categories to import, leave empty to import all",
+        default="",
+    )
+    skip_duplicates: BoolProperty(
+        name="Skip Duplicates",
+        description="Do not import ramps and curves whose content is already stored on the horcrux",
+        default=True,
+    )
+
+    def execute(self, context):
+        color_ramp_manager = context.scene.color_ramp_manager
+        horcrux_object = get_active_horcrux(context)
+        if not storage.has_library(color_ramp_manager):
+            self.report({'WARNING'}, "No Horcrux object found.")
+            return {'CANCELLED'}
+
+        wanted = {name.strip() for name in self.category_filter.split(",") if name.strip()}
+        content_index = registry.category_content_index(color_ramp_manager)
+        imported = 0
+        skipped = 0
+        categories = 0
+        try:
+            with library.LibraryReader(self.filepath) as gradient_library:
+                for category in gradient_library.categories():
+                    if wanted and category not in wanted:
+                        continue
+                    material = storage.get_or_create_category(color_ramp_manager, category, horcrux_object)
+                    if report_linked(self, material):
+                        continue
+                    for entry in gradient_library.entries(category):
+                        item = gradient_library.load(entry)
+                        if entry["kind"] == library.GRADIENT:
+                            item, _error = fit_gradient(color_ramp_manager, item)
+                        else:
+                            item = fit_curve(color_ramp_manager, item)
+                        if add_unique_node(content_index, material, entry["name"], item, self.skip_duplicates):
+                            imported += 1
+                        else:
+                            skipped += 1
+                    categories += 1
+        except (OSError, ValueError, library.LibraryError) as error:
+            self.report({'ERROR'}, f"Could not read library: {error}")
+            return {'CANCELLED'}
+
+        # One reconcile for the whole import
+        color_ramp_manager.update_materials(context)
+
+        self.report({'INFO'}, f"Imported {imported} gradients and curves into {categories} categories, skipped {skipped} duplicates.")
+        return {'FINISHED'}
+
+
+class G2C_OT_import_gradients(Operator, ImportHelper):
+    """Import GIMP, Photoshop and cpt-city Gradients into the Displayed Gradient Category"""
+    bl_idname = "material.import_gradients"
+    bl_label = "Import Gradients"
+    bl_description = "Add every gradient of .ggr, .grd and .cpt files as Color Ramps in the displayed gradient category"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filter_glob: StringProperty(default=";".join("*" + ext for ext in importers.GRADIENT_EXTENSIONS), options={'HIDDEN'})
+    files: CollectionProperty(type=OperatorFileListElement, options={'HIDDEN', 'SKIP_SAVE'})
+    directory: StringProperty(subtype='DIR_PATH', options={'HIDDEN', 'SKIP_SAVE'})
+
+    skip_duplicates: BoolProperty(
+        name="Skip Duplicates",
+        description="Do not import gradients whose content is already stored on the horcrux",
+        default=True,
+    )
+
+    def execute(self, context):
+        color_ramp_manager = context.scene.color_ramp_manager
+        material = storage.get_category(color_ramp_manager, color_ramp_manager.selected_material)
+        if not storage.has_library(color_ramp_manager) or not storage.node_tree(material):
+            self.report({'WARNING'}, "Select a gradient category on the horcrux first.")
+            return {'CANCELLED'}
+        if report_linked(self, material):
+            return {'CANCELLED'}
+
+        paths = [os.path.join(self.directory, f.name) for f in self.files if f.name] or [self.filepath]
+        content_index = registry.category_content_index(color_ramp_manager)
+        imported = 0
+        skipped = 0
+        failed = []
+        for path in paths:
+            try:
+                # Gradients are streamed from the file and turned into nodes one at a time
+                for name, gradient in importers.read_gradients(path):
+                    gradient, _error = fit_gradient(color_ramp_manager, gradient)
+                    if add_unique_node(content_index, material, name, gradient, self.skip_duplicates):
+                        imported += 1
+                    else:
+                        skipped += 1
+            except (OSError, ValueError, importers.GradientFormatError) as error:
+                failed.append(f"{os.path.basename(path)}: {error}")
+
+        # One reconcile for the whole batch
+        color_ramp_manager.update_materials(context)
+
+        for message in failed:
+            self.report({'WARNING'}, message)
+        if not imported and not skipped:
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Imported {imported} gradients into '{material.name}', skipped {skipped} duplicates.")
+        return {'FINISHED'}
+
+
+class G2C_OT_dedupe_library(Operator):
+    """Remove Ramps and Curves whose Content Duplicates Another One on the Horcrux"""
+    bl_idname = "material.dedupe_gradient_library"
+    bl_label = "Remove Duplicates"
+    bl_description = "Keep one of each identical gradient or curve across the horcrux categories and delete the rest"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        color_ramp_manager = context.scene.color_ramp_manager
+        if not storage.has_library(color_ramp_manager):
+            self.report({'WARNING'}, "No Horcrux object found.")
+            return {'CANCELLED'}
+
+        content_index = registry.category_content_index(color_ramp_manager)
+        # The copy in the earliest category is the one that stays, linked categories cannot lose any
+        categories = storage.categories(color_ramp_manager)
+        order = {mat.name: i for i, mat in enumerate(categories)}
+        linked = {mat.name for mat in categories if storage.is_linked(mat)}
+        removed = 0
+        for keys in content_index.duplicate_groups():
+            keys.sort(key=lambda key: (key[0] not in linked, order.get(key[0], len(order)), key[1]))
+            for material_name, node_name in keys[1:]:
+                if material_name in linked:
+                    continue
+                node_tree = storage.get_category_tree(color_ramp_manager, material_name)
+                node = node_tree.nodes.get(node_name) if node_tree else None
+                if node:
+                    node_tree.nodes.remove(node)
+                    removed += 1
+                content_index.mark_dirty(material_name)
+                registry.node_lookup.invalidate(material_name)
+
+        color_ramp_manager.update_materials(context)
+
+        self.report({'INFO'}, f"Removed {removed} duplicate gradients and curves.")
+        return {'FINISHED'}
+
+
+class G2C_OT_refresh_library(Operator):
+    """List the Categories of the Library File Again"""
+    bl_idname = "material.refresh_gradient_library_file"
+    bl_label = "Refresh Library File"
+    bl_description = "List the categories of the library file again, after it was saved elsewhere"
+
+    def execute(self, context):
+        color_ramp_manager = context.scene.color_ramp_manager
+        if not storage.library_path(color_ramp_manager):
+            self.report({'WARNING'}, "No library file set.")
+            return {'CANCELLED'}
+
+        storage.refresh_library_listing(color_ramp_manager)
+        color_ramp_manager.update_materials(context)
+        count = len(storage.library_category_names(color_ramp_manager))
+        self.report({'INFO'}, f"Listed {count} categories from the library file.")
+        return {'FINISHED'}
+
+
+class G2C_OT_convert_storage(Operator):
+    """Copy Every Category to the Other Storage Backend and Switch to It"""
+    bl_idname = "material.convert_category_storage"
+    bl_label = "Convert Storage"
+    bl_description = "Copy every gradient and falloff category to the other storage backend and switch to it, the originals are kept"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        color_ramp_manager = context.scene.color_ramp_manager
+        if storage.uses_horcrux(color_ramp_manager):
+            backend = storage.NODE_GROUP
+        else:
+            backend = storage.MATERIAL
+        horcrux_object = get_active_horcrux(context)
+        if backend == storage.MATERIAL and not horcrux_object:
+            self.report({'WARNING'}, "Create or select a horcrux to hold the categories first.")
+            return {'CANCELLED'}
+
+        categories = storage.categories(color_ramp_manager)
+        copied = 0
+        for material in categories:
+            source_tree = storage.node_tree(material)
+            if not source_tree:
+                continue
+            target_tree = storage.node_tree(storage.get_or_create_category(color_ramp_manager, material.name, horcrux_object, backend))
+            existing = {node.name for node in target_tree.nodes}
+            for node in source_tree.nodes:
+                if node.type in {'VALTORGB', 'CURVE_RGB'} and node.name not in existing:
+                    copy_category_node(node, target_tree)
+                    copied += 1
+
+        displayed = (color_ramp_manager.selected_material, color_ramp_manager.selected_curve_material)
+        color_ramp_manager.storage_backend = backend
+        # Enum properties keep an item number, so the displayed categories are chosen again by name
+        names = {item[0] for item in registry.category_enum_items(color_ramp_manager)}
+        for prop, name in zip(("selected_material", "selected_curve_material"), displayed):
+            if name in names and getattr(color_ramp_manager, prop) != name:
+                setattr(color_ramp_manager, prop, name)
+
+        backend_name = dict((item[0], item[1]) for item in storage.BACKEND_ITEMS)[backend]
+        self.report({'INFO'}, f"Copied {copied} gradients and curves from {len(categories)} categories to {backend_name}.")
+        return {'FINISHED'}
+
+
+class G2C_OT_bake_gradient_atlas(Operator):
+    """Bake Every Color Ramp of the Displayed Gradient Category into One Image"""
+    bl_idname = "material.bake_gradient_atlas"
+    bl_label = "Bake Gradient Atlas"
+    bl_description = "Bake the color ramps of the displayed gradient category into one image, one row per ramp"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    width: IntProperty(
+        name="Width",
+        description="Samples per gradient row",
+        default=atlas.DEFAULT_WIDTH,
+        min=2,
+        max=4096,
+    )
+
+    def execute(self, context):
+        color_ramp_manager = context.scene.color_ramp_manager
+        material = storage.get_category(color_ramp_manager, color_ramp_manager.selected_material)
+        if not storage.node_tree(material):
+            self.report({'WARNING'}, "No gradient category selected.")
+            return {'CANCELLED'}
+
+        image, baked, total = atlas.bake_category_atlas(material, self.width)
+        if image is None:
+            self.report({'WARNING'}, f"'{material.name}' has no color ramps to bake.")
+            return {'CANCELLED'}
 
-            # Add the material to the object if it isn't already present
-            if material.name not in obj.data.materials:
-                obj.data.materials.append(material)
+        self.report({'INFO'}, f"Atlas '{image.name}': baked {baked} of {total} rows.")
+        return {'FINISHED'}
 
 
 class G2C_OT_add_color_ramp(Operator):
@@ -533,19 +1336,23 @@ class G2C_OT_add_color_ramp(Operator):
     def execute(self, context):
         scene = context.scene
         color_ramp_manager = scene.color_ramp_manager
-        horcrux_object = get_active_horcrux(context)
+        material = storage.get_category(color_ramp_manager, color_ramp_manager.selected_material)
+        if report_linked(self, material):
+            return {'CANCELLED'}
 
-        if horcrux_object and horcrux_object.data.materials:
-            material = bpy.data.materials.get(color_ramp_manager.selected_material)
+        if storage.has_library(color_ramp_manager) and material:
+            node_tree = storage.node_tree(material)
 
-            if material and material.use_nodes:
-                node_tree = material.node_tree
+            if node_tree:
                 color_ramp_node = node_tree.nodes.new(type='ShaderNodeValToRGB')
                 color_ramp_node.location = (0, 0)
-                color_ramp_node.name = f"{material.name}_Gradient {len(node_tree.nodes) - 2}"
+                color_ramp_node.name = f"{material.name}_Gradient {category_item_count(node_tree)}"
 
                 new_ramp = color_ramp_manager.ramp_list.add()
                 new_ramp.name = color_ramp_node.name
+                new_ramp.material = material.name
+                search.index.add(('RAMP', material.name, new_ramp.name))
+                color_ramp_manager.ramp_index = len(color_ramp_manager.ramp_list) - 1
 
         return {'FINISHED'}
 
@@ -558,105 +1365,210 @@ class G2C_OT_add_rgb_curve(Operator):
     def execute(self, context):
         scene = context.scene
         color_ramp_manager = scene.color_ramp_manager
-        horcrux_object = get_active_horcrux(context)
+        categories = storage.categories(color_ramp_manager)
 
-        if horcrux_object and horcrux_object.data.materials:
-            material = bpy.data.materials.get(color_ramp_manager.selected_curve_material)
+        if storage.has_library(color_ramp_manager) and categories:
+            material = storage.get_category(color_ramp_manager, color_ramp_manager.selected_curve_material)
             if not material:
                 self.report({'WARNING'}, "Selected curve material not found.")
                 return {'CANCELLED'}
+            if report_linked(self, material):
+                return {'CANCELLED'}
 
-            print(f"Using material: {material.name}")
-
-            if material.use_nodes:
-                node_tree = material.node_tree
+            node_tree = storage.node_tree(material)
+            if node_tree:
                 rgb_curve_node = node_tree.nodes.new(type='ShaderNodeRGBCurve')
                 rgb_curve_node.location = (0, 0)
-                rgb_curve_node.name = f"{material.name}_Curve_{len(node_tree.nodes)-2}"
-                
-                print(f"Added RGB Curve node: {rgb_curve_node.name}")
+                rgb_curve_node.name = f"{material.name}_Curve_{category_item_count(node_tree)}"
+                log.debug("Added RGB Curve node '%s' to '%s'", rgb_curve_node.name, material.name)
 
                 new_curve = color_ramp_manager.curve_list.add()
                 new_curve.name = rgb_curve_node.name
-                new_curve.locked = True
-                new_curve.active = True
+                new_curve.material = material.name
+                search.index.add(('CURVE', material.name, new_curve.name))
+                # Selecting the new curve unlocks it and locks the others
+                color_ramp_manager.curve_index = len(color_ramp_manager.curve_list) - 1
 
-                for curve in color_ramp_manager.curve_list:
-                    if curve.name != new_curve.name:
-                        curve.active = False
+        return {'FINISHED'}
 
-                # Print updated node tree for debugging
-                print("Updated nodes in the material's node tree:")
-                for node in node_tree.nodes:
-                    print(f"Node: {node.name}, Type: {node.type}")
 
-        return {'FINISHED'}
+def remove_selected(operator, context, kind):
+    color_ramp_manager = context.scene.color_ramp_manager
+    if not storage.has_library(color_ramp_manager):
+        operator.report({'WARNING'}, "No Horcrux object found.")
+        return {'CANCELLED'}
+
+    collection, index_prop, category = category_list(color_ramp_manager, kind)
+    indices = selected_list_indices(collection, category)
+    if not indices:
+        operator.report({'WARNING'}, "Nothing selected to remove.")
+        return {'CANCELLED'}
+    if report_linked(operator, storage.get_category(color_ramp_manager, category)):
+        return {'CANCELLED'}
+
+    selected_index = getattr(color_ramp_manager, index_prop)
+    selected = get_list_selection(collection, selected_index)
+    selected_key = (selected.material, selected.name) if selected else None
+    removed = remove_list_items(color_ramp_manager, kind, indices)
+    # Rows removed above the selection move it up by as many
+    follow_selection(color_ramp_manager, kind, selected_key, selected_index - sum(1 for i in indices if i < selected_index))
+
+    operator.report({'INFO'}, f"Removed {removed} of {len(indices)} selected from '{category}'.")
+    return {'FINISHED'}
+
 
 
 class G2C_OT_remove_color_ramp(Operator):
-    """Remove the Active Color Ramp specified via the Unlock Icon"""
+    """Remove the Ticked Color Ramps, or the One Specified via the Unlock Icon"""
     bl_idname = "material.remove_color_ramp"
     bl_label = "Remove Color Ramp"
-    bl_description = "Remove the selected Color Ramp node from the selected material"
+    bl_description = "Remove the ticked Color Ramp nodes, or the unlocked one, from the selected material"
+    bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        scene = context.scene
-        color_ramp_manager = scene.color_ramp_manager
-        horcrux_object = get_active_horcrux(context)
-        ramp_list = color_ramp_manager.ramp_list
+        return remove_selected(self, context, 'RAMP')
 
-        if horcrux_object and horcrux_object.data.materials:
-            material = bpy.data.materials.get(color_ramp_manager.selected_material)
+class G2C_OT_remove_rgb_curve(Operator):
+    """Remove the Ticked RGB Curves, or the One Specified via the Unlock Icon"""
+    bl_idname = "material.remove_rgb_curve"
+    bl_label = "Remove RGB Curve"
+    bl_description = "Remove the ticked RGB Curve nodes, or the unlocked one, from the selected curve material"
+    bl_options = {'REGISTER', 'UNDO'}
 
-            if material and material.use_nodes:
-                node_tree = material.node_tree
+    def execute(self, context):
+        return remove_selected(self, context, 'CURVE')
+
+
+class G2C_OT_select_category_items(Operator):
+    """Tick or Untick the Rows of the Displayed Category"""
+    bl_idname = "material.select_category_items"
+    bl_label = "Select Category Items"
+    bl_description = "Tick every row of the displayed category, or untick them when some are ticked already"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    kind: EnumProperty(name="List", items=LIST_KINDS, default='RAMP')
+    action: EnumProperty(
+        name="Action",
+        items=[
+            ('TOGGLE', "Toggle", "Untick all when any row is ticked, tick all otherwise"),
+            ('SELECT', "Select All", "Tick every row"),
+            ('DESELECT', "Deselect All", "Untick every row"),
+            ('INVERT', "Invert", "Flip the tick of every row"),
+        ],
+        default='TOGGLE',
+    )
 
-                active_ramp = None
-                for ramp in ramp_list:
-                    if ramp.active:
-                        active_ramp = ramp
-                        break
+    def execute(self, context):
+        collection, _index_prop, category = category_list(context.scene.color_ramp_manager, self.kind)
+        items = [item for item in collection if item.material == category]
+        action = self.action
+        if action == 'TOGGLE':
+            action = 'DESELECT' if any(item.selected for item in items) else 'SELECT'
+        for item in items:
+            selected = not item.selected if action == 'INVERT' else action == 'SELECT'
+            if item.selected != selected:
+                item.selected = selected
+        return {'FINISHED'}
 
-                if active_ramp and active_ramp.name in node_tree.nodes:
-                    node_tree.nodes.remove(node_tree.nodes[active_ramp.name])
-                    ramp_list.remove(ramp_list.find(active_ramp.name))
 
-        return {'FINISHED'}
+class G2C_OT_duplicate_category_items(Operator):
+    """Duplicate the Ticked Rows of the Displayed Category"""
+    bl_idname = "material.duplicate_category_items"
+    bl_label = "Duplicate Category Items"
+    bl_description = "Copy the ticked gradients or curves, or the unlocked one, within their category"
+    bl_options = {'REGISTER', 'UNDO'}
 
-class G2C_OT_remove_rgb_curve(Operator):
-    """Remove the Active RGB Curve specified via the Unlock Icon"""
-    bl_idname = "material.remove_rgb_curve"
-    bl_label = "Remove RGB Curve"
-    bl_description = "Remove the selected RGB Curve node from the selected curve material"
+    kind: EnumProperty(name="List", items=LIST_KINDS, default='RAMP')
 
     def execute(self, context):
-        scene = context.scene
-        color_ramp_manager = scene.color_ramp_manager
-        horcrux_object = get_active_horcrux(context)
-        curve_list = color_ramp_manager.curve_list
+        color_ramp_manager = context.scene.color_ramp_manager
+        collection, _index_prop, category = category_list(color_ramp_manager, self.kind)
+        material = storage.get_category(color_ramp_manager, category)
+        node_tree = storage.node_tree(material)
+        indices = selected_list_indices(collection, category)
+        if not node_tree or not indices:
+            self.report({'WARNING'}, "Nothing selected to duplicate.")
+            return {'CANCELLED'}
+        if report_linked(self, material):
+            return {'CANCELLED'}
 
-        if horcrux_object and horcrux_object.data.materials:
-            material = bpy.data.materials.get(color_ramp_manager.selected_curve_material)
+        # One pass over the node tree, the copies then become the ticked rows
+        nodes = {node.name: node for node in node_tree.nodes}
+        copied = 0
+        for i in indices:
+            item = collection[i]
+            node = nodes.get(item.name)
+            if node is None:
+                continue
+            copy = copy_category_node(node, node_tree)
+            item.selected = False
+            new_item = collection.add()
+            new_item.name = copy.name
+            new_item.material = material.name
+            new_item.selected = True
+            search.index.add((self.kind, material.name, copy.name))
+            copied += 1
+        registry.content_index.mark_dirty(material.name)
+
+        self.report({'INFO'}, f"Duplicated {copied} in '{material.name}'.")
+        return {'FINISHED'}
 
-            if material and material.use_nodes:
-                node_tree = material.node_tree
 
-                active_curve = None
-                for curve in curve_list:
-                    if curve.active:
-                        active_curve = curve
-                        break
+class G2C_OT_move_category_items(Operator):
+    """Move the Ticked Rows of the Displayed Category to Another Category"""
+    bl_idname = "material.move_category_items"
+    bl_label = "Move to Category"
+    bl_description = "Move the ticked gradients or curves, or the unlocked one, to another horcrux category"
+    bl_options = {'REGISTER', 'UNDO'}
 
-                if active_curve:
-                    if active_curve.name in node_tree.nodes:
-                        node_tree.nodes.remove(node_tree.nodes[active_curve.name])
-                        curve_list.remove(curve_list.find(active_curve.name))
-                        self.report({'INFO'}, f"Removed RGB Curve: {active_curve.name}")
-                    else:
-                        self.report({'WARNING'}, "Active RGB Curve node not found in node tree.")
-                else:
-                    self.report({'WARNING'}, "No active RGB Curve to remove.")
+    kind: EnumProperty(name="List", items=LIST_KINDS, default='RAMP')
 
+    def get_categories(self, context):
+        return registry.category_enum_items(context.scene.color_ramp_manager)
+
+    category: EnumProperty(name="Category", description="Category to move to", items=get_categories)
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        color_ramp_manager = context.scene.color_ramp_manager
+        collection, _index_prop, category = category_list(color_ramp_manager, self.kind)
+        source = storage.get_category(color_ramp_manager, category)
+        target = storage.get_category(color_ramp_manager, self.category)
+        source_tree = storage.node_tree(source)
+        target_tree = storage.node_tree(target)
+        indices = selected_list_indices(collection, category)
+        if not source_tree or not indices:
+            self.report({'WARNING'}, "Nothing selected to move.")
+            return {'CANCELLED'}
+        if not target_tree or target == source:
+            self.report({'WARNING'}, "Choose another category to move to.")
+            return {'CANCELLED'}
+        if report_linked(self, source) or report_linked(self, target):
+            return {'CANCELLED'}
+
+        # Nodes cannot change node tree: copy each into the target, then drop the originals in one pass
+        nodes = {node.name: node for node in source_tree.nodes}
+        moved = set()
+        for i in indices:
+            item = collection[i]
+            node = nodes.get(item.name)
+            if node is None:
+                continue
+            copy = copy_category_node(node, target_tree)
+            moved.add(node.name)
+            search.index.remove((self.kind, item.material, item.name))
+            item.name = copy.name
+            item.material = target.name
+            search.index.add((self.kind, target.name, copy.name))
+        for node in [node for node in source_tree.nodes if node.name in moved]:
+            source_tree.nodes.remove(node)
+        registry.content_index.mark_dirty(source.name)
+        registry.content_index.mark_dirty(target.name)
+        registry.node_lookup.invalidate(source.name)
+
+        self.report({'INFO'}, f"Moved {len(moved)} from '{source.name}' to '{target.name}'.")
         return {'FINISHED'}
 
 class G2C_OT_copy_color_ramp_to_brush(Operator):
@@ -674,22 +1586,10 @@ class G2C_OT_copy_color_ramp_to_brush(Operator):
 
         if brush and color_ramp_node:
             brush.color_type = 'GRADIENT'
-            brush_gradient = brush.gradient
-
-            # Correctly access the elements through the color_ramp property
-            new_elements = [(elem.position, elem.color) for elem in color_ramp_node.color_ramp.elements]
-
-            while len(brush_gradient.elements) < len(new_elements):
-                brush_gradient.elements.new(position=0)
-
-            for i, (pos, color) in enumerate(new_elements):
-                brush_gradient.elements[i].position = pos
-                brush_gradient.elements[i].color = color
+            gradient, error = fit_gradient(context.scene.color_ramp_manager, Gradient.from_color_ramp(color_ramp_node.color_ramp))
+            gradient.to_color_ramp(brush.gradient)
 
-            while len(brush_gradient.elements) > len(new_elements):
-                brush_gradient.elements.remove(brush_gradient.elements[-1])
-
-            self.report({'INFO'}, "Color ramp copied to brush gradient.")
+            self.report({'INFO'}, f"Color ramp copied to brush gradient ({len(gradient)} stops, max error {error:.4f}).")
         else:
             if not color_ramp_node:
                 self.report({'WARNING'}, "Active color ramp not found.")
@@ -699,16 +1599,86 @@ class G2C_OT_copy_color_ramp_to_brush(Operator):
         return {'FINISHED'}
 
 
+class G2C_OT_bake_perceptual_gradient(Operator):
+    """Re-blend the Active Color Ramp in OKLab or OKLCh and Bake it Back to Minimal RGB Stops"""
+    bl_idname = "material.bake_perceptual_gradient"
+    bl_label = "Bake Perceptual Gradient"
+    bl_description = "Blend the active color ramp's stops perceptually and write the fewest RGB stops that reproduce it"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    space: EnumProperty(
+        name="Space",
+        items=[
+            ('OKLAB', "OKLab", "Blend straight through OKLab, even lightness steps"),
+            ('OKLCH', "OKLCh", "Blend lightness, chroma and hue, keeps colors saturated"),
+        ],
+        default='OKLAB',
+    )
+    target: EnumProperty(
+        name="Target",
+        items=[
+            ('NODE', "Color Ramp", "Replace the stops of the active color ramp"),
+            ('BRUSH', "Brush", "Write the result to the active brush gradient"),
+        ],
+        default='NODE',
+    )
+
+    def execute(self, context):
+        color_ramp_node = get_active_color_ramp(context)
+        if not color_ramp_node:
+            self.report({'WARNING'}, "No active Color Ramp found in the selected horcrux object.")
+            return {'CANCELLED'}
+
+        if self.target == 'BRUSH':
+            brush = context.tool_settings.image_paint.brush
+            if not brush:
+                self.report({'WARNING'}, "No active brush found.")
+                return {'CANCELLED'}
+            brush.color_type = 'GRADIENT'
+            color_ramp = brush.gradient
+        else:
+            color_ramp_manager = context.scene.color_ramp_manager
+            if report_linked(self, storage.get_category(color_ramp_manager, color_ramp_manager.selected_material)):
+                return {'CANCELLED'}
+            color_ramp = color_ramp_node.color_ramp
+
+        source = Gradient.from_color_ramp(color_ramp_node.color_ramp)
+        dense = source.perceptual(self.space)
+        # Never bake to more stops than the ramp already has
+        gradient, error = dense.reduce(context.scene.color_ramp_manager.gradient_max_error, max_stops=len(source))
+        if len(gradient) >= len(source):
+            if self.target == 'BRUSH':
+                source.to_color_ramp(color_ramp)
+            self.report({'INFO'}, f"The {self.space} bake needs all {len(source)} stops, kept the original gradient.")
+            return {'FINISHED'}
+        gradient.to_color_ramp(color_ramp)
+
+        self.report({'INFO'}, f"Baked {self.space} gradient with {len(gradient)} stops, max error {error:.4f}.")
+        return {'FINISHED'}
+
+
 class G2C_OT_CopyBrushGradientToColorRamp(Operator):
     """Copy Brush Gradient to Color Ramp Node"""
     bl_idname = "paint.copy_brush_gradient_to_color_ramp"
     bl_label = "Copy Brush Gradient to Color Ramp"
     
     def execute(self, context):
+        color_ramp_manager = context.scene.color_ramp_manager
+        if report_linked(self, storage.get_category(color_ramp_manager, color_ramp_manager.selected_material)):
+            return {'CANCELLED'}
         color_ramp_node = copy_brush_gradient_to_color_ramp(context)
         if not color_ramp_node:
             self.report({'WARNING'}, "Failed to copy brush gradient to color ramp.")
             return {'CANCELLED'}
+
+        # Point out when the same gradient is already stored elsewhere
+        node = get_active_color_ramp(context)
+        if node and storage.has_library(color_ramp_manager):
+            content_index = registry.category_content_index(color_ramp_manager)
+            others = [key for key in content_index.find(registry.node_content_hash(node)) if key[1] != node.name]
+            if others:
+                self.report({'INFO'}, f"Brush gradient copied; identical to '{others[0][1]}' in '{others[0][0]}'.")
+                return {'FINISHED'}
         
         self.report({'INFO'}, "Brush gradient copied to color ramp node successfully.")
         return {'FINISHED'}
@@ -720,6 +1690,9 @@ class G2C_OT_CopyBrushFalloffToRGBCurve(Operator):
     bl_label = "Copy Brush Falloff to RGB Curve"
     
     def execute(self, context):
+        color_ramp_manager = context.scene.color_ramp_manager
+        if report_linked(self, storage.get_category(color_ramp_manager, color_ramp_manager.selected_curve_material)):
+            return {'CANCELLED'}
         rgb_curve_node = copy_brush_falloff_to_rgb_curve(context)
         if not rgb_curve_node:
             self.report({'WARNING'}, "Failed to copy brush falloff to RGB curve.")
@@ -729,6 +1702,179 @@ class G2C_OT_CopyBrushFalloffToRGBCurve(Operator):
         return {'FINISHED'}
 
 
+def matching_brushes(brushes, brush_filter, name_pattern="", tool=""):
+    """Texture paint brushes picked by the batch apply filter."""
+    paint_brushes = [brush for brush in brushes if getattr(brush, "use_paint_image", True)]
+    if brush_filter == 'PATTERN':
+        pattern = name_pattern.lower()
+        return [brush for brush in paint_brushes if fnmatch.fnmatchcase(brush.name.lower(), pattern)]
+    if brush_filter == 'TOOL':
+        return [brush for brush in paint_brushes if getattr(brush, "image_tool", None) == tool]
+    return paint_brushes
+
+
+class G2C_OT_apply_to_brushes(Operator):
+    """Apply the Active Color Ramp or RGB Curve to Many Brushes at Once"""
+    bl_idname = "paint.apply_to_brushes"
+    bl_label = "Apply to Brushes"
+    bl_description = "Copy the active color ramp or RGB curve to every texture paint brush that matches the filter"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    source: EnumProperty(
+        name="Source",
+        items=[
+            ('GRADIENT', "Gradient", "Write the active color ramp to the brush gradients"),
+            ('FALLOFF', "Falloff", "Write the active RGB curve to the brush falloff curves"),
+        ],
+        default='GRADIENT',
+    )
+    brush_filter: EnumProperty(
+        name="Brushes",
+        items=[
+            ('ALL', "All Texture Paint", "Every brush used in texture paint mode"),
+            ('PATTERN', "Name Pattern", "Brushes whose name matches a pattern like 'Studio*'"),
+            ('TOOL', "Tool", "Brushes of one texture paint tool"),
+        ],
+        default='ALL',
+    )
+    name_pattern: StringProperty(
+        name="Pattern",
+        description="Brush name pattern, * matches anything, case is ignored",
+        default="*",
+    )
+    tool: EnumProperty(
+        name="Tool",
+        items=[
+            ('DRAW', "Draw", ""),
+            ('SOFTEN', "Soften", ""),
+            ('SMEAR', "Smear", ""),
+            ('CLONE', "Clone", ""),
+            ('FILL', "Fill", ""),
+            ('MASK', "Mask", ""),
+        ],
+        default='DRAW',
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "source")
+        layout.prop(self, "brush_filter")
+        if self.brush_filter == 'PATTERN':
+            layout.prop(self, "name_pattern")
+        elif self.brush_filter == 'TOOL':
+            layout.prop(self, "tool")
+        count = len(matching_brushes(bpy.data.brushes, self.brush_filter, self.name_pattern, self.tool))
+        layout.label(text=f"{count} brushes match", icon='BRUSH_DATA')
+
+    def execute(self, context):
+        color_ramp_manager = context.scene.color_ramp_manager
+        brushes = matching_brushes(bpy.data.brushes, self.brush_filter, self.name_pattern, self.tool)
+        if not brushes:
+            self.report({'WARNING'}, "No brushes match the filter.")
+            return {'CANCELLED'}
+
+        # Fit the source once, every brush gets the same stops or points
+        if self.source == 'GRADIENT':
+            color_ramp_node = get_active_color_ramp(context)
+            if not color_ramp_node:
+                self.report({'WARNING'}, "No active Color Ramp found in the selected horcrux object.")
+                return {'CANCELLED'}
+            gradient, _error = fit_gradient(color_ramp_manager, Gradient.from_color_ramp(color_ramp_node.color_ramp))
+            for brush in brushes:
+                brush.color_type = 'GRADIENT'
+                gradient.to_color_ramp(brush.gradient)
+            source_name = color_ramp_node.name
+        else:
+            rgb_curve_node = get_active_rgb_curve(context)
+            if not rgb_curve_node:
+                self.report({'WARNING'}, "No active RGB Curve node found in the selected horcrux object.")
+                return {'CANCELLED'}
+            curve = fit_curve(color_ramp_manager, FalloffCurve.from_curve_map(rgb_curve_node.mapping.curves[3]))
+            for brush in brushes:
+                brush.curve_preset = 'CUSTOM'
+                curve.to_curve_map(brush.curve.curves[0])
+                brush.curve.update()
+            source_name = rgb_curve_node.name
+
+        self.report({'INFO'}, f"Applied '{source_name}' to {len(brushes)} brushes.")
+        return {'FINISHED'}
+
+
+class G2C_UL_category_items(UIList):
+    """Rows of one horcrux category, or search hits across all categories"""
+    # Manager property holding the category shown by this list
+    category_prop = ""
+    # LIST_KINDS entry of the list, which rows of the search index it shows
+    kind = 'RAMP'
+    item_icon = 'NONE'
+
+    def preview_icon(self, context, item):
+        """icon_id of a baked preview for the item, 0 to use item_icon instead."""
+        return 0
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        icon_value = self.preview_icon(context, item)
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            row = layout.row(align=True)
+            row.prop(item, "selected", text="")
+            row.prop(item, "active", text="", emboss=False, icon='VIEW_UNLOCKED' if item.active else 'VIEW_LOCKED')
+            if icon_value:
+                row.label(text=item.name, icon_value=icon_value)
+            else:
+                row.label(text=item.name, icon=self.item_icon)
+        elif self.layout_type == 'GRID':
+            layout.alignment = 'CENTER'
+            if icon_value:
+                layout.label(text="", icon_value=icon_value)
+            else:
+                layout.label(text="", icon=self.item_icon)
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        helper = bpy.types.UI_UL_list
+
+        if self.filter_name:
+            # Search names, tags and hues of every category through the index, best matches first
+            scores = search_list(data, self.kind, self.filter_name)
+            keys = [(self.kind, item.material, item.name) for item in items]
+            flags = [self.bitflag_filter_item if key in scores else 0 for key in keys]
+            if self.use_filter_sort_alpha:
+                return flags, helper.sort_items_by_name(items, "name")
+            ranked = sorted(range(len(items)), key=lambda i: (-scores.get(keys[i], 0), keys[i][2]))
+            order = [0] * len(items)
+            for position, i in enumerate(ranked):
+                order[i] = position
+            return flags, order
+
+        # Without a search, show the displayed category only
+        category = getattr(data, self.category_prop)
+        flags = [self.bitflag_filter_item if item.material == category else 0 for item in items]
+        order = helper.sort_items_by_name(items, "name") if self.use_filter_sort_alpha else []
+        return flags, order
+
+
+class G2C_UL_color_ramps(G2C_UL_category_items):
+    """Color Ramps in the displayed gradient category"""
+    category_prop = "selected_material"
+    item_icon = 'NODE_TEXTURE'
+
+    def preview_icon(self, context, item):
+        node_tree = storage.get_category_tree(context.scene.color_ramp_manager, item.material)
+        node = node_tree.nodes.get(item.name) if node_tree else None
+        if node and node.type == 'VALTORGB':
+            return previews.ramp_icon(node.color_ramp)
+        return 0
+
+
+class G2C_UL_rgb_curves(G2C_UL_category_items):
+    """RGB Curves in the displayed falloff category"""
+    category_prop = "selected_curve_material"
+    kind = 'CURVE'
+    item_icon = 'RNDCURVE'
+
 
 class G2C_PT_horcrux_manager(Panel):
     """UI for the Gradient and Falloff Manager"""
@@ -742,23 +1888,29 @@ class G2C_PT_horcrux_manager(Panel):
         layout = self.layout
         color_ramp_manager = context.scene.color_ramp_manager
 
-        # Dropdown to select the horcrux object
-        layout = self.layout
-        split = layout.split(factor=0.5)
+        # Where the categories are kept
+        row = layout.row(align=True)
+        row.prop(color_ramp_manager, "storage_backend", text="")
+        row.operator(G2C_OT_convert_storage.bl_idname, text="", icon='FILE_REFRESH')
+        row = layout.row(align=True)
+        row.prop(color_ramp_manager, "library_filepath", text="", icon='LINK_BLEND')
+        row.operator(G2C_OT_refresh_library.bl_idname, text="", icon='FILE_REFRESH')
 
-        col = split.column()
-        col.label(text="Active Horcrux", icon='DOCUMENTS')
+        if storage.uses_horcrux(color_ramp_manager):
+            # Dropdown to select the horcrux object
+            layout = self.layout
+            split = layout.split(factor=0.5)
 
-        col = split.column()
-        col.prop(color_ramp_manager, "selected_horcrux", text="")
-        
-        # The selected horcrux object
-        horcrux_object = bpy.data.objects.get(color_ramp_manager.selected_horcrux)
-        
-        # Show the "Create Horcrux" button regardless of whether a horcrux is selected
-        layout.operator("object.create_horcrux", text="Create Horcrux", icon='NEWFOLDER')
+            col = split.column()
+            col.label(text="Active Horcrux", icon='DOCUMENTS')
+
+            col = split.column()
+            col.prop(color_ramp_manager, "selected_horcrux", text="")
+            
+            # Show the "Create Horcrux" button regardless of whether a horcrux is selected
+            layout.operator("object.create_horcrux", text="Create Horcrux", icon='NEWFOLDER')
         
-        if horcrux_object:
+        if storage.has_categories(color_ramp_manager):
             layout = self.layout
             split = layout.split(factor=0.525)
 
@@ -780,9 +1932,15 @@ class G2C_PT_horcrux_manager(Panel):
             row=layout.row()    
             row.operator("object.add_material", text="Add Categories", icon='LINENUMBERS_ON')
             row.operator(G2C_OT_GetColorRampPalette.bl_idname, text="Extract Palette", icon='EYEDROPPER')
+            row.operator(G2C_OT_extract_image_colors.bl_idname, text="", icon='IMAGE_RGB')
 
-            # Dropdowns to select the materials
-            if horcrux_object.data.materials:
+            row = layout.row()
+            row.operator(G2C_OT_import_library.bl_idname, text="Import Library", icon='IMPORT')
+            row.operator(G2C_OT_export_library.bl_idname, text="Export Library", icon='EXPORT')
+            row.operator(G2C_OT_dedupe_library.bl_idname, text="", icon='DUPLICATE')
+
+            # Dropdowns to select the categories, library ones included
+            if registry.category_enum_items(color_ramp_manager):
                 
                 layout = self.layout
                 split = layout.split(factor=0.4)
@@ -805,59 +1963,135 @@ class G2C_PT_horcrux_manager(Panel):
                 row = layout.row()
                 row.label(text="Gradient Add/Remove")
                 row.operator("material.add_color_ramp", text="", icon='PLUS')
+                row.operator(G2C_OT_import_gradients.bl_idname, text="", icon='FILEBROWSER')
+                row.operator(G2C_OT_bake_gradient_atlas.bl_idname, text="", icon='IMAGE_DATA')
+                row.operator(G2C_OT_select_category_items.bl_idname, text="", icon='CHECKBOX_HLT').kind = 'RAMP'
+                row.operator(G2C_OT_duplicate_category_items.bl_idname, text="", icon='COPYDOWN').kind = 'RAMP'
+                row.operator(G2C_OT_move_category_items.bl_idname, text="", icon='FORWARD').kind = 'RAMP'
                 row.operator("material.remove_color_ramp", text="", icon='TRASH')
 
                 row = layout.row()
                 row.label(text="Falloff Add/Remove")
                 row.operator("material.add_rgb_curve", text="", icon='PLUS')
+                row.operator(G2C_OT_select_category_items.bl_idname, text="", icon='CHECKBOX_HLT').kind = 'CURVE'
+                row.operator(G2C_OT_duplicate_category_items.bl_idname, text="", icon='COPYDOWN').kind = 'CURVE'
+                row.operator(G2C_OT_move_category_items.bl_idname, text="", icon='FORWARD').kind = 'CURVE'
                 row.operator("material.remove_rgb_curve", text="", icon='TRASH')
 
-                # Show color ramps
-                selected_material = bpy.data.materials.get(color_ramp_manager.selected_material)
-                if selected_material and selected_material.use_nodes:
-                    node_tree = selected_material.node_tree
+                # Only the visible rows are drawn; the full editor is shown for the selected row
+                selected_material = storage.get_category(color_ramp_manager, color_ramp_manager.selected_material)
+                if storage.node_tree(selected_material):
                     if color_ramp_manager.ramp_list:
-                        for ramp in color_ramp_manager.ramp_list:
-                            if ramp.name in node_tree.nodes:
-                                color_ramp_node = node_tree.nodes[ramp.name]
-                                box = layout.box()
-                                row = box.row()
-                                row.prop(ramp, "active", text="", icon='VIEW_UNLOCKED' if ramp.active else 'VIEW_LOCKED')
-                                row.label(text=ramp.name)
-                                row.operator(G2C_OT_copy_color_ramp_to_brush.bl_idname, text="", icon='BRUSH_DATA')
-                                row.operator(G2C_OT_CopyBrushGradientToColorRamp.bl_idname, text="", icon='IMPORT')
-                                
-                                box.template_color_ramp(color_ramp_node, "color_ramp", expand=True)
+                        layout.template_list(
+                            "G2C_UL_color_ramps", "", color_ramp_manager, "ramp_list",
+                            color_ramp_manager, "ramp_index", rows=color_ramp_manager.list_rows,
+                        )
+                        ramp = get_list_selection(color_ramp_manager.ramp_list, color_ramp_manager.ramp_index)
+                        color_ramp_node = storage.node_tree(selected_material).nodes.get(ramp.name) if ramp else None
+                        if color_ramp_node and ramp.material == selected_material.name:
+                            box = layout.box()
+                            row = box.row()
+                            row.label(text=ramp.name)
+                            row.operator(G2C_OT_copy_color_ramp_to_brush.bl_idname, text="", icon='BRUSH_DATA')
+                            row.operator(G2C_OT_CopyBrushGradientToColorRamp.bl_idname, text="", icon='IMPORT')
+                            row.operator_menu_enum(G2C_OT_bake_perceptual_gradient.bl_idname, "space", text="", icon='SHADING_RENDERED')
+                            row.operator(G2C_OT_apply_to_brushes.bl_idname, text="", icon='BRUSHES_ALL').source = 'GRADIENT'
+                            
+                            box.template_color_ramp(color_ramp_node, "color_ramp", expand=True)
+                            box.prop(ramp, "tags", icon='BOOKMARKS')
                     else:
                         layout.label(text="No Color Ramps Added", icon='INFO')
 
-                # Show RGB curves
-                selected_curve_material = bpy.data.materials.get(color_ramp_manager.selected_curve_material)
-                if selected_curve_material and selected_curve_material.use_nodes:
-                    node_tree = selected_curve_material.node_tree
+                    row = layout.row(align=True)
+                    row.prop(color_ramp_manager, "reduce_gradient_stops")
+                    sub = row.row(align=True)
+                    sub.active = color_ramp_manager.reduce_gradient_stops
+                    sub.prop(color_ramp_manager, "gradient_max_error")
+
+                selected_curve_material = storage.get_category(color_ramp_manager, color_ramp_manager.selected_curve_material)
+                if storage.node_tree(selected_curve_material):
                     if color_ramp_manager.curve_list:
-                        for curve in color_ramp_manager.curve_list:
-                            if curve.name in node_tree.nodes:
-                                rgb_curve_node = node_tree.nodes[curve.name]
-                                box = layout.box()
-                                row = box.row()
-                                row.prop(curve, "active", text="", icon='VIEW_UNLOCKED' if curve.active else 'VIEW_LOCKED')
-                                row.label(text=curve.name)
-                                row.operator(G2C_OT_CopyRGBCurveToBrushFalloff.bl_idname, text="", icon='BRUSH_DATA')
-                                row.operator(G2C_OT_CopyBrushFalloffToRGBCurve.bl_idname, text="", icon='IMPORT')
-                                row.operator(G2C_OT_CopyRGBCurveToCavityMask.bl_idname, text="", icon='SCREEN_BACK')
-                                
-                                box.template_curve_mapping(data=rgb_curve_node, property="mapping", type='COLOR')
+                        layout.template_list(
+                            "G2C_UL_rgb_curves", "", color_ramp_manager, "curve_list",
+                            color_ramp_manager, "curve_index", rows=color_ramp_manager.list_rows,
+                        )
+                        curve = get_list_selection(color_ramp_manager.curve_list, color_ramp_manager.curve_index)
+                        rgb_curve_node = storage.node_tree(selected_curve_material).nodes.get(curve.name) if curve else None
+                        if rgb_curve_node and curve.material == selected_curve_material.name:
+                            box = layout.box()
+                            row = box.row()
+                            row.label(text=curve.name)
+                            row.operator(G2C_OT_CopyRGBCurveToBrushFalloff.bl_idname, text="", icon='BRUSH_DATA')
+                            row.operator(G2C_OT_CopyBrushFalloffToRGBCurve.bl_idname, text="", icon='IMPORT')
+                            row.operator(G2C_OT_CopyRGBCurveToCavityMask.bl_idname, text="", icon='SCREEN_BACK')
+                            row.operator(G2C_OT_apply_to_brushes.bl_idname, text="", icon='BRUSHES_ALL').source = 'FALLOFF'
+                            
+                            box.template_curve_mapping(data=rgb_curve_node, property="mapping", type='COLOR')
+                            box.prop(curve, "tags", icon='BOOKMARKS')
                     else:
                         layout.label(text="No RGB Curves Added", icon='INFO')
 
-            else:
+                    row = layout.row(align=True)
+                    row.prop(color_ramp_manager, "curve_fit_mode", text="")
+                    if color_ramp_manager.curve_fit_mode == 'SIMPLIFY':
+                        row.prop(color_ramp_manager, "curve_tolerance")
+                    row.prop(color_ramp_manager, "curve_max_points")
+
+                layout.prop(color_ramp_manager, "live_link", icon='LINKED' if livelink.is_linked() else 'UNLINKED')
+                layout.prop(color_ramp_manager, "list_rows")
+
+            elif storage.uses_horcrux(color_ramp_manager):
                 layout.label(text="No materials found on the selected horcrux.", icon='INFO')
+            else:
+                layout.label(text="No category node groups yet, add categories above.", icon='INFO')
 
         else:
             layout.label(text="No horcrux object selected", icon='ERROR')
 
 
+class G2C_OT_reset_stats(Operator):
+    """Forget the Recorded Operator Timings"""
+    bl_idname = "material.reset_gradient_stats"
+    bl_label = "Reset Timings"
+    bl_description = "Clear the call counts and latency histograms of the manager's operators"
+
+    def execute(self, context):
+        stats.reset()
+        return {'FINISHED'}
+
+
+class G2C_PT_horcrux_stats(Panel):
+    """Call Counts and Latency of the Manager's Operators and Panel Draw"""
+    bl_idname = "G2C_PT_horcrux_stats"
+    bl_label = "Operator Timing"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Paint'
+    bl_parent_id = "G2C_PT_horcrux_manager"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+
+        row = layout.row()
+        row.prop(context.scene.color_ramp_manager, "stats_enabled")
+        row.operator(G2C_OT_reset_stats.bl_idname, text="", icon='TRASH')
+
+        summary = stats.summary()
+        if not summary:
+            layout.label(text="No timed calls yet", icon='INFO')
+            return
+
+        col = layout.column(align=True)
+        for name, count, p50, p95 in [("Operator", "Calls", "p50 ms", "p95 ms")] + summary:
+            split = col.split(factor=0.55)
+            split.label(text=name)
+            row = split.row()
+            row.label(text=str(count))
+            row.label(text=p50 if isinstance(p50, str) else f"{p50:.2f}")
+            row.label(text=p95 if isinstance(p95, str) else f"{p95:.2f}")
+
+
 class G2C_AddColorToPalette(Operator):
     bl_idname = "palette.add_color"
     bl_label = "Add Color to Palette"
@@ -866,6 +2100,7 @@ class G2C_AddColorToPalette(Operator):
         name="Color",
         subtype='COLOR',
         min=0.0, max=1.0,
+        size=4,
         default=(1.0, 1.0, 1.0, 1.0)
     )
 
@@ -906,41 +2141,26 @@ class G2C_OT_GenerateGradientFromPalette(Operator):
             self.report({'WARNING'}, "No active brush found.")
             return {'CANCELLED'}
 
-        # Access the active palette from the scene or tool settings
+        # The active palette lives on the texture paint settings
         palette = context.tool_settings.image_paint.palette
-        if not palette:
-            palette = context.scene.tool_settings.palette
         if not palette:
             self.report({'WARNING'}, "No active palette found.")
             return {'CANCELLED'}
 
-        # Retrieve the gradient from the brush
-        brush_gradient = brush.gradient
-        
-        # Get the number of colors in the palette
-        num_colors = len(palette.colors)
-        if num_colors == 0:
+        if len(palette.colors) == 0:
             self.report({'WARNING'}, "No colors in the active palette.")
             return {'CANCELLED'}
 
-        # Ensure there are enough gradient points, add new if necessary
-        while len(brush_gradient.elements) < num_colors:
-            brush_gradient.elements.new(0)
-
-        # Update the existing gradient points with the palette colors
-        for i, color in enumerate(palette.colors):
-            position = i / (num_colors - 1) if num_colors > 1 else 0.5
-            
-            # Ensure the color has 4 components (RGBA)
-            rgba_color = list(color.color)[:3] + [1.0]  # Add alpha = 1.0 if it's not present
-            brush_gradient.elements[i].position = position
-            brush_gradient.elements[i].color = rgba_color
-
-        # If there are extra gradient points, remove them
-        while len(brush_gradient.elements) > num_colors:
-            brush_gradient.elements.remove(brush_gradient.elements[-1])
+        # Spread the palette colors evenly over the brush gradient
+        palette_gradient = Gradient.from_palette(palette)
+        gradient, error = fit_gradient(context.scene.color_ramp_manager, palette_gradient)
+        if gradient is palette_gradient:
+            # Keep the brush's own interpolation when every palette color becomes a stop
+            transfer.write_ramp(brush.gradient, gradient.positions, gradient.colors)
+        else:
+            gradient.to_color_ramp(brush.gradient)
 
-        self.report({'INFO'}, "Gradient created from the active palette.")
+        self.report({'INFO'}, f"Gradient created from the active palette ({len(gradient)} stops, max error {error:.4f}).")
         return {'FINISHED'}
 
 
@@ -948,9 +2168,6 @@ def draw_gradient_button(self, context):
     layout = self.layout
     settings = context.tool_settings.image_paint
 
-    # Debugging print to check if the function is being called
-    print("Attempting to draw the gradient button...")
-
     if settings and settings.palette:
         layout.operator("brush.generate_gradient_from_palette", text="Gradient from Palette")
 
@@ -966,46 +2183,96 @@ def register():
     bpy.utils.register_class(ColorRampManagerProperties)
     bpy.utils.register_class(ColorRampPalette)
     bpy.utils.register_class(G2C_OT_GetColorRampPalette)
+    bpy.utils.register_class(G2C_OT_extract_image_colors)
     bpy.utils.register_class(G2C_OT_CopyRGBCurveToBrushFalloff)
     bpy.utils.register_class(G2C_OT_CopyRGBCurveToCavityMask)
     bpy.utils.register_class(G2C_OT_create_horcrux)
     bpy.utils.register_class(G2C_OT_add_material)
+    bpy.utils.register_class(G2C_OT_export_library)
+    bpy.utils.register_class(G2C_OT_import_library)
+    bpy.utils.register_class(G2C_OT_import_gradients)
+    bpy.utils.register_class(G2C_OT_dedupe_library)
+    bpy.utils.register_class(G2C_OT_refresh_library)
+    bpy.utils.register_class(G2C_OT_convert_storage)
+    bpy.utils.register_class(G2C_OT_bake_gradient_atlas)
     bpy.utils.register_class(G2C_OT_add_color_ramp)
     bpy.utils.register_class(G2C_OT_add_rgb_curve)
     bpy.utils.register_class(G2C_OT_remove_color_ramp)
     bpy.utils.register_class(G2C_OT_remove_rgb_curve)
+    bpy.utils.register_class(G2C_OT_select_category_items)
+    bpy.utils.register_class(G2C_OT_duplicate_category_items)
+    bpy.utils.register_class(G2C_OT_move_category_items)
+    bpy.utils.register_class(G2C_UL_color_ramps)
+    bpy.utils.register_class(G2C_UL_rgb_curves)
     bpy.utils.register_class(G2C_PT_horcrux_manager)
+    bpy.utils.register_class(G2C_OT_reset_stats)
+    bpy.utils.register_class(G2C_PT_horcrux_stats)
     bpy.utils.register_class(G2C_AddColorToPalette)
     bpy.utils.register_class(G2C_OT_copy_color_ramp_to_brush)
+    bpy.utils.register_class(G2C_OT_bake_perceptual_gradient)
     bpy.utils.register_class(G2C_OT_CopyBrushGradientToColorRamp)
     bpy.utils.register_class(G2C_OT_CopyBrushFalloffToRGBCurve)
+    bpy.utils.register_class(G2C_OT_apply_to_brushes)
     bpy.utils.register_class(G2C_OT_GenerateGradientFromPalette)
     # Assuming we identified the correct panel, let's append the button there
     bpy.types.VIEW3D_PT_tools_brush_settings.append(draw_gradient_button)
     
     bpy.types.Scene.color_ramp_palette = PointerProperty(type=ColorRampPalette)
     bpy.types.Scene.color_ramp_manager = PointerProperty(type=ColorRampManagerProperties)
+
+    registry.register()
+    previews.register()
+    livelink.register()
+
+    # Timing wrappers are only swapped in while the stats panel has timing switched on
+    stats.instrument([
+        cls for cls in globals().values()
+        if isinstance(cls, type) and cls.__module__ == __name__ and issubclass(cls, Operator)
+    ])
+    stats.instrument([G2C_PT_horcrux_manager])
     
 
 def unregister():
+    stats.clear()
+    livelink.unregister()
+    registry.unregister()
+    previews.unregister()
+
     bpy.utils.unregister_class(RGBCurveItem)
     bpy.utils.unregister_class(ColorRampItem)
     bpy.utils.unregister_class(ColorRampManagerProperties)
     bpy.utils.unregister_class(ColorRampPalette)
     bpy.utils.unregister_class(G2C_OT_GetColorRampPalette)
+    bpy.utils.unregister_class(G2C_OT_extract_image_colors)
     bpy.utils.unregister_class(G2C_OT_CopyRGBCurveToBrushFalloff)
     bpy.utils.unregister_class(G2C_OT_CopyRGBCurveToCavityMask)
     bpy.utils.unregister_class(G2C_OT_create_horcrux)
     bpy.utils.unregister_class(G2C_OT_add_material)
+    bpy.utils.unregister_class(G2C_OT_export_library)
+    bpy.utils.unregister_class(G2C_OT_import_library)
+    bpy.utils.unregister_class(G2C_OT_import_gradients)
+    bpy.utils.unregister_class(G2C_OT_dedupe_library)
+    bpy.utils.unregister_class(G2C_OT_refresh_library)
+    bpy.utils.unregister_class(G2C_OT_convert_storage)
+    bpy.utils.unregister_class(G2C_OT_bake_gradient_atlas)
     bpy.utils.unregister_class(G2C_OT_add_color_ramp)
     bpy.utils.unregister_class(G2C_OT_add_rgb_curve)
     bpy.utils.unregister_class(G2C_OT_remove_color_ramp)
     bpy.utils.unregister_class(G2C_OT_remove_rgb_curve)
+    bpy.utils.unregister_class(G2C_OT_select_category_items)
+    bpy.utils.unregister_class(G2C_OT_duplicate_category_items)
+    bpy.utils.unregister_class(G2C_OT_move_category_items)
+    bpy.utils.unregister_class(G2C_PT_horcrux_stats)
+    bpy.utils.unregister_class(G2C_OT_reset_stats)
     bpy.utils.unregister_class(G2C_PT_horcrux_manager)
+    bpy.utils.unregister_class(G2C_UL_color_ramps)
+    bpy.utils.unregister_class(G2C_UL_rgb_curves)
     bpy.utils.unregister_class(G2C_AddColorToPalette)
     bpy.utils.unregister_class(G2C_OT_copy_color_ramp_to_brush)
+    bpy.utils.unregister_class(G2C_OT_bake_perceptual_gradient)
     bpy.utils.unregister_class(G2C_OT_CopyBrushGradientToColorRamp)
     bpy.utils.unregister_class(G2C_OT_CopyBrushFalloffToRGBCurve)
+    bpy.utils.unregister_class(G2C_OT_apply_to_brushes)
     bpy.utils.unregister_class(G2C_OT_GenerateGradientFromPalette)
     bpy.types.IMAGE_PT_paint_stroke.remove(draw_gradient_button)
     # Remove the draw function from the existing ColorPalettePanel
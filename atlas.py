@@ -0,0 +1,107 @@
+"""Bake every ramp of a gradient category into one LUT atlas image.
+
+Row r of the atlas is the ramp listed at r in the image's "g2c_atlas_rows"
+property, counted from the bottom like Blender stores pixels, so a shader
+samples it at v = (r + 0.5) / height. The content hash of each row is stored
+next to it and a rebake only samples the ramps whose hash changed.
+"""
+import bpy
+import numpy as np
+
+from . import storage
+from .gradient_core import Gradient
+
+
+DEFAULT_WIDTH = 256
+
+ROWS_PROPERTY = "g2c_atlas_rows"
+HASHES_PROPERTY = "g2c_atlas_hashes"
+
+
+def atlas_image_name(material):
+    return f"{material.name} Atlas"
+
+
+def category_gradients(material):
+    """(node name, Gradient) for every ramp of a category, in node order."""
+    node_tree = storage.node_tree(material)
+    if not node_tree:
+        return []
+    return [
+        (node.name, Gradient.from_color_ramp(node.color_ramp))
+        for node in node_tree.nodes
+        if node.type == 'VALTORGB'
+    ]
+
+
+def build_atlas(gradients, width, old_pixels=None, old_rows=None, old_hashes=None):
+    """Lay out the gradients as atlas rows, reusing unchanged rows of an old bake.
+
+    old_pixels is the previous atlas as a (height, width, 4) array with the
+    name -> row and name -> hash maps it was baked with. Returns the new
+    (len(gradients), width, 4) pixels, the name -> row and name -> hash maps,
+    and the number of rows that had to be sampled again.
+    """
+    pixels = np.empty((len(gradients), width, 4), dtype=np.float32)
+    rows = {}
+    hashes = {}
+    baked = 0
+    reuse = old_pixels is not None and old_pixels.shape[1:] == (width, 4)
+    for row, (name, gradient) in enumerate(gradients):
+        content = gradient.content_hash()
+        old_row = old_rows.get(name) if reuse and old_rows else None
+        if old_row is not None and old_row < len(old_pixels) and (old_hashes or {}).get(name) == content:
+            pixels[row] = old_pixels[old_row]
+        else:
+            pixels[row] = gradient.sample(width)
+            baked += 1
+        rows[name] = row
+        hashes[name] = content
+    return pixels, rows, hashes, baked
+
+
+def _read_atlas(image):
+    width, height = image.size
+    if ROWS_PROPERTY not in image or not width or not height:
+        return None, None, None
+    pixels = np.empty(width * height * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    rows = {name: int(row) for name, row in image[ROWS_PROPERTY].items()}
+    hashes = {name: str(content) for name, content in image.get(HASHES_PROPERTY, {}).items()}
+    return pixels.reshape(height, width, 4), rows, hashes
+
+
+def bake_category_atlas(material, width=DEFAULT_WIDTH):
+    """Bake the ramps of a category into its atlas image, creating it if needed.
+
+    Returns (image, rows baked, total rows), or (None, 0, 0) for a category
+    without ramps.
+    """
+    gradients = category_gradients(material)
+    if not gradients:
+        return None, 0, 0
+
+    name = atlas_image_name(material)
+    image = bpy.data.images.get(name)
+    old_pixels = old_rows = old_hashes = None
+    if image is not None:
+        old_pixels, old_rows, old_hashes = _read_atlas(image)
+
+    pixels, rows, hashes, baked = build_atlas(gradients, width, old_pixels, old_rows, old_hashes)
+    height = len(gradients)
+
+    if image is None:
+        image = bpy.data.images.new(name, width, height, alpha=True, float_buffer=True)
+    elif baked == 0 and old_rows == rows and tuple(image.size) == (width, height):
+        return image, 0, height
+    elif tuple(image.size) != (width, height):
+        image.scale(width, height)
+
+    image.pixels.foreach_set(pixels.ravel())
+    image[ROWS_PROPERTY] = rows
+    image[HASHES_PROPERTY] = hashes
+    image.update()
+    # Generated images are lost on reload unless their pixels are packed
+    image.file_format = 'OPEN_EXR'
+    image.pack()
+    return image, baked, height
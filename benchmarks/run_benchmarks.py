@@ -0,0 +1,280 @@
+"""Time the add-on's hot paths on synthetic horcruxes of growing size.
+
+Run it inside Blender:
+
+    blender -b --factory-startup --python benchmarks/run_benchmarks.py -- --output results.json
+
+or with plain Python against a bpy stand-in directory:
+
+    python benchmarks/run_benchmarks.py --bpy-path path/to/standin --output results.json
+
+Every scale gets a fresh horcrux holding that many color ramps and RGB curves.
+Each case is run --repeat times and the results are written as JSON, so two
+runs can be put side by side with --compare old.json.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SCALES = (10, 100, 1000, 10000)
+
+HORCRUX_NAME = "Benchmark_Horcrux"
+GRADIENT_CATEGORY = "Benchmark Gradients"
+CURVE_CATEGORY = "Benchmark Falloffs"
+BRUSH_NAME = "Benchmark Brush"
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default=",".join(str(scale) for scale in DEFAULT_SCALES),
+                        help="comma separated ramp and curve counts")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic gradients and curves")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file the results are written to")
+    parser.add_argument("--compare", help="earlier results file to print ratios against")
+    parser.add_argument("--bpy-path", help="directory holding a bpy stand-in, for runs outside Blender")
+    return parser.parse_args(argv)
+
+
+def load_addon():
+    """Import the add-on from this checkout, whatever its folder is called."""
+    name = os.path.basename(REPO_DIR).replace("-", "_").replace(".", "_")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(REPO_DIR, "__init__.py"), submodule_search_locations=[REPO_DIR],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class NullLayout:
+    """Accepts every UILayout call so panel draw code can run headless.
+
+    Only the Python side of drawing is measured; Blender's own widget layout
+    and the rows template_list actually shows are not.
+    """
+
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __setattr__(self, name, value):
+        pass
+
+
+class PanelStub:
+    def __init__(self):
+        self.layout = NullLayout()
+
+
+def measure(function, repeat, setup=None, operator=False):
+    """Run function repeat times and return its timings in milliseconds.
+
+    With operator set, function runs a bpy.ops operator: its result is
+    recorded, and a run that does not finish counts as an error, since it
+    timed an early return rather than the work.
+    """
+    timings = []
+    error = None
+    status = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        try:
+            value = function()
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            break
+        elapsed = (time.perf_counter() - start) * 1000.0
+        if operator:
+            status = sorted(value)
+            if 'FINISHED' not in value:
+                error = f"operator returned {status}"
+                break
+        timings.append(elapsed)
+    if not timings:
+        return {"error": error} if status is None else {"result": status, "error": error}
+    result = {
+        "runs": len(timings),
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "mean_ms": statistics.fmean(timings),
+        "max_ms": max(timings),
+    }
+    if status is not None:
+        result["result"] = status
+    if error:
+        result["error"] = error
+    return result
+
+
+def clear_benchmark_data(bpy):
+    obj = bpy.data.objects.get(HORCRUX_NAME)
+    if obj is not None:
+        mesh = obj.data
+        bpy.data.objects.remove(obj)
+        if mesh is not None and mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+    for name in (GRADIENT_CATEGORY, CURVE_CATEGORY):
+        material = bpy.data.materials.get(name)
+        if material is not None:
+            bpy.data.materials.remove(material)
+
+
+def build_horcrux(bpy, addon, scale, rng):
+    """A horcrux with one gradient and one curve category of scale nodes each."""
+    clear_benchmark_data(bpy)
+    mesh = bpy.data.meshes.new(HORCRUX_NAME)
+    obj = bpy.data.objects.new(HORCRUX_NAME, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+
+    Gradient = addon.gradient_core.Gradient
+    FalloffCurve = addon.gradient_core.FalloffCurve
+    manager = bpy.context.scene.color_ramp_manager
+    gradients = addon.storage.get_or_create_category(manager, GRADIENT_CATEGORY, obj, backend=addon.storage.MATERIAL)
+    curves = addon.storage.get_or_create_category(manager, CURVE_CATEGORY, obj, backend=addon.storage.MATERIAL)
+
+    for i in range(scale):
+        stops = int(rng.integers(2, 9))
+        positions = sorted(rng.random(stops))
+        colors = rng.random((stops, 4))
+        colors[:, 3] = 1.0
+        addon.new_color_ramp_node(gradients.node_tree, f"Ramp {i:05d}", Gradient(positions, colors))
+
+        points = int(rng.integers(2, 9))
+        x = sorted(rng.random(points - 2)) if points > 2 else []
+        locations = list(zip([0.0, *x, 1.0], sorted(rng.random(points), reverse=True)))
+        addon.new_rgb_curve_node(curves.node_tree, f"Curve {i:05d}", FalloffCurve(locations))
+
+    obj.active_material_index = 0
+    addon.registry.invalidate_horcruxes()
+    return obj
+
+
+def get_brush(bpy, context):
+    """The benchmark brush set as the active texture paint brush, or None if it can't be."""
+    brush = bpy.data.brushes.get(BRUSH_NAME) or bpy.data.brushes.new(BRUSH_NAME, mode='TEXTURE_PAINT')
+    image_paint = context.tool_settings.image_paint
+    try:
+        image_paint.brush = brush
+    except (AttributeError, TypeError):
+        return None
+    return image_paint.brush
+
+
+def run_scale(bpy, addon, scale, repeat, rng):
+    context = bpy.context
+    manager = context.scene.color_ramp_manager
+    obj = build_horcrux(bpy, addon, scale, rng)
+
+    manager.ramp_list.clear()
+    manager.curve_list.clear()
+    manager.selected_horcrux = obj.name
+    manager.selected_material = GRADIENT_CATEGORY
+    manager.selected_curve_material = CURVE_CATEGORY
+
+    def forget_caches():
+        addon.registry.on_file_changed()
+        manager.ramp_list.clear()
+        manager.curve_list.clear()
+
+    results = {}
+    results["get_horcrux_objects_cold"] = measure(
+        lambda: manager.get_horcrux_objects(context), repeat, setup=addon.registry.invalidate_horcruxes,
+    )
+    results["get_horcrux_objects"] = measure(lambda: manager.get_horcrux_objects(context), repeat)
+    results["update_materials_cold"] = measure(lambda: manager.update_materials(context), repeat, setup=forget_caches)
+    results["update_materials"] = measure(lambda: manager.update_materials(context), repeat)
+
+    manager.ramp_index = scale // 2
+    manager.curve_index = scale // 2
+    panel = PanelStub()
+    results["panel_draw"] = measure(lambda: addon.G2C_PT_horcrux_manager.draw(panel, context), repeat)
+
+    brush = get_brush(bpy, context)
+    operators = {
+        "copy_color_ramp_to_brush": lambda: bpy.ops.object.copy_color_ramp_to_brush(),
+        "copy_brush_gradient_to_color_ramp": lambda: bpy.ops.paint.copy_brush_gradient_to_color_ramp(),
+        "copy_rgb_curve_to_brush_falloff": lambda: bpy.ops.paint.copy_rgb_curve_to_brush_falloff(),
+        "copy_brush_falloff_to_rgb_curve": lambda: bpy.ops.paint.copy_brush_falloff_to_rgb_curve(),
+        "copy_rgb_curve_to_cavity_mask": lambda: bpy.ops.paint.copy_rgb_curve_to_cavity_mask(),
+        "get_color_ramp_palette": lambda: bpy.ops.paint.get_color_ramp_palette(),
+    }
+    for name, operator in operators.items():
+        if brush is None and "brush" in name:
+            results[name] = {"skipped": "no texture paint brush can be set in this Blender"}
+            continue
+        results[name] = measure(operator, repeat, operator=True)
+
+    clear_benchmark_data(bpy)
+    return results
+
+
+def compare(results, previous):
+    """Print median time ratios of this run against an earlier results file."""
+    print(f"{'scale':>6}  {'case':<36} {'before':>10} {'after':>10} {'ratio':>7}")
+    for scale, cases in results["results"].items():
+        old_cases = previous.get("results", {}).get(scale, {})
+        for case, timing in cases.items():
+            before = old_cases.get(case, {}).get("median_ms")
+            after = timing.get("median_ms")
+            if before is None or after is None:
+                continue
+            ratio = after / before if before else float("inf")
+            print(f"{scale:>6}  {case:<36} {before:>10.3f} {after:>10.3f} {ratio:>6.2f}x")
+
+
+def main():
+    args = parse_args()
+    if args.bpy_path:
+        sys.path.insert(0, os.path.abspath(args.bpy_path))
+    import bpy
+    import numpy as np
+
+    addon = load_addon()
+    addon.register()
+    try:
+        rng = np.random.default_rng(args.seed)
+        results = {
+            "meta": {
+                "addon_version": ".".join(str(part) for part in addon.bl_info["version"]),
+                "blender_version": getattr(bpy.app, "version_string", "unknown"),
+                "python_version": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "seed": args.seed,
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": {},
+        }
+        for scale in (int(part) for part in args.scales.split(",") if part.strip()):
+            print(f"Benchmarking {scale} ramps and curves...")
+            results["results"][str(scale)] = run_scale(bpy, addon, scale, args.repeat, rng)
+    finally:
+        addon.unregister()
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
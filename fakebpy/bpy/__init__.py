@@ -0,0 +1,10 @@
+"""In-memory stand-in for Blender's bpy module.
+
+Put the fakebpy directory first on sys.path and `import bpy` gives a
+background session with an empty file: one scene, no window. See the
+"Running without Blender" section of the add-on README.
+"""
+from . import app, msgbus, ops, path, props, types, utils
+
+data = types.BlendData()
+context = types.Context(data)
@@ -0,0 +1,8 @@
+"""Application info, handlers and timers."""
+from . import handlers, timers
+
+version = (4, 2, 0)
+version_file = (4, 2, 0)
+version_string = "4.2.0 (stand-in)"
+background = True
+binary_path = ""
@@ -0,0 +1,25 @@
+"""Handler lists; the stand-in fires the ones it can emulate."""
+
+depsgraph_update_pre = []
+depsgraph_update_post = []
+load_pre = []
+load_post = []
+save_pre = []
+save_post = []
+undo_pre = []
+undo_post = []
+redo_pre = []
+redo_post = []
+frame_change_pre = []
+frame_change_post = []
+
+
+def persistent(function):
+    """Keep a handler registered across file loads."""
+    function._bpy_persistent = True
+    return function
+
+
+def _fire(handlers, *args):
+    for handler in list(handlers):
+        handler(*args)
@@ -0,0 +1,44 @@
+"""Timers on a virtual clock.
+
+There is no event loop outside Blender, so nothing fires on its own: call
+step(seconds) to deliver pending bpy.msgbus notifications, advance the clock
+and run the timers that became due.
+"""
+from .. import msgbus
+
+_timers = {}
+_clock = 0.0
+
+
+def register(function, first_interval=0.0, persistent=False):
+    _timers[function] = _clock + first_interval
+
+
+def unregister(function):
+    if function not in _timers:
+        raise ValueError("Error: function is not registered")
+    del _timers[function]
+
+
+def is_registered(function):
+    return function in _timers
+
+
+def step(seconds=0.0):
+    """Stand-in only: advance the clock and run due timers, returns how many ran."""
+    global _clock
+    msgbus._deliver()
+    _clock += seconds
+    ran = 0
+    for function, due in sorted(_timers.items(), key=lambda item: item[1]):
+        if due > _clock or function not in _timers:
+            continue
+        ran += 1
+        interval = function()
+        if function not in _timers:
+            continue
+        if interval is None:
+            del _timers[function]
+        else:
+            _timers[function] = _clock + interval
+    return ran
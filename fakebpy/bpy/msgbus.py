@@ -0,0 +1,56 @@
+"""Message bus subscriptions to RNA properties.
+
+Setting a property through Python publishes it, like in Blender; foreach_set
+does not. Blender delivers notifications from its event loop, here they are
+delivered by bpy.app.timers.step(), once per subscription however many times
+the property changed in between.
+"""
+
+_subscriptions = []
+_pending = {}
+
+
+def _matches(key, struct, attr):
+    if isinstance(key, tuple) and len(key) == 2:
+        rna_type, prop = key
+        return prop == attr and isinstance(rna_type, type) and isinstance(struct, rna_type)
+    return False
+
+
+def subscribe_rna(key, owner, args, notify, options=set()):
+    if not isinstance(args, tuple):
+        raise TypeError("subscribe_rna(...): args must be a tuple")
+    if not callable(notify):
+        raise TypeError("subscribe_rna(...): notify must be callable")
+    _subscriptions.append((key, owner, args, notify))
+
+
+def publish_rna(key):
+    for subscription in _subscriptions:
+        if subscription[0] == key:
+            _pending[id(subscription)] = subscription
+
+
+def clear_by_owner(owner):
+    _subscriptions[:] = [subscription for subscription in _subscriptions if subscription[1] is not owner]
+    for key in [key for key, subscription in _pending.items() if subscription[1] is owner]:
+        del _pending[key]
+
+
+def _publish(struct, attr):
+    for subscription in _subscriptions:
+        if _matches(subscription[0], struct, attr):
+            _pending[id(subscription)] = subscription
+
+
+def _clear():
+    _subscriptions.clear()
+    _pending.clear()
+
+
+def _deliver():
+    delivered = list(_pending.values())
+    _pending.clear()
+    for _key, _owner, args, notify in delivered:
+        notify(*args)
+    return len(delivered)
@@ -0,0 +1,155 @@
+"""Operator calls: bpy.ops.<module>.<name>(execution_context, **properties).
+
+Registered Python operators run through poll, invoke or execute like in
+Blender; a few built-in operators the add-on relies on are emulated below.
+The reports of the last call are kept in `reports` as (type, message) pairs,
+which Blender itself only prints.
+"""
+import inspect
+
+from . import types
+from .app import handlers
+
+
+reports = []
+
+_builtin = {}
+
+
+def _builtin_operator(idname):
+    def decorate(function):
+        _builtin[idname] = function
+        return function
+    return decorate
+
+
+@_builtin_operator("mesh.primitive_grid_add")
+def _primitive_grid_add(context, x_subdivisions=10, y_subdivisions=10, size=2.0, **_kwargs):
+    import bpy
+    mesh = bpy.data.meshes.new("Grid")
+    obj = bpy.data.objects.new("Grid", mesh)
+    context.scene.collection.objects.link(obj)
+    context.view_layer.objects.active = obj
+    return {'FINISHED'}
+
+
+@_builtin_operator("wm.redraw_timer")
+def _redraw_timer(context, **_kwargs):
+    return {'FINISHED'}
+
+
+@_builtin_operator("ed.undo_push")
+def _undo_push(context, **_kwargs):
+    return {'FINISHED'}
+
+
+@_builtin_operator("wm.read_homefile")
+def _read_homefile(context, use_empty=False, **_kwargs):
+    import bpy
+    handlers._fire(handlers.load_pre, None)
+    bpy.msgbus._clear()
+    bpy.data._reset()
+    handlers._fire(handlers.load_post, None)
+    return {'FINISHED'}
+
+
+@_builtin_operator("wm.read_factory_settings")
+def _read_factory_settings(context, use_empty=False, **_kwargs):
+    return _read_homefile(context, use_empty=use_empty)
+
+
+def _find_property(cls, name):
+    try:
+        attribute = inspect.getattr_static(cls, name)
+    except AttributeError:
+        return None
+    return attribute if isinstance(attribute, types._RNAProperty) else None
+
+
+def _call(idname, args, kwargs):
+    import bpy
+    context = bpy.context
+    execution_context = args[0] if args else 'EXEC_DEFAULT'
+
+    function = _builtin.get(idname)
+    if function is not None:
+        del reports[:]
+        result = function(context, **kwargs)
+        types._flush_updates(context.scene)
+        return result
+
+    cls = types._operators.get(idname)
+    if cls is None:
+        raise AttributeError(f'Calling operator "bpy.ops.{idname}" error, could not be found')
+
+    poll = getattr(cls, "poll", None)
+    if poll is not None and not poll(context):
+        raise RuntimeError(f"Operator bpy.ops.{idname}.poll() failed, context is incorrect")
+
+    operator = cls()
+    for name, value in kwargs.items():
+        prop = _find_property(cls, name)
+        if prop is None:
+            raise TypeError(f'Converting py args to operator properties: : keyword "{name}" unrecognized')
+        if prop.kind == "CollectionProperty":
+            # A collection takes a sequence of dicts, one per item, like in Blender
+            collection = getattr(operator, name)
+            for item_values in value:
+                item = collection.add()
+                for key, item_value in item_values.items():
+                    setattr(item, key, item_value)
+        else:
+            setattr(operator, name, value)
+
+    if execution_context.startswith('INVOKE') and hasattr(operator, "invoke"):
+        result = operator.invoke(context, None)
+    else:
+        if not hasattr(operator, "execute"):
+            raise RuntimeError(f"Operator bpy.ops.{idname} has no execute function")
+        result = operator.execute(context)
+
+    reports[:] = operator._reports
+    if 'FINISHED' in result:
+        types._flush_updates(context.scene)
+    for report_type, message in operator._reports:
+        if 'ERROR' in report_type:
+            raise RuntimeError(f"Error: {message}")
+    return result
+
+
+class _BPyOpsSubModOp:
+    def __init__(self, module, name):
+        self._idname = f"{module}.{name}"
+
+    def __call__(self, *args, **kwargs):
+        return _call(self._idname, args, kwargs)
+
+    def poll(self, *args):
+        import bpy
+        cls = types._operators.get(self._idname)
+        if cls is None:
+            return self._idname in _builtin
+        poll = getattr(cls, "poll", None)
+        return poll is None or bool(poll(bpy.context))
+
+    def idname_py(self):
+        return self._idname
+
+    def __repr__(self):
+        return f"bpy.ops.{self._idname}"
+
+
+class _BPyOpsSubMod:
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _BPyOpsSubModOp(self._module, name)
+
+
+def __getattr__(module):
+    if module.startswith("__"):
+        raise AttributeError(module)
+    return _BPyOpsSubMod(module)
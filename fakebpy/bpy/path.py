@@ -0,0 +1,24 @@
+"""Path helpers of bpy.path.
+
+Paths starting with "//" are relative to the open .blend file, which is
+bpy.data.filepath; with no file saved they resolve against the working
+directory.
+"""
+import os
+
+
+def abspath(path, start=None, library=None):
+    if isinstance(path, bytes):
+        path = path.decode("utf-8")
+    if not path.startswith("//"):
+        return path
+    if library is not None:
+        start = os.path.dirname(abspath(library.filepath))
+    if start is None:
+        import bpy
+        start = os.path.dirname(bpy.data.filepath) if bpy.data.filepath else os.getcwd()
+    return os.path.join(start, path[2:])
+
+
+def basename(path):
+    return os.path.basename(path[2:] if path.startswith("//") else path)
@@ -0,0 +1,54 @@
+"""Property definitions, deferred until a class is registered like in Blender."""
+
+
+class _PropertyDeferred:
+    """What bpy.props functions return: the function and its keywords."""
+
+    __slots__ = ("function", "keywords")
+
+    def __init__(self, function, keywords):
+        self.function = function
+        self.keywords = keywords
+
+    def __repr__(self):
+        return f"<_PropertyDeferred, {self.function.__name__}, {self.keywords!r}>"
+
+
+def BoolProperty(**keywords):
+    return _PropertyDeferred(BoolProperty, keywords)
+
+
+def IntProperty(**keywords):
+    return _PropertyDeferred(IntProperty, keywords)
+
+
+def FloatProperty(**keywords):
+    return _PropertyDeferred(FloatProperty, keywords)
+
+
+def StringProperty(**keywords):
+    return _PropertyDeferred(StringProperty, keywords)
+
+
+def EnumProperty(**keywords):
+    return _PropertyDeferred(EnumProperty, keywords)
+
+
+def BoolVectorProperty(**keywords):
+    return _PropertyDeferred(BoolVectorProperty, keywords)
+
+
+def IntVectorProperty(**keywords):
+    return _PropertyDeferred(IntVectorProperty, keywords)
+
+
+def FloatVectorProperty(**keywords):
+    return _PropertyDeferred(FloatVectorProperty, keywords)
+
+
+def PointerProperty(**keywords):
+    return _PropertyDeferred(PointerProperty, keywords)
+
+
+def CollectionProperty(**keywords):
+    return _PropertyDeferred(CollectionProperty, keywords)
@@ -0,0 +1,2032 @@
+"""RNA types: registrable base classes, data-blocks and the structs inside them.
+
+Only the surface the add-on touches is modelled, but that part follows
+Blender's rules where they catch real bugs: unknown attributes cannot be set
+on built-in structs, enum values are validated, `in` on RNA collections only
+takes names, names are made unique with .001 suffixes, and edits tag their
+data-block so depsgraph_update_post handlers see them after an operator or a
+view_layer.update() call.
+"""
+import copy
+import fnmatch
+import inspect
+import itertools
+import pickle
+
+import numpy as np
+
+from . import msgbus as _msgbus
+from .app import handlers as _handlers
+from .props import StringProperty, _PropertyDeferred
+
+
+MAX_NAME = 63
+
+
+# ---------------------------------------------------------------------------
+# Depsgraph tagging
+
+_tagged = {}
+
+
+def _tag(struct):
+    """Tag the data-block owning a struct as updated."""
+    while struct is not None:
+        if isinstance(struct, ID):
+            _tagged[id(struct)] = struct
+        struct = struct.__dict__.get("_owner")
+
+
+class DepsgraphUpdate:
+    def __init__(self, id_data):
+        self.id = id_data
+        self.is_updated_geometry = isinstance(id_data, (Object, Mesh))
+        self.is_updated_shading = isinstance(id_data, (Material, NodeTree, Image))
+        self.is_updated_transform = isinstance(id_data, Object)
+
+
+class Depsgraph:
+    def __init__(self, scene, ids):
+        self.scene = scene
+        self.view_layer = scene.view_layers[0] if scene is not None else None
+        self.updates = [DepsgraphUpdate(id_data) for id_data in ids]
+
+    def id_type_updated(self, id_type):
+        return any(type(update.id).__name__.upper() == id_type for update in self.updates)
+
+
+def _flush_updates(scene):
+    """Send the tagged data-blocks to the depsgraph_update_post handlers."""
+    if not _tagged:
+        return
+    ids = list(_tagged.values())
+    _tagged.clear()
+    _handlers._fire(_handlers.depsgraph_update_post, scene, Depsgraph(scene, ids))
+
+
+# ---------------------------------------------------------------------------
+# Structs and properties
+
+def _init(struct, **fields):
+    for name, value in fields.items():
+        object.__setattr__(struct, name, value)
+
+
+class _RNAMeta(type):
+    """Turns properties assigned to a type, like Scene.my_prop = PointerProperty(...), into RNA properties."""
+
+    def __setattr__(cls, name, value):
+        if isinstance(value, _PropertyDeferred):
+            value = _RNAProperty(name, value)
+        super().__setattr__(name, value)
+
+
+class bpy_struct(metaclass=_RNAMeta):
+    # Built-in structs refuse attributes RNA does not define
+    _strict = False
+
+    def __setattr__(self, name, value):
+        if not name.startswith("_"):
+            if self._strict and name not in self.__dict__ and not hasattr(type(self), name):
+                raise AttributeError(f'bpy_struct: attribute "{name}" from "{type(self).__name__}" is read-only')
+            object.__setattr__(self, name, value)
+            _tag(self)
+            _msgbus._publish(self, name)
+        else:
+            object.__setattr__(self, name, value)
+
+    @property
+    def id_data(self):
+        struct = self
+        while struct is not None and not isinstance(struct, ID):
+            struct = struct.__dict__.get("_owner")
+        return struct
+
+
+class bpy_prop_array(list):
+    """Fixed size float array that tags its owner when an item is set."""
+
+    def __init__(self, owner, values):
+        super().__init__(float(value) for value in values)
+        self._owner = owner
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = [float(v) for v in value]
+            if len(value) != len(range(*index.indices(len(self)))):
+                raise ValueError("bpy_prop_array[slice] = value: re-sizing bpy_struct arrays isn't supported")
+        else:
+            value = float(value)
+        super().__setitem__(index, value)
+        _tag(self._owner)
+
+    def _assign(self, values):
+        values = [float(value) for value in values]
+        if len(values) != len(self):
+            raise ValueError(f"sequences of size {len(self)} expected, got {len(values)}")
+        list.__setitem__(self, slice(None), values)
+        _tag(self._owner)
+
+
+class _FloatArrayAttr:
+    """A float vector member that keeps its identity, like RNA arrays."""
+
+    def __init__(self, size):
+        self.size = size
+
+    def __set_name__(self, owner, name):
+        self.slot = "_" + name
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        array = obj.__dict__.get(self.slot)
+        if array is None:
+            array = bpy_prop_array(obj, (0.0,) * self.size)
+            object.__setattr__(obj, self.slot, array)
+        return array
+
+    def __set__(self, obj, value):
+        self.__get__(obj, type(obj))._assign(value)
+
+
+class _EnumAttr:
+    """An enum member of a built-in struct, validated on assignment."""
+
+    def __init__(self, items, default):
+        self.items = tuple(items)
+        self.default = default
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.slot = "_" + name
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        return obj.__dict__.get(self.slot, self.default)
+
+    def __set__(self, obj, value):
+        if value not in self.items:
+            raise TypeError(f'bpy_struct: item.attr = val: enum "{value}" not found in {self.items}')
+        object.__setattr__(obj, self.slot, value)
+
+
+def _enum_identifiers(items):
+    return [item[0] for item in items if item]
+
+
+def _enum_number(item, index):
+    # (identifier, name, description, number) or (..., icon, number)
+    if len(item) == 4 and isinstance(item[3], int):
+        return item[3]
+    if len(item) == 5:
+        return item[4]
+    return index
+
+
+class _RNAProperty:
+    """Descriptor for a property defined with bpy.props."""
+
+    def __init__(self, name, deferred):
+        self.name = name
+        self.kind = deferred.function.__name__
+        self.keywords = dict(deferred.keywords)
+        self.update = self.keywords.get("update")
+        self.getter = self.keywords.get("get")
+        self.setter = self.keywords.get("set")
+        self.type = self.keywords.get("type")
+        if self.kind in ("PointerProperty", "CollectionProperty") and self.type is None:
+            raise TypeError(f"{self.kind}(...) expected an RNA type, failed with type 'NoneType'")
+
+    def __repr__(self):
+        return f"<bpy property {self.kind} {self.name!r}>"
+
+    def _is_plain_enum(self):
+        return self.kind == "EnumProperty" and "ENUM_FLAG" not in self.keywords.get("options", ())
+
+    def _is_dynamic_enum(self):
+        return self._is_plain_enum() and callable(self.keywords.get("items"))
+
+    def _enum_identifier(self, obj, number):
+        # The identifier of the item with that number now, "" when no item has it
+        items = [item for item in self._enum_items(obj) if item]
+        for index, item in enumerate(items):
+            if _enum_number(item, index) == number:
+                return item[0]
+        return ""
+
+    def _enum_value_number(self, obj, value):
+        items = [item for item in self._enum_items(obj) if item]
+        return next(_enum_number(item, index) for index, item in enumerate(items) if item[0] == value)
+
+    def _size(self):
+        if "size" in self.keywords:
+            return self.keywords["size"]
+        return len(self.keywords.get("default", (0, 0, 0)))
+
+    def _enum_items(self, obj):
+        items = self.keywords.get("items", ())
+        if callable(items):
+            import bpy
+            items = items(obj, bpy.context) or ()
+        return items
+
+    def _default(self, obj):
+        keywords = self.keywords
+        kind = self.kind
+        if kind == "BoolProperty":
+            return bool(keywords.get("default", False))
+        if kind == "IntProperty":
+            return int(keywords.get("default", 0))
+        if kind == "FloatProperty":
+            return float(keywords.get("default", 0.0))
+        if kind == "StringProperty":
+            return str(keywords.get("default", ""))
+        if kind in ("FloatVectorProperty", "IntVectorProperty", "BoolVectorProperty"):
+            default = keywords.get("default", (0,) * self._size())
+            return tuple(default)
+        if kind == "EnumProperty":
+            if "ENUM_FLAG" in keywords.get("options", ()):
+                return set(keywords.get("default", ()))
+            if "default" in keywords:
+                return keywords["default"]
+            items = self.keywords.get("items", ())
+            if callable(items):
+                return None
+            identifiers = _enum_identifiers(items)
+            return identifiers[0] if identifiers else ""
+        if kind == "PointerProperty":
+            if _is_property_group(self.type):
+                group = self.type()
+                _init(group, _owner=obj)
+                return group
+            return None
+        if kind == "CollectionProperty":
+            return bpy_prop_collection_idprop(obj, self.type)
+        raise TypeError(f"unsupported property {kind}")
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        if self.getter is not None:
+            value = self.getter(obj)
+            if self._is_plain_enum():
+                # Enum getters return the item number, like in Blender
+                return self._enum_identifier(obj, value)
+            return value
+        values = obj.__dict__.get("_rna_values")
+        if values is None:
+            values = {}
+            object.__setattr__(obj, "_rna_values", values)
+        if self._is_dynamic_enum():
+            # Blender keeps the item number, so the same number can name another item once the items change
+            default = self.keywords.get("default", 0)
+            return self._enum_identifier(obj, values.get(self.name, default if isinstance(default, int) else 0))
+        if self.name in values:
+            value = values[self.name]
+        else:
+            value = self._default(obj)
+            if self.kind in ("PointerProperty", "CollectionProperty") or value is not None:
+                values[self.name] = value
+        return value
+
+    def _coerce(self, obj, value):
+        kind = self.kind
+        keywords = self.keywords
+        if kind == "BoolProperty":
+            if not isinstance(value, (bool, int, np.integer, np.bool_)) or value not in (0, 1):
+                raise TypeError(f"bpy_struct: item.attr = val: {type(obj).__name__}.{self.name} expected True/False or 0/1, not {type(value).__name__}")
+            return bool(value)
+        if kind == "IntProperty":
+            if not isinstance(value, (int, np.integer)):
+                raise TypeError(f"bpy_struct: item.attr = val: {type(obj).__name__}.{self.name} expected an int type, not {type(value).__name__}")
+            value = int(value)
+            return min(max(value, keywords.get("min", value)), keywords.get("max", value))
+        if kind == "FloatProperty":
+            if not isinstance(value, (int, float, np.number)):
+                raise TypeError(f"bpy_struct: item.attr = val: {type(obj).__name__}.{self.name} expected a float type, not {type(value).__name__}")
+            value = float(value)
+            return min(max(value, keywords.get("min", value)), keywords.get("max", value))
+        if kind == "StringProperty":
+            if not isinstance(value, str):
+                raise TypeError(f"bpy_struct: item.attr = val: {type(obj).__name__}.{self.name} expected a string type, not {type(value).__name__}")
+            return value
+        if kind in ("FloatVectorProperty", "IntVectorProperty", "BoolVectorProperty"):
+            size = self._size()
+            value = tuple(value)
+            if len(value) != size:
+                raise ValueError(f"bpy_struct: item.attr = val: {type(obj).__name__}.{self.name} expected sequence size {size}, got {len(value)}")
+            return value
+        if kind == "EnumProperty":
+            identifiers = _enum_identifiers(self._enum_items(obj))
+            if "ENUM_FLAG" in keywords.get("options", ()):
+                value = set(value)
+                missing = value.difference(identifiers)
+                if missing:
+                    raise TypeError(f'bpy_struct: item.attr = val: enum "{missing.pop()}" not found in {tuple(identifiers)}')
+                return value
+            if value not in identifiers:
+                raise TypeError(f'bpy_struct: item.attr = val: enum "{value}" not found in {tuple(identifiers)}')
+            return value
+        if kind == "PointerProperty":
+            if _is_property_group(self.type):
+                raise AttributeError(f'bpy_struct: attribute "{self.name}" from "{type(obj).__name__}" is read-only')
+            if value is not None and not isinstance(value, self.type):
+                raise TypeError(f"{type(obj).__name__}.{self.name} expected a {self.type.__name__} type, not {type(value).__name__}")
+            return value
+        raise AttributeError(f'bpy_struct: attribute "{self.name}" from "{type(obj).__name__}" is read-only')
+
+    def __set__(self, obj, value):
+        value = self._coerce(obj, value)
+        if self.setter is not None:
+            if self._is_plain_enum():
+                value = self._enum_value_number(obj, value)
+            self.setter(obj, value)
+        else:
+            values = obj.__dict__.get("_rna_values")
+            if values is None:
+                values = {}
+                object.__setattr__(obj, "_rna_values", values)
+            if self._is_dynamic_enum():
+                value = self._enum_value_number(obj, value)
+            values[self.name] = value
+        _tag(obj)
+        if self.update is not None:
+            import bpy
+            self.update(obj, bpy.context)
+
+
+# ---------------------------------------------------------------------------
+# Collections
+
+class bpy_prop_collection:
+    """Ordered items looked up by index or by name."""
+
+    def __init__(self, owner=None, items=None):
+        _init(self, _owner=owner, _items=list(items) if items is not None else [])
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def _lookup(self, key):
+        for item in self._items:
+            if getattr(item, "name", None) == key:
+                return item
+        return None
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            item = self._lookup(key)
+            if item is None:
+                raise KeyError(f'bpy_prop_collection[key]: key "{key}" not found')
+            return item
+        if isinstance(key, slice):
+            return self._items[key]
+        if isinstance(key, (int, np.integer)):
+            try:
+                return self._items[key]
+            except IndexError:
+                raise IndexError(f"bpy_prop_collection[index]: index {key} out of range, size {len(self._items)}") from None
+        raise TypeError(f"bpy_prop_collection[key]: invalid key, must be a string or an int, not {type(key).__name__}")
+
+    def __contains__(self, key):
+        if not isinstance(key, str):
+            raise TypeError(f"bpy_prop_collection.__contains__: expected a string or a tuple of strings, not {type(key).__name__}")
+        return self._lookup(key) is not None
+
+    def get(self, key, default=None):
+        if not isinstance(key, str):
+            raise TypeError(f"bpy_prop_collection.get(key, ...): key must be a string, not {type(key).__name__}")
+        item = self._lookup(key)
+        return default if item is None else item
+
+    def find(self, key):
+        for index, item in enumerate(self._items):
+            if getattr(item, "name", None) == key:
+                return index
+        return -1
+
+    def keys(self):
+        return [item.name for item in self._items]
+
+    def values(self):
+        return list(self._items)
+
+    def items(self):
+        return [(item.name, item) for item in self._items]
+
+    def foreach_get(self, attr, seq):
+        flat = []
+        for item in self._items:
+            value = getattr(item, attr)
+            if isinstance(value, (list, tuple)):
+                flat.extend(value)
+            else:
+                flat.append(value)
+        if len(seq) != len(flat):
+            raise TypeError(f"foreach_get(attr, sequence) sequence size mismatch, expected {len(flat)}, got {len(seq)}")
+        seq[:] = flat
+
+    def foreach_set(self, attr, seq):
+        flat = np.asarray(seq).ravel().tolist() if not isinstance(seq, list) else seq
+        if not self._items:
+            if len(flat):
+                raise TypeError("foreach_set(attr, sequence) sequence size mismatch")
+            return
+        sample = getattr(self._items[0], attr)
+        width = len(sample) if isinstance(sample, (list, tuple)) else 1
+        if len(flat) != width * len(self._items):
+            raise TypeError(f"foreach_set(attr, sequence) sequence size mismatch, expected {width * len(self._items)}, got {len(flat)}")
+        for index, item in enumerate(self._items):
+            if width == 1:
+                setattr(item, attr, flat[index])
+            else:
+                setattr(item, attr, flat[index * width:(index + 1) * width])
+        _tag(self._owner)
+
+
+class bpy_prop_collection_idprop(bpy_prop_collection):
+    """A CollectionProperty of PropertyGroup items."""
+
+    def __init__(self, owner, item_type):
+        super().__init__(owner)
+        _init(self, _type=item_type)
+
+    def add(self):
+        item = self._type()
+        _init(item, _owner=self._owner)
+        self._items.append(item)
+        _tag(self._owner)
+        return item
+
+    def remove(self, index):
+        if not 0 <= index < len(self._items):
+            raise IndexError(f"bpy_prop_collection.remove(): index {index} out of range")
+        del self._items[index]
+        _tag(self._owner)
+
+    def move(self, from_index, to_index):
+        item = self._items.pop(from_index)
+        self._items.insert(to_index, item)
+        _tag(self._owner)
+
+    def clear(self):
+        self._items.clear()
+        _tag(self._owner)
+
+
+def _unique_name(name, taken):
+    name = name[:MAX_NAME]
+    if name not in taken:
+        return name
+    base, dot, suffix = name.rpartition(".")
+    if not (dot and suffix.isdigit() and len(suffix) == 3):
+        base = name
+    for number in itertools.count(1):
+        candidate = f"{base[:MAX_NAME - 4]}.{number:03d}"
+        if candidate not in taken:
+            return candidate
+
+
+class _NamedCollection(bpy_prop_collection):
+    """Collection with unique names and O(1) name lookups."""
+
+    def __init__(self, owner=None):
+        super().__init__(owner)
+        _init(self, _by_name={})
+
+    def _lookup(self, key):
+        return self._by_name.get(key)
+
+    def _insert(self, item, name):
+        name = _unique_name(name, self._by_name)
+        object.__setattr__(item, "_name", name)
+        self._by_name[name] = item
+        self._items.append(item)
+        return item
+
+    def _discard(self, item):
+        self._items.remove(item)
+        self._by_name.pop(item._name, None)
+
+    def _rename(self, item, name):
+        if name == item._name:
+            return
+        del self._by_name[item._name]
+        name = _unique_name(name, self._by_name)
+        object.__setattr__(item, "_name", name)
+        self._by_name[name] = item
+
+
+# ---------------------------------------------------------------------------
+# Registrable base classes
+
+_registered = {}
+_operators = {}
+
+
+class PropertyGroup(bpy_struct):
+    """Base of user defined property groups; every group gets a name property."""
+
+    def __getitem__(self, key):
+        return self.__dict__.setdefault("_idprops", {})[key]
+
+    def __setitem__(self, key, value):
+        self.__dict__.setdefault("_idprops", {})[key] = _idprop_value(key, value)
+
+    def get(self, key, default=None):
+        return self.__dict__.get("_idprops", {}).get(key, default)
+
+
+
+def _is_property_group(cls):
+    return isinstance(cls, type) and issubclass(cls, PropertyGroup)
+
+
+class Operator(bpy_struct):
+    bl_options = {'REGISTER'}
+    bl_description = ""
+    bl_label = ""
+
+    def __init__(self):
+        _init(self, layout=None, _reports=[])
+
+    @property
+    def properties(self):
+        return self
+
+    def report(self, type, message):
+        self._reports.append((set(type), message))
+
+    def as_keywords(self, ignore=()):
+        keywords = {}
+        for name in dir(type(self)):
+            if name in ignore or name.startswith("_"):
+                continue
+            if isinstance(inspect.getattr_static(type(self), name, None), _RNAProperty):
+                keywords[name] = getattr(self, name)
+        return keywords
+
+
+class OperatorFileListElement(PropertyGroup):
+    pass
+
+
+class Macro(Operator):
+    pass
+
+
+class Panel(bpy_struct):
+    bl_label = ""
+    bl_options = set()
+
+    def __init__(self):
+        _init(self, layout=UILayout())
+
+    @classmethod
+    def _dyn_ui_initialize(cls):
+        draw_funcs = cls.__dict__.get("_draw_funcs")
+        if draw_funcs is None:
+            draw_funcs = []
+            type.__setattr__(cls, "_draw_funcs", draw_funcs)
+        return draw_funcs
+
+    @classmethod
+    def append(cls, draw_func):
+        cls._dyn_ui_initialize().append(draw_func)
+
+    @classmethod
+    def prepend(cls, draw_func):
+        cls._dyn_ui_initialize().insert(0, draw_func)
+
+    @classmethod
+    def remove(cls, draw_func):
+        try:
+            cls._dyn_ui_initialize().remove(draw_func)
+        except ValueError:
+            pass
+
+
+class Menu(Panel):
+    pass
+
+
+class Header(Panel):
+    pass
+
+
+class AddonPreferences(bpy_struct):
+    pass
+
+
+class UIList(bpy_struct):
+    bitflag_filter_item = 1 << 30
+    layout_type = 'DEFAULT'
+
+    def __init__(self):
+        _init(
+            self,
+            filter_name="",
+            use_filter_invert=False,
+            use_filter_sort_alpha=False,
+            use_filter_sort_reverse=False,
+            use_filter_show=False,
+            list_id="",
+        )
+
+
+class UI_UL_list(UIList):
+
+    @staticmethod
+    def filter_items_by_name(pattern, bitflag, items, propname="name", flags=None, reverse=False):
+        if not pattern or not items:
+            return flags or []
+        if flags is None:
+            flags = [0] * len(items)
+        pattern = "*" + pattern.lower() + "*"
+        for i, item in enumerate(items):
+            name = getattr(item, propname, None)
+            if name is not None and fnmatch.fnmatchcase(name.lower(), pattern) != reverse:
+                flags[i] |= bitflag
+        return flags
+
+    @staticmethod
+    def sort_items_helper(sort_data, key, reverse=False):
+        sort_data.sort(key=key, reverse=reverse)
+        neworder = [None] * len(sort_data)
+        for newidx, (orgidx, *_) in enumerate(sort_data):
+            neworder[orgidx] = newidx
+        return neworder
+
+    @classmethod
+    def sort_items_by_name(cls, items, propname="name"):
+        sort_data = [(index, getattr(item, propname, "")) for index, item in enumerate(items)]
+        return cls.sort_items_helper(sort_data, lambda entry: entry[1].lower())
+
+
+# Built-in panels add-ons append draw functions to
+class VIEW3D_PT_tools_brush_settings(Panel):
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+
+
+class VIEW3D_PT_tools_brush_color(Panel):
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+
+
+class IMAGE_PT_paint_stroke(Panel):
+    bl_space_type = 'IMAGE_EDITOR'
+    bl_region_type = 'UI'
+
+
+class VIEW3D_MT_paint_gpencil(Menu):
+    pass
+
+
+_REGISTRABLE = (PropertyGroup, Operator, Panel, UIList, AddonPreferences)
+
+
+def _iter_annotations(cls):
+    for klass in reversed(cls.__mro__):
+        if klass is object:
+            continue
+        for name, value in inspect.get_annotations(klass).items():
+            if isinstance(value, _PropertyDeferred):
+                yield name, value
+
+
+def _register_class(cls):
+    if not isinstance(cls, type) or not issubclass(cls, _REGISTRABLE):
+        raise ValueError(f"register_class(...): expected a subclass of a registrable RNA type, not {cls!r}")
+    if cls.__dict__.get("_is_registered"):
+        raise ValueError(f"register_class(...): already registered as a subclass '{cls.__name__}'")
+
+    if issubclass(cls, Operator):
+        idname = getattr(cls, "bl_idname", "")
+        module, dot, name = idname.partition(".")
+        if not dot or not module or not name or "." in name or idname != idname.lower():
+            raise RuntimeError(f"Error: Registering operator class: '{cls.__name__}', invalid bl_idname '{idname}', must be 'category.name' in lower case")
+        if idname in _operators:
+            raise RuntimeError(f"Error: Registering operator class: '{cls.__name__}', bl_idname '{idname}' is already registered")
+
+    for name, deferred in _iter_annotations(cls):
+        prop_type = deferred.keywords.get("type")
+        if deferred.function.__name__ in ("PointerProperty", "CollectionProperty") and _is_property_group(prop_type):
+            if not prop_type.__dict__.get("_is_registered"):
+                raise ValueError(f"bpy_struct \"{cls.__name__}\" registration error: '{name}' {deferred.function.__name__} could not register (type '{prop_type.__name__}' is not registered)")
+        type.__setattr__(cls, name, _RNAProperty(name, deferred))
+
+    if issubclass(cls, PropertyGroup) and not isinstance(inspect.getattr_static(cls, "name", None), _RNAProperty):
+        type.__setattr__(cls, "name", _RNAProperty("name", StringProperty(name="Name")))
+
+    type.__setattr__(cls, "_is_registered", True)
+    _registered[cls.__name__] = cls
+    if issubclass(cls, Operator):
+        _operators[cls.bl_idname] = cls
+
+
+def _unregister_class(cls):
+    if not cls.__dict__.get("_is_registered"):
+        raise RuntimeError(f"unregister_class(...):, missing bl_rna attribute from '{type(cls).__name__}' instance (may not be registered)")
+    type.__setattr__(cls, "_is_registered", False)
+    _registered.pop(cls.__name__, None)
+    if issubclass(cls, Operator):
+        _operators.pop(cls.bl_idname, None)
+
+
+# Built-in types are always registered
+type.__setattr__(UI_UL_list, "_is_registered", True)
+_registered["UI_UL_list"] = UI_UL_list
+type.__setattr__(OperatorFileListElement, "name", _RNAProperty("name", StringProperty(name="Name", subtype='FILE_NAME')))
+type.__setattr__(OperatorFileListElement, "_is_registered", True)
+
+
+# ---------------------------------------------------------------------------
+# UI layout
+
+class UILayout:
+    """Records what draw code asks for and checks that props and operators exist.
+
+    Problems Blender would print while drawing are collected in `errors`.
+    template_list runs the list's filter_items and draw_item for the rows it shows.
+    """
+
+    def __init__(self, root=None):
+        self._root = root or self
+        if root is None:
+            self.calls = []
+            self.errors = []
+        self.active = True
+        self.enabled = True
+        self.alert = False
+        self.alignment = 'EXPAND'
+        self.scale_x = 1.0
+        self.scale_y = 1.0
+        self.use_property_split = False
+        self.use_property_decorate = True
+        self.operator_context = 'INVOKE_DEFAULT'
+
+    def _record(self, name, args, kwargs):
+        self._root.calls.append((name, args, kwargs))
+
+    def _child(self, name, args, kwargs):
+        self._record(name, args, kwargs)
+        return UILayout(self._root)
+
+    def row(self, *args, **kwargs):
+        return self._child("row", args, kwargs)
+
+    def column(self, *args, **kwargs):
+        return self._child("column", args, kwargs)
+
+    def box(self, *args, **kwargs):
+        return self._child("box", args, kwargs)
+
+    def split(self, *args, **kwargs):
+        return self._child("split", args, kwargs)
+
+    def grid_flow(self, *args, **kwargs):
+        return self._child("grid_flow", args, kwargs)
+
+    def column_flow(self, *args, **kwargs):
+        return self._child("column_flow", args, kwargs)
+
+    def label(self, *args, **kwargs):
+        self._record("label", args, kwargs)
+
+    def separator(self, *args, **kwargs):
+        self._record("separator", args, kwargs)
+
+    def _check_prop(self, data, property):
+        if data is None:
+            self._root.errors.append(f"prop: data is None for '{property}'")
+        elif not hasattr(data, property):
+            self._root.errors.append(f"prop: property not found: {type(data).__name__}.{property}")
+
+    def prop(self, data, property, **kwargs):
+        self._check_prop(data, property)
+        self._record("prop", (data, property), kwargs)
+
+    def prop_search(self, data, property, search_data, search_property, **kwargs):
+        self._check_prop(data, property)
+        self._record("prop_search", (data, property, search_data, search_property), kwargs)
+
+    def _operator_properties(self, operator):
+        from . import ops
+        cls = _operators.get(operator)
+        if cls is None and operator not in ops._builtin:
+            self._root.errors.append(f"operator: unknown operator '{operator}'")
+            return OperatorProperties(None)
+        return OperatorProperties(cls)
+
+    def operator(self, operator, **kwargs):
+        self._record("operator", (operator,), kwargs)
+        return self._operator_properties(operator)
+
+    def operator_menu_enum(self, operator, property, **kwargs):
+        self._record("operator_menu_enum", (operator, property), kwargs)
+        properties = self._operator_properties(operator)
+        if properties._cls is not None and not isinstance(inspect.getattr_static(properties._cls, property, None), _RNAProperty):
+            self._root.errors.append(f"operator_menu_enum: '{operator}' has no property '{property}'")
+        return properties
+
+    def menu(self, *args, **kwargs):
+        self._record("menu", args, kwargs)
+
+    def popover(self, *args, **kwargs):
+        self._record("popover", args, kwargs)
+
+    def template_color_ramp(self, data, property, **kwargs):
+        self._check_prop(data, property)
+        self._record("template_color_ramp", (data, property), kwargs)
+
+    def template_curve_mapping(self, data, property, **kwargs):
+        self._check_prop(data, property)
+        self._record("template_curve_mapping", (data, property), kwargs)
+
+    def template_icon(self, *args, **kwargs):
+        self._record("template_icon", args, kwargs)
+
+    def template_preview(self, *args, **kwargs):
+        self._record("template_preview", args, kwargs)
+
+    def template_list(self, listtype_name, list_id, dataptr, propname, active_dataptr, active_propname, rows=5, **kwargs):
+        self._record("template_list", (listtype_name, list_id, dataptr, propname, active_dataptr, active_propname), dict(kwargs, rows=rows))
+        self._check_prop(dataptr, propname)
+        self._check_prop(active_dataptr, active_propname)
+        cls = _registered.get(listtype_name)
+        if cls is None or not issubclass(cls, UIList):
+            self._root.errors.append(f"template_list: unknown list type '{listtype_name}'")
+            return
+        items = list(getattr(dataptr, propname, ()))
+        ui_list = cls()
+        flags, order = [], []
+        filter_items = getattr(ui_list, "filter_items", None)
+        if filter_items is not None:
+            import bpy
+            flags, order = filter_items(bpy.context, dataptr, propname)
+        visible = [i for i in range(len(items)) if not flags or flags[i] & UIList.bitflag_filter_item]
+        if order:
+            visible.sort(key=lambda i: order[i])
+        draw_item = getattr(ui_list, "draw_item", None)
+        if draw_item is None:
+            return
+        import bpy
+        for index in visible[:max(rows, 1)]:
+            draw_item(bpy.context, UILayout(self._root), dataptr, items[index], 0, active_dataptr, active_propname, index)
+
+
+class OperatorProperties:
+    """Properties of an operator button; unknown names are reported, not raised."""
+
+    def __init__(self, cls):
+        object.__setattr__(self, "_cls", cls)
+
+    def __setattr__(self, name, value):
+        if self._cls is not None and not isinstance(inspect.getattr_static(self._cls, name, None), _RNAProperty):
+            raise AttributeError(f'bpy_struct: attribute "{name}" from "{self._cls.__name__}" is read-only')
+        object.__setattr__(self, name, value)
+
+
+# ---------------------------------------------------------------------------
+# ID data-blocks
+
+def _idprop_value(key, value):
+    if not isinstance(key, str):
+        raise KeyError("only strings are allowed as keys of ID properties")
+    if len(key) > MAX_NAME:
+        raise KeyError(f"the length of IDProperty names is limited to {MAX_NAME} characters")
+    if isinstance(value, (bool, int, float, str, ID)):
+        return value
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, dict):
+        group = IDPropertyGroup()
+        for sub_key, sub_value in value.items():
+            group[sub_key] = _idprop_value(sub_key, sub_value)
+        return group
+    if isinstance(value, (list, tuple, np.ndarray)):
+        values = value.tolist() if isinstance(value, np.ndarray) else list(value)
+        if all(isinstance(v, (int, float, bool)) for v in values):
+            return IDPropertyArray(values)
+        return [_idprop_value(key, v) for v in values]
+    raise TypeError(f"Cannot assign a '{type(value).__name__}' value to the existing '{key}' Group IDProperty")
+
+
+class IDPropertyGroup(dict):
+    def to_dict(self):
+        return {key: value.to_dict() if isinstance(value, IDPropertyGroup) else value for key, value in self.items()}
+
+
+class IDPropertyArray(list):
+    def to_list(self):
+        return list(self)
+
+
+class _IDProperties:
+    """Custom properties, like obj["key"], of data-blocks and nodes."""
+
+    def __getitem__(self, key):
+        return self._idprops[key]
+
+    def __setitem__(self, key, value):
+        self._idprops[key] = _idprop_value(key, value)
+        _tag(self)
+
+    def __delitem__(self, key):
+        del self._idprops[key]
+        _tag(self)
+
+    def __contains__(self, key):
+        return key in self._idprops
+
+    def get(self, key, default=None):
+        return self._idprops.get(key, default)
+
+    def keys(self):
+        return list(self._idprops.keys())
+
+    def values(self):
+        return list(self._idprops.values())
+
+    def items(self):
+        return list(self._idprops.items())
+
+    def pop(self, key, *default):
+        value = self._idprops.pop(key, *default)
+        _tag(self)
+        return value
+
+
+class ID(_IDProperties, bpy_struct):
+    _strict = True
+    _data_name = "ids"
+
+    def __init__(self, name=""):
+        _init(
+            self,
+            _name=name[:MAX_NAME],
+            _collection=None,
+            _owner=None,
+            _idprops={},
+            use_fake_user=False,
+            library=None,
+            is_embedded_data=False,
+        )
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        if not isinstance(value, str):
+            raise TypeError(f"bpy_struct: item.attr = val: {type(self).__name__}.name expected a string type, not {type(value).__name__}")
+        if self._collection is not None:
+            self._collection._rename(self, value)
+        else:
+            object.__setattr__(self, "_name", value[:MAX_NAME])
+
+    @property
+    def name_full(self):
+        return self._name
+
+    @property
+    def users(self):
+        return 1 if self.use_fake_user else 0
+
+
+    def __repr__(self):
+        collection = self._collection
+        if collection is None:
+            return f"<{type(self).__name__} '{self._name}'>"
+        return f"bpy.data.{collection._id_type._data_name}['{self._name}']"
+
+
+# ---------------------------------------------------------------------------
+# Color ramps and curve mappings
+
+def _sample_stops(positions, colors, interpolation, x):
+    if len(positions) == 1:
+        return colors[0]
+    order = np.argsort(positions, kind="stable")
+    positions = np.asarray(positions)[order]
+    colors = np.asarray(colors)[order]
+    if x <= positions[0]:
+        return colors[0]
+    if x >= positions[-1]:
+        return colors[-1]
+    right = int(np.searchsorted(positions, x, side="right"))
+    left = right - 1
+    if interpolation == 'CONSTANT':
+        return colors[left]
+    span = positions[right] - positions[left]
+    t = (x - positions[left]) / span if span > 0 else 0.0
+    if interpolation == 'EASE':
+        t = t * t * (3.0 - 2.0 * t)
+    return colors[left] * (1.0 - t) + colors[right] * t
+
+
+class ColorRampElement(bpy_struct):
+    _strict = True
+    color = _FloatArrayAttr(4)
+
+    def __init__(self, owner, position, color):
+        _init(self, _owner=owner, _position=0.0, select=False)
+        self.__dict__["_color"] = bpy_prop_array(self, color)
+        self.position = position
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        object.__setattr__(self, "_position", min(max(float(value), 0.0), 1.0))
+
+    @property
+    def alpha(self):
+        return self.color[3]
+
+    @alpha.setter
+    def alpha(self, value):
+        self.color[3] = value
+
+
+class ColorRampElements(bpy_prop_collection):
+    MAX_ELEMENTS = 32
+
+    def new(self, position):
+        if len(self._items) >= self.MAX_ELEMENTS:
+            raise RuntimeError("Error: Unable to add element to colorband (limit 32)")
+        ramp = self._owner
+        color = ramp.evaluate(position)
+        element = ColorRampElement(ramp, position, color)
+        index = 0
+        while index < len(self._items) and self._items[index].position <= element.position:
+            index += 1
+        self._items.insert(index, element)
+        _tag(ramp)
+        return element
+
+    def remove(self, element):
+        if len(self._items) < 2 or element not in self._items:
+            raise RuntimeError("Error: Element not found in element collection or last element")
+        self._items.remove(element)
+        _tag(self._owner)
+
+
+class ColorRamp(bpy_struct):
+    _strict = True
+    interpolation = _EnumAttr(('EASE', 'CARDINAL', 'LINEAR', 'B_SPLINE', 'CONSTANT'), 'LINEAR')
+    color_mode = _EnumAttr(('RGB', 'HSV', 'HSL'), 'RGB')
+    hue_interpolation = _EnumAttr(('NEAR', 'FAR', 'CW', 'CCW'), 'NEAR')
+
+    def __init__(self, owner):
+        _init(self, _owner=owner)
+        elements = ColorRampElements(self)
+        elements._items.extend((
+            ColorRampElement(self, 0.0, (0.0, 0.0, 0.0, 1.0)),
+            ColorRampElement(self, 1.0, (1.0, 1.0, 1.0, 1.0)),
+        ))
+        _init(self, elements=elements)
+
+    def evaluate(self, position):
+        """Linear, ease or constant blend of the stops; other modes fall back to linear."""
+        items = self.elements._items
+        if not items:
+            return (0.0, 0.0, 0.0, 0.0)
+        positions = [element.position for element in items]
+        colors = [list(element.color) for element in items]
+        return tuple(float(c) for c in _sample_stops(positions, colors, self.interpolation, float(position)))
+
+
+class CurveMapPoint(bpy_struct):
+    _strict = True
+    location = _FloatArrayAttr(2)
+    handle_type = _EnumAttr(('AUTO', 'AUTO_CLAMPED', 'VECTOR'), 'AUTO')
+
+    def __init__(self, owner, x, y):
+        _init(self, _owner=owner, select=False)
+        self.__dict__["_location"] = bpy_prop_array(self, (x, y))
+
+
+class CurveMapPoints(bpy_prop_collection):
+
+    def new(self, position, value):
+        point = CurveMapPoint(self._owner, position, value)
+        index = 0
+        while index < len(self._items) and self._items[index].location[0] <= position:
+            index += 1
+        self._items.insert(index, point)
+        _tag(self._owner)
+        return point
+
+    def remove(self, point):
+        if len(self._items) <= 2 or point not in self._items:
+            raise RuntimeError("Error: Unable to remove curve point")
+        self._items.remove(point)
+        _tag(self._owner)
+
+
+class CurveMap(bpy_struct):
+    _strict = True
+
+    def __init__(self, owner, points=((0.0, 0.0), (1.0, 1.0))):
+        _init(self, _owner=owner)
+        curve_points = CurveMapPoints(self)
+        curve_points._items.extend(CurveMapPoint(self, x, y) for x, y in points)
+        _init(self, points=curve_points)
+
+    def _sort(self):
+        self.points._items.sort(key=lambda point: point.location[0])
+
+
+class CurveMapping(bpy_struct):
+    _strict = True
+
+    def __init__(self, owner, count, points=((0.0, 0.0), (1.0, 1.0))):
+        _init(self, _owner=owner, use_clip=True, clip_min_x=0.0, clip_min_y=0.0, clip_max_x=1.0, clip_max_y=1.0)
+        _init(self, curves=bpy_prop_collection(self, [CurveMap(self, points) for _ in range(count)]))
+
+    def update(self):
+        for curve in self.curves:
+            curve._sort()
+        _tag(self)
+
+    def initialize(self):
+        pass
+
+    def evaluate(self, curve, position):
+        locations = [tuple(point.location) for point in curve.points]
+        xs = [x for x, _ in locations]
+        ys = [[y] for _, y in locations]
+        return float(_sample_stops(xs, ys, 'LINEAR', float(position))[0])
+
+
+# ---------------------------------------------------------------------------
+# Node trees
+
+class Node(_IDProperties, bpy_struct):
+    _strict = True
+    bl_idname = "Node"
+    node_type = 'CUSTOM'
+    default_name = "Node"
+
+    def __init__(self, tree):
+        _init(self, _owner=tree, _name="", _idprops={}, label="", hide=False, mute=False, select=True, width=140.0, parent=None)
+        self.__dict__["_location"] = bpy_prop_array(self, (0.0, 0.0))
+        _init(self, inputs=bpy_prop_collection(self), outputs=bpy_prop_collection(self))
+
+    location = _FloatArrayAttr(2)
+
+    @property
+    def type(self):
+        return self.node_type
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._owner.nodes._rename(self, value)
+
+
+class ShaderNodeValToRGB(Node):
+    bl_idname = "ShaderNodeValToRGB"
+    node_type = 'VALTORGB'
+    default_name = "Color Ramp"
+
+    def __init__(self, tree):
+        super().__init__(tree)
+        _init(self, color_ramp=ColorRamp(self))
+
+
+class ShaderNodeRGBCurve(Node):
+    bl_idname = "ShaderNodeRGBCurve"
+    node_type = 'CURVE_RGB'
+    default_name = "RGB Curves"
+
+    def __init__(self, tree):
+        super().__init__(tree)
+        _init(self, mapping=CurveMapping(self, 4))
+
+
+class ShaderNodeBsdfPrincipled(Node):
+    bl_idname = "ShaderNodeBsdfPrincipled"
+    node_type = 'BSDF_PRINCIPLED'
+    default_name = "Principled BSDF"
+
+
+class ShaderNodeOutputMaterial(Node):
+    bl_idname = "ShaderNodeOutputMaterial"
+    node_type = 'OUTPUT_MATERIAL'
+    default_name = "Material Output"
+
+
+class ShaderNodeTexImage(Node):
+    bl_idname = "ShaderNodeTexImage"
+    node_type = 'TEX_IMAGE'
+    default_name = "Image Texture"
+
+    def __init__(self, tree):
+        super().__init__(tree)
+        _init(self, image=None)
+
+
+_NODE_TYPES = {cls.bl_idname: cls for cls in (
+    ShaderNodeValToRGB, ShaderNodeRGBCurve, ShaderNodeBsdfPrincipled, ShaderNodeOutputMaterial, ShaderNodeTexImage,
+)}
+
+
+class Nodes(_NamedCollection):
+
+    def new(self, type):
+        cls = _NODE_TYPES.get(type)
+        if cls is None:
+            raise RuntimeError(f"Error: Node type {type} undefined")
+        node = cls(self._owner)
+        self._insert(node, cls.default_name)
+        object.__setattr__(self, "active", node)
+        _tag(self._owner)
+        return node
+
+    def remove(self, node):
+        if node not in self._items:
+            raise RuntimeError(f"Error: Unable to locate node '{node.name}' in node tree")
+        self._discard(node)
+        if self.__dict__.get("active") is node:
+            object.__setattr__(self, "active", None)
+        _tag(self._owner)
+
+    def clear(self):
+        self._items.clear()
+        self._by_name.clear()
+        _tag(self._owner)
+
+
+class NodeLinks(bpy_prop_collection):
+
+    def new(self, output, input):
+        raise RuntimeError("Error: the stand-in does not model node sockets")
+
+
+class NodeTree(ID):
+    _data_name = "node_groups"
+    bl_idname = "NodeTree"
+
+    def __init__(self, name, owner=None):
+        super().__init__(name)
+        _init(self, _owner=owner, is_embedded_data=owner is not None)
+        _init(self, nodes=Nodes(self), links=NodeLinks(self))
+
+
+class ShaderNodeTree(NodeTree):
+    bl_idname = "ShaderNodeTree"
+
+
+def _new_node_group(name, type):
+    if type != ShaderNodeTree.bl_idname:
+        raise TypeError(f"bpy.data.node_groups.new(...): the stand-in only has ShaderNodeTree groups, not {type!r}")
+    return ShaderNodeTree(name)
+
+
+# ---------------------------------------------------------------------------
+# Data-blocks
+
+class Material(ID):
+    _data_name = "materials"
+
+    def __init__(self, name):
+        super().__init__(name)
+        _init(self, _use_nodes=False, node_tree=None, diffuse_color=(0.8, 0.8, 0.8, 1.0))
+
+    @property
+    def use_nodes(self):
+        return self._use_nodes
+
+    @use_nodes.setter
+    def use_nodes(self, value):
+        object.__setattr__(self, "_use_nodes", bool(value))
+        if value and self.node_tree is None:
+            tree = ShaderNodeTree("Shader Nodetree", owner=self)
+            tree.nodes.new("ShaderNodeBsdfPrincipled")
+            tree.nodes.new("ShaderNodeOutputMaterial")
+            object.__setattr__(self, "node_tree", tree)
+
+    @property
+    def users(self):
+        import bpy
+        count = sum(1 for mesh in bpy.data.meshes for material in mesh.materials._items if material is self)
+        return count + (1 if self.use_fake_user else 0)
+
+
+class IDMaterials(bpy_prop_collection):
+
+    def _lookup(self, key):
+        for material in self._items:
+            if material is not None and material.name == key:
+                return material
+        return None
+
+    def append(self, material):
+        self._items.append(material)
+        _tag(self._owner)
+
+    def pop(self, index=-1):
+        material = self._items.pop(index)
+        _tag(self._owner)
+        return material
+
+    def clear(self):
+        self._items.clear()
+        _tag(self._owner)
+
+    def __setitem__(self, index, material):
+        self._items[index] = material
+        _tag(self._owner)
+
+    def keys(self):
+        return [material.name if material else "" for material in self._items]
+
+
+class Mesh(ID):
+    _data_name = "meshes"
+
+    def __init__(self, name):
+        super().__init__(name)
+        _init(self, materials=IDMaterials(self))
+
+    @property
+    def users(self):
+        import bpy
+        count = sum(1 for obj in bpy.data.objects if obj.data is self)
+        return count + (1 if self.use_fake_user else 0)
+
+
+class MaterialSlot(bpy_struct):
+    _strict = True
+
+    def __init__(self, obj, index):
+        _init(self, _owner=obj, _index=index, link='DATA')
+
+    @property
+    def material(self):
+        return self._owner.data.materials[self._index]
+
+    @material.setter
+    def material(self, material):
+        self._owner.data.materials[self._index] = material
+
+    @property
+    def name(self):
+        material = self.material
+        return material.name if material else ""
+
+
+class Object(ID):
+    _data_name = "objects"
+
+    def __init__(self, name, data):
+        super().__init__(name)
+        _init(self, data=data, active_material_index=0, hide_viewport=False, _selected=False)
+        self.__dict__["_location"] = bpy_prop_array(self, (0.0, 0.0, 0.0))
+
+    location = _FloatArrayAttr(3)
+
+    @property
+    def type(self):
+        if isinstance(self.data, Mesh):
+            return 'MESH'
+        return 'EMPTY' if self.data is None else type(self.data).__name__.upper()
+
+    @property
+    def material_slots(self):
+        materials = self.data.materials if self.data is not None and hasattr(self.data, "materials") else ()
+        return bpy_prop_collection(self, [MaterialSlot(self, index) for index in range(len(materials))])
+
+    @property
+    def active_material(self):
+        slots = self.material_slots
+        if 0 <= self.active_material_index < len(slots):
+            return slots[self.active_material_index].material
+        return None
+
+    @active_material.setter
+    def active_material(self, material):
+        slots = self.material_slots
+        if 0 <= self.active_material_index < len(slots):
+            slots[self.active_material_index].material = material
+        else:
+            self.data.materials.append(material)
+
+    @property
+    def users_collection(self):
+        import bpy
+        collections = [scene.collection for scene in bpy.data.scenes] + list(bpy.data.collections)
+        return [collection for collection in collections if self in collection.objects._items]
+
+    @property
+    def users(self):
+        return len(self.users_collection) + (1 if self.use_fake_user else 0)
+
+    def select_get(self):
+        return self._selected
+
+    def select_set(self, state):
+        object.__setattr__(self, "_selected", bool(state))
+
+
+class Brush(ID):
+    _data_name = "brushes"
+    color_type = _EnumAttr(('COLOR', 'GRADIENT'), 'COLOR')
+    curve_preset = _EnumAttr(
+        ('CUSTOM', 'SMOOTH', 'SMOOTHER', 'SPHERE', 'ROOT', 'SHARP', 'LIN', 'POW4', 'INVSQUARE', 'CONSTANT'), 'SMOOTH',
+    )
+    gradient_stroke_mode = _EnumAttr(('PRESSURE', 'SPACING_REPEAT', 'SPACING_CLAMP'), 'PRESSURE')
+    image_tool = _EnumAttr(('DRAW', 'SOFTEN', 'SMEAR', 'CLONE', 'FILL', 'MASK'), 'DRAW')
+
+    def __init__(self, name, mode='TEXTURE_PAINT'):
+        super().__init__(name)
+        _init(self, gradient=ColorRamp(self), curve=CurveMapping(self, 1, ((0.0, 1.0), (1.0, 0.0))))
+        self.__dict__["_color"] = bpy_prop_array(self, (1.0, 1.0, 1.0))
+        _init(self, use_paint_image=mode == 'TEXTURE_PAINT')
+
+    color = _FloatArrayAttr(3)
+
+
+class PaletteColor(bpy_struct):
+    _strict = True
+    color = _FloatArrayAttr(3)
+
+    def __init__(self, owner):
+        _init(self, _owner=owner, strength=1.0, weight=1.0)
+        self.__dict__["_color"] = bpy_prop_array(self, (0.0, 0.0, 0.0))
+
+
+class PaletteColors(bpy_prop_collection):
+
+    def new(self):
+        color = PaletteColor(self._owner)
+        self._items.append(color)
+        object.__setattr__(self, "active", color)
+        _tag(self._owner)
+        return color
+
+    def remove(self, color):
+        self._items.remove(color)
+        if self.__dict__.get("active") is color:
+            object.__setattr__(self, "active", self._items[-1] if self._items else None)
+        _tag(self._owner)
+
+    def clear(self):
+        self._items.clear()
+        object.__setattr__(self, "active", None)
+        _tag(self._owner)
+
+
+class Palette(ID):
+    _data_name = "palettes"
+
+    def __init__(self, name):
+        super().__init__(name)
+        _init(self, colors=PaletteColors(self))
+
+
+class _FloatBuffer:
+    """Flat float pixel buffer with bulk access."""
+
+    def __init__(self, size, owner=None, fill=None):
+        self._data = np.zeros(size, dtype=np.float32)
+        if fill is not None and size:
+            self._data.reshape(-1, len(fill))[:] = fill
+        self._owner = owner
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        value = self._data[index]
+        return tuple(value.tolist()) if isinstance(index, slice) else float(value)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice) and len(np.atleast_1d(value)) != len(self._data[index]):
+            raise ValueError("bpy_prop_array[slice] = value: re-sizing bpy_struct arrays isn't supported")
+        self._data[index] = value
+        _tag(self._owner)
+
+    def foreach_get(self, seq):
+        if len(seq) != len(self._data):
+            raise RuntimeError("internal error setting the array")
+        seq[:] = self._data if isinstance(seq, np.ndarray) else self._data.tolist()
+
+    def foreach_set(self, seq):
+        values = np.asarray(seq, dtype=np.float32).ravel()
+        if len(values) != len(self._data):
+            raise RuntimeError("internal error setting the array")
+        self._data[:] = values
+        _tag(self._owner)
+
+
+class Image(ID):
+    _data_name = "images"
+    file_format = _EnumAttr(('PNG', 'JPEG', 'OPEN_EXR', 'OPEN_EXR_MULTILAYER', 'TARGA', 'TIFF', 'BMP', 'HDR'), 'PNG')
+    source = _EnumAttr(('FILE', 'SEQUENCE', 'MOVIE', 'GENERATED', 'VIEWER', 'UDIM', 'TILED'), 'GENERATED')
+
+    def __init__(self, name, width, height, alpha=False, float_buffer=False):
+        super().__init__(name)
+        _init(
+            self,
+            _size=(int(width), int(height)),
+            alpha_mode='STRAIGHT',
+            is_float=bool(float_buffer),
+            use_generated_float=bool(float_buffer),
+            packed_file=None,
+            filepath="",
+            is_dirty=False,
+        )
+        _init(self, pixels=_FloatBuffer(width * height * 4, self, fill=(0.0, 0.0, 0.0, 1.0)))
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def channels(self):
+        return 4
+
+    @property
+    def has_data(self):
+        return True
+
+    def scale(self, width, height):
+        old_width, old_height = self._size
+        old = self.pixels._data.reshape(old_height, old_width, 4) if old_width and old_height else None
+        pixels = _FloatBuffer(width * height * 4, self, fill=(0.0, 0.0, 0.0, 1.0))
+        if old is not None and width and height:
+            rows = (np.arange(height) * old_height // height).clip(0, old_height - 1)
+            cols = (np.arange(width) * old_width // width).clip(0, old_width - 1)
+            pixels._data[:] = old[rows][:, cols].ravel()
+        _init(self, _size=(int(width), int(height)), pixels=pixels, is_dirty=True)
+        _tag(self)
+
+    def update(self):
+        _tag(self)
+
+    def pack(self):
+        _init(self, packed_file=object(), is_dirty=False)
+
+    def unpack(self, method='USE_LOCAL'):
+        _init(self, packed_file=None)
+
+    def reload(self):
+        pass
+
+
+class CollectionObjects(bpy_prop_collection):
+
+    def link(self, obj):
+        if obj in self._items:
+            raise RuntimeError(f"Error: Object '{obj.name}' already in collection '{self._owner.name}'")
+        self._items.append(obj)
+        _tag(obj)
+
+    def unlink(self, obj):
+        if obj not in self._items:
+            raise RuntimeError(f"Error: Object '{obj.name}' not in collection '{self._owner.name}'")
+        self._items.remove(obj)
+        _tag(obj)
+
+
+class CollectionChildren(bpy_prop_collection):
+
+    def link(self, child):
+        if child in self._items:
+            raise RuntimeError(f"Error: Collection '{child.name}' already in collection '{self._owner.name}'")
+        self._items.append(child)
+        _tag(self._owner)
+
+    def unlink(self, child):
+        if child not in self._items:
+            raise RuntimeError(f"Error: Collection '{child.name}' not in collection '{self._owner.name}'")
+        self._items.remove(child)
+        _tag(self._owner)
+
+
+class Collection(ID):
+    _data_name = "collections"
+
+    def __init__(self, name):
+        super().__init__(name)
+        _init(self, objects=CollectionObjects(self), children=CollectionChildren(self), hide_viewport=False)
+
+    @property
+    def all_objects(self):
+        seen = []
+        stack = [self]
+        while stack:
+            collection = stack.pop()
+            for obj in collection.objects._items:
+                if obj not in seen:
+                    seen.append(obj)
+            stack.extend(collection.children._items)
+        return bpy_prop_collection(self, seen)
+
+
+class ImagePaint(bpy_struct):
+    _strict = True
+
+    def __init__(self, owner):
+        _init(self, _owner=owner, _brush=None, palette=None, use_cavity=False, mode='MATERIAL', canvas=None)
+        _init(self, cavity_curve=CurveMapping(self, 1, ((0.0, 0.0), (1.0, 1.0))))
+
+    @property
+    def brush(self):
+        return self._brush
+
+    @brush.setter
+    def brush(self, brush):
+        if brush is not None and not isinstance(brush, Brush):
+            raise TypeError(f"ImagePaint.brush expected a Brush type, not {type(brush).__name__}")
+        object.__setattr__(self, "_brush", brush)
+
+
+class ToolSettings(bpy_struct):
+    _strict = True
+
+    def __init__(self, scene):
+        _init(self, _owner=scene)
+        _init(self, image_paint=ImagePaint(self))
+
+
+class LayerCollection(bpy_struct):
+    _strict = True
+
+    def __init__(self, owner, collection):
+        _init(self, _owner=owner, collection=collection, _exclude=False, hide_viewport=False)
+
+    @property
+    def name(self):
+        return self.collection.name
+
+    @property
+    def exclude(self):
+        return self._exclude
+
+    @exclude.setter
+    def exclude(self, value):
+        object.__setattr__(self, "_exclude", bool(value))
+
+    @property
+    def children(self):
+        layers = self.__dict__.setdefault("_children", {})
+        items = []
+        for child in self.collection.children._items:
+            if id(child) not in layers:
+                layers[id(child)] = LayerCollection(self._owner, child)
+            items.append(layers[id(child)])
+        return bpy_prop_collection(self, items)
+
+
+class LayerObjects(bpy_struct):
+    _strict = True
+
+    def __init__(self, view_layer):
+        _init(self, _owner=view_layer, _active=None)
+
+    @property
+    def active(self):
+        import bpy
+        if self._active is not None and self._active not in bpy.data.objects._items:
+            object.__setattr__(self, "_active", None)
+        return self._active
+
+    @active.setter
+    def active(self, obj):
+        object.__setattr__(self, "_active", obj)
+
+    def _objects(self):
+        return self._owner._owner.collection.all_objects._items
+
+    def __iter__(self):
+        return iter(list(self._objects()))
+
+    def __len__(self):
+        return len(self._objects())
+
+    def get(self, name, default=None):
+        for obj in self._objects():
+            if obj.name == name:
+                return obj
+        return default
+
+
+class ViewLayer(bpy_struct):
+    _strict = True
+
+    def __init__(self, scene, name="ViewLayer"):
+        _init(self, _owner=scene, name=name)
+        _init(self, objects=LayerObjects(self), layer_collection=LayerCollection(self, scene.collection))
+
+    def update(self):
+        _flush_updates(self._owner)
+
+
+class Scene(ID):
+    _data_name = "scenes"
+
+    def __init__(self, name):
+        super().__init__(name)
+        _init(self, collection=Collection("Scene Collection"), frame_current=1)
+        _init(self, tool_settings=ToolSettings(self))
+        _init(self, view_layers=bpy_prop_collection(self, [ViewLayer(self)]))
+
+
+class WindowManager(ID):
+    _data_name = "window_managers"
+
+    def invoke_props_dialog(self, operator, width=300, **_kwargs):
+        return {'RUNNING_MODAL'}
+
+    def invoke_props_popup(self, operator, event):
+        return {'RUNNING_MODAL'}
+
+    def invoke_confirm(self, operator, event, **_kwargs):
+        return {'RUNNING_MODAL'}
+
+    def invoke_popup(self, operator, width=300):
+        return {'RUNNING_MODAL'}
+
+    def fileselect_add(self, operator):
+        pass
+
+    def progress_begin(self, min, max):
+        pass
+
+    def progress_update(self, value):
+        pass
+
+    def progress_end(self):
+        pass
+
+
+class Library(ID):
+    _data_name = "libraries"
+
+    def __init__(self, name, filepath=""):
+        super().__init__(name)
+        _init(self, filepath=filepath)
+
+
+class Text(ID):
+    _data_name = "texts"
+    pass
+
+
+# ---------------------------------------------------------------------------
+# bpy.data
+
+class BlendDataCollection(_NamedCollection):
+    """One bpy.data collection, e.g. bpy.data.materials."""
+
+    def __init__(self, id_type, factory=None):
+        super().__init__(None)
+        _init(self, _id_type=id_type, _factory=factory or id_type)
+
+    def new(self, name, *args, **kwargs):
+        if not isinstance(name, str):
+            raise TypeError(f"{self._id_type.__name__}s.new(): name must be a string")
+        id_data = self._factory(name, *args, **kwargs)
+        self._insert(id_data, name)
+        object.__setattr__(id_data, "_collection", self)
+        _tag(id_data)
+        return id_data
+
+    def remove(self, id_data, do_unlink=True, do_id_user=True, do_ui_user=True):
+        if id_data not in self._items:
+            raise ReferenceError(f"{self._id_type.__name__} '{id_data.name}' is not in this collection")
+        self._discard(id_data)
+        object.__setattr__(id_data, "_collection", None)
+        if do_unlink:
+            _unlink_everywhere(id_data)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+
+# bpy.data collections that library files can hold
+_LIBRARY_DATA_NAMES = ("materials", "node_groups", "brushes", "palettes", "images", "objects", "meshes", "texts")
+
+
+class _LibraryData:
+    """data_from and data_to of bpy.data.libraries.load(): one list per data-block type."""
+
+    def __init__(self, lists):
+        for data_name in _LIBRARY_DATA_NAMES:
+            setattr(self, data_name, list(lists.get(data_name, ())))
+
+
+class _LibraryLoad:
+    """Context manager returned by bpy.data.libraries.load().
+
+    Stand-in library files are two pickles: the data-block names, which is all
+    entering reads, then the data-blocks, read on exit for the names assigned
+    to data_to. Write them with bpy.data.libraries.write().
+    """
+
+    def __init__(self, libraries, filepath, link):
+        self._libraries = libraries
+        self._filepath = filepath
+        self._link = link
+
+    def __enter__(self):
+        import bpy
+        path = bpy.path.abspath(self._filepath)
+        try:
+            with open(path, "rb") as f:
+                names = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            raise OSError(f"load: {self._filepath} failed, unable to open blend") from None
+        self._data_to = _LibraryData({})
+        return _LibraryData(names), self._data_to
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            return False
+        import bpy
+        requested = {data_name: getattr(self._data_to, data_name) for data_name in _LIBRARY_DATA_NAMES}
+        if not any(requested.values()):
+            return False
+        with open(bpy.path.abspath(self._filepath), "rb") as f:
+            pickle.load(f)
+            blocks = pickle.load(f)
+        library = None
+        if self._link:
+            library = next((lib for lib in self._libraries if lib.filepath == self._filepath), None)
+            if library is None:
+                library = self._libraries.new(bpy.path.basename(self._filepath), self._filepath)
+        for data_name, names in requested.items():
+            collection = getattr(bpy.data, data_name)
+            loaded = []
+            for name in names:
+                id_data = blocks.get(data_name, {}).get(name)
+                if id_data is None:
+                    print(f"load: {self._filepath} does not contain {data_name}[\"{name}\"]")
+                    loaded.append(None)
+                    continue
+                if library is not None:
+                    existing = next((other for other in collection if other.library is library and other.name == name), None)
+                    if existing is not None:
+                        loaded.append(existing)
+                        continue
+                    object.__setattr__(id_data, "library", library)
+                    embedded = getattr(id_data, "node_tree", None)
+                    if embedded is not None:
+                        object.__setattr__(embedded, "library", library)
+                collection._insert(id_data, name)
+                object.__setattr__(id_data, "_collection", collection)
+                _tag(id_data)
+                loaded.append(id_data)
+            setattr(self._data_to, data_name, loaded)
+        return False
+
+
+class BlendDataLibraries(BlendDataCollection):
+    """bpy.data.libraries, with load() and write() on stand-in library files."""
+
+    def __init__(self):
+        super().__init__(Library)
+
+    def load(self, filepath, link=False, relative=False, assets_only=False):
+        return _LibraryLoad(self, filepath, link)
+
+    def write(self, filepath, datablocks, path_remap='NONE', fake_user=False, compress=False):
+        import bpy
+        blocks = {}
+        for id_data in datablocks:
+            # Copy without the bpy.data collection, which would drag the whole file along
+            block = copy.deepcopy(id_data, {id(id_data._collection): None})
+            if fake_user:
+                object.__setattr__(block, "use_fake_user", True)
+            blocks.setdefault(id_data._data_name, {})[id_data.name] = block
+        names = {data_name: list(by_name) for data_name, by_name in blocks.items()}
+        with open(bpy.path.abspath(filepath), "wb") as f:
+            pickle.dump(names, f)
+            pickle.dump(blocks, f)
+
+
+def _unlink_everywhere(id_data):
+    import bpy
+    data = bpy.data
+    if isinstance(id_data, Object):
+        for collection in [scene.collection for scene in data.scenes] + list(data.collections):
+            if id_data in collection.objects._items:
+                collection.objects._items.remove(id_data)
+    elif isinstance(id_data, Material):
+        for mesh in data.meshes:
+            materials = mesh.materials._items
+            for index, material in enumerate(materials):
+                if material is id_data:
+                    materials[index] = None
+    elif isinstance(id_data, Mesh):
+        for obj in data.objects:
+            if obj.data is id_data:
+                object.__setattr__(obj, "data", None)
+    elif isinstance(id_data, Collection):
+        for collection in [scene.collection for scene in data.scenes] + list(data.collections):
+            if id_data in collection.children._items:
+                collection.children._items.remove(id_data)
+    elif isinstance(id_data, Brush):
+        for scene in data.scenes:
+            image_paint = scene.tool_settings.image_paint
+            if image_paint.brush is id_data:
+                image_paint.brush = None
+    elif isinstance(id_data, Palette):
+        for scene in data.scenes:
+            image_paint = scene.tool_settings.image_paint
+            if image_paint.palette is id_data:
+                object.__setattr__(image_paint, "palette", None)
+
+
+class BlendData:
+    """bpy.data: every data-block of the current file."""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.objects = BlendDataCollection(Object)
+        self.meshes = BlendDataCollection(Mesh)
+        self.materials = BlendDataCollection(Material)
+        self.node_groups = BlendDataCollection(ShaderNodeTree, _new_node_group)
+        self.brushes = BlendDataCollection(Brush)
+        self.palettes = BlendDataCollection(Palette)
+        self.images = BlendDataCollection(Image)
+        self.collections = BlendDataCollection(Collection)
+        self.scenes = BlendDataCollection(Scene)
+        self.window_managers = BlendDataCollection(WindowManager)
+        self.libraries = BlendDataLibraries()
+        self.texts = BlendDataCollection(Text)
+        self.filepath = ""
+        self.is_dirty = False
+        self.scenes.new("Scene")
+        self.window_managers.new("WinMan")
+        _tagged.clear()
+
+
+class Context:
+    """bpy.context for a background session: no window, area or region."""
+
+    def __init__(self, data):
+        self._data = data
+        self.area = None
+        self.region = None
+        self.space_data = None
+        self.mode = 'OBJECT'
+
+    @property
+    def blend_data(self):
+        return self._data
+
+    @property
+    def scene(self):
+        return self._data.scenes[0]
+
+    @property
+    def view_layer(self):
+        return self.scene.view_layers[0]
+
+    @property
+    def tool_settings(self):
+        return self.scene.tool_settings
+
+    @property
+    def window_manager(self):
+        return self._data.window_managers[0]
+
+    @property
+    def active_object(self):
+        return self.view_layer.objects.active
+
+    @property
+    def object(self):
+        return self.view_layer.objects.active
+
+    @property
+    def collection(self):
+        return self.scene.collection
+
+    def evaluated_depsgraph_get(self):
+        _flush_updates(self.scene)
+        return Depsgraph(self.scene, ())
@@ -0,0 +1,10 @@
+"""Class registration."""
+from .. import types
+
+
+def register_class(cls):
+    types._register_class(cls)
+
+
+def unregister_class(cls):
+    types._unregister_class(cls)
@@ -0,0 +1,63 @@
+"""Preview collections holding icon and image pixels in memory."""
+import itertools
+
+from ..types import _FloatBuffer
+
+
+_icon_ids = itertools.count(1000)
+_collections = set()
+
+
+class ImagePreview:
+    def __init__(self):
+        self.icon_id = next(_icon_ids)
+        self._icon_size = (0, 0)
+        self._image_size = (0, 0)
+        self.icon_pixels_float = _FloatBuffer(0)
+        self.image_pixels_float = _FloatBuffer(0)
+
+    @property
+    def icon_size(self):
+        return self._icon_size
+
+    @icon_size.setter
+    def icon_size(self, size):
+        self._icon_size = tuple(size)
+        self.icon_pixels_float = _FloatBuffer(size[0] * size[1] * 4)
+
+    @property
+    def image_size(self):
+        return self._image_size
+
+    @image_size.setter
+    def image_size(self, size):
+        self._image_size = tuple(size)
+        self.image_pixels_float = _FloatBuffer(size[0] * size[1] * 4)
+
+
+class ImagePreviewCollection(dict):
+    def new(self, name):
+        if name in self:
+            raise KeyError(f"key {name!r} already exists")
+        preview = self[name] = ImagePreview()
+        return preview
+
+    def load(self, name, filepath, filetype, force_reload=False):
+        preview = self.get(name)
+        if preview is None or force_reload:
+            preview = self[name] = ImagePreview()
+        return preview
+
+    def close(self):
+        self.clear()
+
+
+def new():
+    collection = ImagePreviewCollection()
+    _collections.add(id(collection))
+    return collection
+
+
+def remove(collection):
+    collection.close()
+    _collections.discard(id(collection))
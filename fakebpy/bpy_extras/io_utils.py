@@ -0,0 +1,32 @@
+"""File browser helper mix-ins for import and export operators."""
+import os
+
+from bpy.props import BoolProperty, StringProperty
+
+
+class ExportHelper:
+    filepath: StringProperty(name="File Path", maxlen=1024, subtype='FILE_PATH')
+    check_existing: BoolProperty(name="Check Existing", default=True, options={'HIDDEN'})
+
+    def invoke(self, context, _event):
+        if not self.filepath:
+            self.filepath = "untitled" + self.filename_ext
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def check(self, _context):
+        filepath = self.filepath
+        if os.path.basename(filepath):
+            filepath = os.path.splitext(filepath)[0] + self.filename_ext
+            if filepath != self.filepath:
+                self.filepath = filepath
+                return True
+        return False
+
+
+class ImportHelper:
+    filepath: StringProperty(name="File Path", maxlen=1024, subtype='FILE_PATH')
+
+    def invoke(self, context, _event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
@@ -0,0 +1,559 @@
+"""Array model of gradients and falloff curves, independent of bpy.
+
+Gradient and FalloffCurve hold their stops and points as NumPy arrays and
+evaluate any number of sample positions in one call, following the same rules
+as Blender's ColorRamp and CurveMapping. The from_*/to_* converters move data
+between these models and ColorRamp nodes, brush gradients, palettes and curve
+maps through the bulk helpers in transfer.
+"""
+import hashlib
+
+import numpy as np
+
+from . import transfer
+
+
+INTERPOLATIONS = ('EASE', 'CARDINAL', 'LINEAR', 'B_SPLINE', 'CONSTANT')
+COLOR_MODES = ('RGB', 'HSV', 'HSL')
+HUE_INTERPOLATIONS = ('NEAR', 'FAR', 'CW', 'CCW')
+HANDLE_TYPES = ('AUTO', 'AUTO_CLAMPED', 'VECTOR')
+
+# Tension Blender uses for cardinal ColorRamp interpolation
+CARDINAL_TENSION = 0.71
+# Samples per bezier segment when a curve is flattened, as in CurveMapping
+CURVE_RESOLUTION = 32
+# Decimals kept when hashing, so float32 round-trips hash the same
+HASH_DECIMALS = 6
+
+
+def _canonical_bytes(values):
+    # Adding 0.0 folds -0.0 into 0.0
+    return (np.round(np.asarray(values, dtype=np.float64), HASH_DECIMALS) + 0.0).astype("<f8").tobytes()
+
+
+# Color space conversions, vectorized over the leading axes
+
+def rgb_to_hsv(rgb):
+    rgb = np.asarray(rgb, dtype=np.float64)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    v = np.max(rgb[..., :3], axis=-1)
+    c = v - np.min(rgb[..., :3], axis=-1)
+    safe_c = np.where(c > 0.0, c, 1.0)
+    h = np.where(
+        v == r, ((g - b) / safe_c) % 6.0,
+        np.where(v == g, (b - r) / safe_c + 2.0, (r - g) / safe_c + 4.0),
+    )
+    h = np.where(c > 0.0, h / 6.0, 0.0)
+    s = np.where(v > 0.0, c / np.where(v > 0.0, v, 1.0), 0.0)
+    return np.stack((h, s, v), axis=-1)
+
+
+def hsv_to_rgb(hsv):
+    hsv = np.asarray(hsv, dtype=np.float64)
+    h, s, v = hsv[..., 0] % 1.0, hsv[..., 1], hsv[..., 2]
+    k = (np.array([5.0, 3.0, 1.0]) + h[..., None] * 6.0) % 6.0
+    f = np.clip(np.minimum(k, 4.0 - k), 0.0, 1.0)
+    return v[..., None] - (v * s)[..., None] * f
+
+
+def rgb_to_hsl(rgb):
+    rgb = np.asarray(rgb, dtype=np.float64)
+    hsv = rgb_to_hsv(rgb)
+    v = hsv[..., 2]
+    lightness = v - v * hsv[..., 1] / 2.0
+    denom = np.minimum(lightness, 1.0 - lightness)
+    s = np.where(denom > 0.0, (v - lightness) / np.where(denom > 0.0, denom, 1.0), 0.0)
+    return np.stack((hsv[..., 0], s, lightness), axis=-1)
+
+
+def hsl_to_rgb(hsl):
+    hsl = np.asarray(hsl, dtype=np.float64)
+    h, s, lightness = hsl[..., 0] % 1.0, hsl[..., 1], hsl[..., 2]
+    a = s * np.minimum(lightness, 1.0 - lightness)
+    k = (np.array([0.0, 8.0, 4.0]) + h[..., None] * 12.0) % 12.0
+    f = np.clip(np.minimum(k - 3.0, 9.0 - k), -1.0, 1.0)
+    return lightness[..., None] - a[..., None] * f
+
+
+def srgb_to_linear(rgb):
+    """Decode sRGB display values to the linear values Blender stores."""
+    rgb = np.asarray(rgb, dtype=np.float64)
+    return np.where(rgb <= 0.04045, rgb / 12.92, np.power((np.maximum(rgb, 0.0) + 0.055) / 1.055, 2.4))
+
+
+def linear_to_srgb(rgb):
+    """Encode linear values as sRGB display values."""
+    rgb = np.asarray(rgb, dtype=np.float64)
+    return np.where(rgb <= 0.0031308, rgb * 12.92, 1.055 * np.power(np.maximum(rgb, 0.0), 1.0 / 2.4) - 0.055)
+
+
+# Ottosson's OKLab, from linear sRGB
+_LMS_FROM_RGB = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+_LAB_FROM_LMS = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+_LMS_FROM_LAB = np.linalg.inv(_LAB_FROM_LMS)
+_RGB_FROM_LMS = np.linalg.inv(_LMS_FROM_RGB)
+
+
+def linear_to_oklab(rgb):
+    """Linear sRGB to OKLab (L, a, b)."""
+    lms = np.asarray(rgb, dtype=np.float64) @ _LMS_FROM_RGB.T
+    return np.cbrt(lms) @ _LAB_FROM_LMS.T
+
+
+def oklab_to_linear(lab):
+    """OKLab (L, a, b) to linear sRGB, unclipped."""
+    lms = np.asarray(lab, dtype=np.float64) @ _LMS_FROM_LAB.T
+    return (lms ** 3) @ _RGB_FROM_LMS.T
+
+
+def oklab_to_oklch(lab):
+    """OKLab to OKLCh with hue in turns (0-1)."""
+    lab = np.asarray(lab, dtype=np.float64)
+    chroma = np.hypot(lab[..., 1], lab[..., 2])
+    hue = (np.arctan2(lab[..., 2], lab[..., 1]) / (2.0 * np.pi)) % 1.0
+    return np.stack((lab[..., 0], chroma, hue), axis=-1)
+
+
+def oklch_to_oklab(lch):
+    """OKLCh with hue in turns back to OKLab."""
+    lch = np.asarray(lch, dtype=np.float64)
+    angle = lch[..., 2] * 2.0 * np.pi
+    return np.stack((lch[..., 0], lch[..., 1] * np.cos(angle), lch[..., 1] * np.sin(angle)), axis=-1)
+
+
+def _hue_interp(hue_interpolation, fac, h1, h2):
+    """Blend hues h1 -> h2 by fac the way ColorRamp hue interpolation does."""
+    h1 = np.where(h1 < 1.0, h1, h1 - 1.0)
+    h2 = np.where(h2 < 1.0, h2, h2 - 1.0)
+    diff = h2 - h1
+    # 0 blends directly, 1 wraps h1 forward, 2 wraps h2 forward
+    if hue_interpolation == 'NEAR':
+        mode = np.where((h1 < h2) & (diff > 0.5), 1, np.where((h1 > h2) & (diff < -0.5), 2, 0))
+    elif hue_interpolation == 'FAR':
+        mode = np.where(
+            h1 == h2, 1,
+            np.where((h1 < h2) & (diff < 0.5), 1, np.where((h1 > h2) & (diff > -0.5), 2, 0)),
+        )
+    elif hue_interpolation == 'CCW':
+        mode = np.where(h1 > h2, 2, 0)
+    else:
+        mode = np.where(h1 < h2, 1, 0)
+    h1 = np.where(mode == 1, h1 + 1.0, h1)
+    h2 = np.where(mode == 2, h2 + 1.0, h2)
+    h = (1.0 - fac) * h1 + fac * h2
+    return np.where(mode != 0, np.where(h < 1.0, h, h - 1.0), h)
+
+
+def _spline_weights(interpolation, t):
+    """Weights of the four stops around each sample for cubic ColorRamp modes."""
+    t2 = t * t
+    t3 = t2 * t
+    if interpolation == 'CARDINAL':
+        fc = CARDINAL_TENSION
+        return (
+            -fc * t3 + 2.0 * fc * t2 - fc * t,
+            (2.0 - fc) * t3 + (fc - 3.0) * t2 + 1.0,
+            (fc - 2.0) * t3 + (3.0 - 2.0 * fc) * t2 + fc * t,
+            fc * t3 - fc * t2,
+        )
+    return (
+        -t3 / 6.0 + 0.5 * t2 - 0.5 * t + 1.0 / 6.0,
+        0.5 * t3 - t2 + 2.0 / 3.0,
+        -0.5 * t3 + 0.5 * t2 + 0.5 * t + 1.0 / 6.0,
+        t3 / 6.0,
+    )
+
+
+class Gradient:
+    """Stops of a ColorRamp or brush gradient as positions[n] and RGBA colors[n, 4]."""
+
+    def __init__(self, positions, colors, interpolation='LINEAR', color_mode='RGB', hue_interpolation='NEAR'):
+        positions = np.asarray(positions, dtype=np.float64).ravel()
+        colors = np.asarray(colors, dtype=np.float64).reshape(len(positions), -1)
+        if colors.shape[1] == 3:
+            colors = np.concatenate((colors, np.ones((len(colors), 1))), axis=1)
+        if len(positions) == 0:
+            raise ValueError("A gradient needs at least one stop")
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(f"Unknown interpolation '{interpolation}'")
+        if color_mode not in COLOR_MODES:
+            raise ValueError(f"Unknown color mode '{color_mode}'")
+        # ColorRamps keep their stops sorted; a stable sort keeps equal positions in order
+        order = np.argsort(positions, kind='stable')
+        self.positions = positions[order]
+        self.colors = colors[order]
+        self.interpolation = interpolation
+        self.color_mode = color_mode
+        self.hue_interpolation = hue_interpolation
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __repr__(self):
+        return f"<Gradient {len(self)} stops, {self.interpolation}, {self.color_mode}>"
+
+    def copy(self):
+        return Gradient(self.positions.copy(), self.colors.copy(), self.interpolation, self.color_mode, self.hue_interpolation)
+
+    def content_hash(self):
+        """Hex digest identifying the stops and settings, equal for identical gradients."""
+        hue_interpolation = self.hue_interpolation if self.color_mode != 'RGB' else ""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"gradient|{self.interpolation}|{self.color_mode}|{hue_interpolation}".encode())
+        digest.update(_canonical_bytes(self.positions))
+        digest.update(_canonical_bytes(self.colors))
+        return digest.hexdigest()
+
+    def evaluate(self, x):
+        """Return the RGBA colors at sample positions x, shaped x.shape + (4,)."""
+        x = np.asarray(x, dtype=np.float64)
+        positions, colors = self.positions, self.colors
+        count = len(positions)
+        if count == 1:
+            return np.broadcast_to(colors[0], x.shape + (4,)).copy()
+
+        # Index of the first stop past each sample; its left neighbour is the other end
+        a = np.searchsorted(positions, x, side='right')
+        past_end = a == count
+        right = np.where(past_end, count - 1, a)
+        left = np.where(a == 0, 0, np.where(past_end, count - 1, a - 1))
+
+        span = positions[left] - positions[right]
+        fac = np.where(
+            span != 0.0,
+            (x - positions[right]) / np.where(span != 0.0, span, 1.0),
+            np.where(past_end, 1.0, 0.0),
+        )
+
+        if self.interpolation in ('B_SPLINE', 'CARDINAL'):
+            outer_right = np.where(a >= count - 1, right, right + 1)
+            outer_left = np.where(a < 2, left, left - 1)
+            weights = _spline_weights(self.interpolation, np.clip(fac, 0.0, 1.0))
+            out = (
+                weights[3][..., None] * colors[outer_left]
+                + weights[2][..., None] * colors[left]
+                + weights[1][..., None] * colors[right]
+                + weights[0][..., None] * colors[outer_right]
+            )
+            return np.clip(out, 0.0, 1.0)
+
+        if self.interpolation == 'CONSTANT':
+            out = colors[left]
+        else:
+            if self.interpolation == 'EASE':
+                fac = fac * fac * (3.0 - 2.0 * fac)
+            out = self._blend(colors[right], colors[left], fac)
+
+        # Outside the stops the end colors hold
+        out = np.where((x <= positions[0])[..., None], colors[0], out)
+        return np.where(past_end[..., None], colors[-1], out)
+
+    def _blend(self, c1, c2, fac):
+        mfac = (1.0 - fac)[..., None]
+        if self.color_mode == 'RGB':
+            return mfac * c1 + fac[..., None] * c2
+        to_space, from_space = (rgb_to_hsv, hsv_to_rgb) if self.color_mode == 'HSV' else (rgb_to_hsl, hsl_to_rgb)
+        s1 = to_space(c1[..., :3])
+        s2 = to_space(c2[..., :3])
+        hue = _hue_interp(self.hue_interpolation, fac, s1[..., 0], s2[..., 0])
+        rest = mfac * s1[..., 1:] + fac[..., None] * s2[..., 1:]
+        rgb = from_space(np.concatenate((hue[..., None], rest), axis=-1))
+        alpha = mfac[..., 0] * c1[..., 3] + fac * c2[..., 3]
+        return np.concatenate((rgb, alpha[..., None]), axis=-1)
+
+    def sample(self, count):
+        """Evaluate count evenly spaced positions from 0 to 1."""
+        return self.evaluate(np.linspace(0.0, 1.0, count))
+
+    def perceptual(self, space='OKLAB', samples=256):
+        """Return a dense LINEAR gradient that blends between the stops in OKLab or OKLCh.
+
+        Stop positions, colors and any EASE shaping are kept; only the color
+        space the stops are blended in changes. OKLCh takes the short way round
+        the hue circle and keeps the hue of gray stops from swinging. CONSTANT
+        gradients have nothing to blend and come back as a copy. Reduce the
+        result to get back to a small stop set.
+        """
+        if self.interpolation == 'CONSTANT' or len(self) == 1:
+            return self.copy()
+
+        positions = self.positions
+        x = np.unique(np.concatenate((np.linspace(0.0, 1.0, samples), positions, np.clip(positions - 1e-6, 0.0, 1.0))))
+        a = np.searchsorted(positions, x, side='right')
+        left = np.clip(a - 1, 0, len(self) - 1)
+        right = np.clip(a, 0, len(self) - 1)
+        span = positions[right] - positions[left]
+        fac = np.where(span > 0.0, (x - positions[left]) / np.where(span > 0.0, span, 1.0), 0.0)
+        if self.interpolation == 'EASE':
+            fac = fac * fac * (3.0 - 2.0 * fac)
+
+        lab = linear_to_oklab(self.colors[:, :3])
+        if space == 'OKLCH':
+            lch = oklab_to_oklch(lab)
+            # Gray stops borrow the hue of their neighbour so the blend does not swing through red
+            gray = lch[:, 1] < 1e-4
+            hue_left = np.where(gray[left], lch[right, 2], lch[left, 2])
+            hue_right = np.where(gray[right], lch[left, 2], lch[right, 2])
+            delta = (hue_right - hue_left + 0.5) % 1.0 - 0.5
+            blended = np.stack((
+                lch[left, 0] + fac * (lch[right, 0] - lch[left, 0]),
+                lch[left, 1] + fac * (lch[right, 1] - lch[left, 1]),
+                (hue_left + fac * delta) % 1.0,
+            ), axis=-1)
+            rgb = oklab_to_linear(oklch_to_oklab(blended))
+        else:
+            rgb = oklab_to_linear(lab[left] + fac[:, None] * (lab[right] - lab[left]))
+
+        alpha = self.colors[left, 3] + fac * (self.colors[right, 3] - self.colors[left, 3])
+        colors = np.concatenate((np.clip(rgb, 0.0, None), alpha[:, None]), axis=1)
+        return Gradient(x, colors)
+
+    def reduce(self, max_error=0.01, max_stops=transfer.MAX_RAMP_ELEMENTS, samples=256):
+        """Return (gradient, error): the fewest stops that reproduce this gradient within max_error.
+
+        Stops are added greedily where the current fit is worst, until the largest
+        per-channel difference over samples positions is at most max_error or
+        max_stops is reached; error is the difference actually achieved. CONSTANT
+        gradients keep a subset of their own stops, everything else becomes a
+        LINEAR RGB gradient. Hard edges survive as two stops a hair apart.
+        """
+        edges = np.clip(np.concatenate((self.positions, self.positions - 1e-6)), 0.0, 1.0)
+        x = np.unique(np.concatenate((np.linspace(0.0, 1.0, samples), edges)))
+        target = self.evaluate(x)
+
+        if self.interpolation == 'CONSTANT':
+            candidate_positions, candidate_colors = self.positions, self.colors
+            keep = np.zeros(len(self), dtype=bool)
+            keep[0] = True
+        else:
+            candidate_positions, candidate_colors = x, target
+            keep = np.zeros(len(x), dtype=bool)
+            keep[[0, -1]] = True
+        interpolation = 'CONSTANT' if self.interpolation == 'CONSTANT' else 'LINEAR'
+
+        while True:
+            candidate = Gradient(candidate_positions[keep], candidate_colors[keep], interpolation)
+            difference = np.abs(candidate.evaluate(x) - target).max(axis=-1)
+            error = float(difference.max())
+            if error <= max_error or keep.sum() >= max_stops:
+                return candidate, error
+            if interpolation == 'CONSTANT':
+                deviation = np.abs(candidate.evaluate(candidate_positions) - candidate_colors).max(axis=-1)
+            else:
+                deviation = difference
+            deviation[keep] = -1.0
+            worst = int(np.argmax(deviation))
+            if deviation[worst] <= 0.0:
+                return candidate, error
+            keep[worst] = True
+
+    # Converters
+
+    @classmethod
+    def from_color_ramp(cls, color_ramp):
+        """Read a ColorRamp node ramp or brush gradient."""
+        positions, colors = transfer.read_ramp(color_ramp)
+        return cls(positions, colors, color_ramp.interpolation, color_ramp.color_mode, color_ramp.hue_interpolation)
+
+    def to_color_ramp(self, color_ramp):
+        """Write stops and settings into a ColorRamp node ramp or brush gradient."""
+        transfer.write_ramp(color_ramp, self.positions, self.colors)
+        color_ramp.interpolation = self.interpolation
+        color_ramp.color_mode = self.color_mode
+        color_ramp.hue_interpolation = self.hue_interpolation
+        return color_ramp
+
+    @classmethod
+    def from_palette(cls, palette):
+        """Spread palette colors evenly from 0 to 1 with opaque alpha."""
+        rgb = transfer.read_palette(palette)
+        if len(rgb) == 0:
+            raise ValueError("The palette has no colors")
+        positions = np.linspace(0.0, 1.0, len(rgb)) if len(rgb) > 1 else np.full(1, 0.5)
+        return cls(positions, rgb)
+
+    def to_palette(self, palette):
+        """Write the stop colors, without alpha, into a palette."""
+        return transfer.write_palette(palette, self.colors)
+
+
+def _auto_handles(locations, handle_types):
+    """Left and right bezier handles for each point, as CurveMapping computes them."""
+    count = len(locations)
+    left = locations.copy()
+    right = locations.copy()
+    for i in range(count):
+        p2 = locations[i]
+        p1 = locations[i - 1] if i > 0 else 2.0 * p2 - locations[i + 1]
+        p3 = locations[i + 1] if i < count - 1 else 2.0 * p2 - locations[i - 1]
+        dvec_a = p2 - p1
+        dvec_b = p3 - p2
+        len_a = np.hypot(*dvec_a) or 1.0
+        len_b = np.hypot(*dvec_b) or 1.0
+
+        handle_type = handle_types[i]
+        if handle_type == 'VECTOR':
+            left[i] = p2 - dvec_a / 3.0
+            right[i] = p2 + dvec_b / 3.0
+            continue
+
+        tangent = dvec_b / len_b + dvec_a / len_a
+        length = np.hypot(*tangent) * 2.5614
+        if length == 0.0:
+            continue
+        left[i] = p2 - tangent * (len_a / length)
+        right[i] = p2 + tangent * (len_b / length)
+
+        if handle_type == 'AUTO_CLAMPED' and 0 < i < count - 1:
+            # Keep extrema flat and handles within the neighbours' heights
+            for handle, neighbour in ((left, locations[i - 1]), (right, locations[i + 1])):
+                ydiff_prev = locations[i - 1][1] - p2[1]
+                ydiff_next = locations[i + 1][1] - p2[1]
+                if (ydiff_prev <= 0.0 and ydiff_next <= 0.0) or (ydiff_prev >= 0.0 and ydiff_next >= 0.0):
+                    handle[i][1] = p2[1]
+                elif neighbour[1] < p2[1]:
+                    handle[i][1] = max(handle[i][1], neighbour[1])
+                else:
+                    handle[i][1] = min(handle[i][1], neighbour[1])
+
+    # Point the end handles at their neighbour's handle, as CurveMapping does
+    if count > 2:
+        for end, inner, handles, inner_handles in ((0, 1, right, left), (count - 1, count - 2, left, right)):
+            handle_length = np.hypot(*(handles[end] - locations[end]))
+            target = inner_handles[inner].copy()
+            if end == 0:
+                target[0] = max(target[0], locations[end][0])
+            else:
+                target[0] = min(target[0], locations[end][0])
+            direction = target - locations[end]
+            norm = np.hypot(*direction)
+            if norm > 1e-7:
+                direction *= handle_length / norm
+                handles[end] = locations[end] + direction
+    return left, right
+
+
+class FalloffCurve:
+    """Points of a CurveMap as locations[n, 2] with one handle type per point."""
+
+    def __init__(self, locations, handle_types=None):
+        locations = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+        if len(locations) < 2:
+            raise ValueError("A curve needs at least two points")
+        if handle_types is None:
+            handle_types = ['AUTO'] * len(locations)
+        if len(handle_types) != len(locations):
+            raise ValueError("Expected one handle type per point")
+        order = np.argsort(locations[:, 0], kind='stable')
+        self.locations = locations[order]
+        self.handle_types = [handle_types[i] for i in order]
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __repr__(self):
+        return f"<FalloffCurve {len(self)} points>"
+
+    def copy(self):
+        return FalloffCurve(self.locations.copy(), list(self.handle_types))
+
+    def content_hash(self):
+        """Hex digest identifying the points and handle types, equal for identical curves."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(("curve|" + ",".join(self.handle_types)).encode())
+        digest.update(_canonical_bytes(self.locations))
+        return digest.hexdigest()
+
+    def polyline(self, resolution=CURVE_RESOLUTION):
+        """Flatten the bezier segments into an [m, 2] polyline sorted by x."""
+        locations = self.locations
+        left, right = _auto_handles(locations, self.handle_types)
+        t = np.linspace(0.0, 1.0, resolution)[:, None, None]
+        p0 = locations[:-1][None]
+        p1 = right[:-1][None]
+        p2 = left[1:][None]
+        p3 = locations[1:][None]
+        mt = 1.0 - t
+        segments = mt ** 3 * p0 + 3.0 * mt * mt * t * p1 + 3.0 * mt * t * t * p2 + t ** 3 * p3
+        # [resolution, segments, 2] -> segment by segment, dropping repeated joints
+        points = segments.transpose(1, 0, 2)
+        points = np.concatenate((points[:, :-1].reshape(-1, 2), locations[-1:]), axis=0)
+        # Overshooting handles can fold x back; keep it monotonic like the curve table does
+        points[:, 0] = np.maximum.accumulate(points[:, 0])
+        return points
+
+    def evaluate(self, x, resolution=CURVE_RESOLUTION):
+        """Return the curve value at sample positions x, holding the end values outside."""
+        points = self.polyline(resolution)
+        return np.interp(np.asarray(x, dtype=np.float64), points[:, 0], points[:, 1])
+
+    def sample(self, count, resolution=CURVE_RESOLUTION):
+        """Evaluate count evenly spaced positions from 0 to 1."""
+        return self.evaluate(np.linspace(0.0, 1.0, count), resolution)
+
+    def simplify(self, tolerance=0.002, max_points=None, samples=256):
+        """Return a curve with the fewest of this curve's points that stay within tolerance.
+
+        Ramer-Douglas-Peucker style: starting from the end points, the point that
+        deviates most from the current fit is added until the largest vertical
+        error over samples positions is at most tolerance, or max_points is hit.
+        """
+        count = len(self)
+        max_points = count if max_points is None else max(2, min(max_points, count))
+        if count <= 2:
+            return self.copy()
+
+        x = np.linspace(self.locations[0, 0], self.locations[-1, 0], samples)
+        target = self.evaluate(x)
+        keep = np.zeros(count, dtype=bool)
+        keep[[0, -1]] = True
+        while True:
+            candidate = FalloffCurve(self.locations[keep], [h for h, k in zip(self.handle_types, keep) if k])
+            error = np.abs(candidate.evaluate(x) - target).max()
+            if error <= tolerance or keep.sum() >= max_points:
+                return candidate
+            deviation = np.abs(candidate.evaluate(self.locations[:, 0]) - self.locations[:, 1])
+            deviation[keep] = -1.0
+            worst = int(np.argmax(deviation))
+            if deviation[worst] < 0.0:
+                return candidate
+            keep[worst] = True
+
+    def resample(self, count, adaptive=False, samples=256):
+        """Return an AUTO-handle curve with count points sampled from this one.
+
+        Uniform resampling spaces the points evenly in x; adaptive resampling
+        puts more of them where the curve bends the most.
+        """
+        count = max(2, count)
+        x_min, x_max = self.locations[0, 0], self.locations[-1, 0]
+        if adaptive and count > 2:
+            dense_x = np.linspace(x_min, x_max, samples)
+            bend = np.abs(np.gradient(np.gradient(self.evaluate(dense_x), dense_x), dense_x))
+            # Mix in a uniform share so flat stretches still get some points
+            density = bend / (bend.sum() or 1.0) + 0.25 / samples
+            cdf = np.concatenate(([0.0], np.cumsum((density[1:] + density[:-1]) / 2.0)))
+            x = np.interp(np.linspace(0.0, cdf[-1], count), cdf, dense_x)
+        else:
+            x = np.linspace(x_min, x_max, count)
+        return FalloffCurve(np.stack((x, self.evaluate(x)), axis=1))
+
+    # Converters
+
+    @classmethod
+    def from_curve_map(cls, curve_map):
+        """Read a CurveMap, e.g. mapping.curves[3] of an RGB Curve node or brush.curve.curves[0]."""
+        locations, handle_types = transfer.read_curve(curve_map)
+        return cls(locations, handle_types)
+
+    def to_curve_map(self, curve_map):
+        """Write the points into a CurveMap; call update() on its CurveMapping afterwards."""
+        return transfer.write_curve(curve_map, self.locations, self.handle_types)
@@ -0,0 +1,379 @@
+"""Streaming readers for GIMP .ggr, Photoshop .grd and GMT/cpt-city .cpt gradients.
+
+Each yields (name, Gradient) pairs, converting the files' sRGB colors to linear.
+"""
+import os
+import struct
+
+import numpy as np
+
+from .gradient_core import Gradient, hsv_to_rgb, rgb_to_hsv, srgb_to_linear
+
+
+GRADIENT_EXTENSIONS = (".ggr", ".grd", ".cpt")
+
+# Samples per segment for GIMP blending functions that are not piecewise linear
+_GGR_CURVE_SAMPLES = 8
+
+
+class GradientFormatError(Exception):
+    """Raised when a gradient file cannot be parsed."""
+
+
+def _midpoint_stops(positions, values, midpoints):
+    """Insert a half-way stop wherever a segment's midpoint is off center.
+
+    midpoints[i] is the relative midpoint (0-1) of the segment ending at stop i.
+    """
+    out_positions = [positions[0]]
+    out_values = [values[0]]
+    for i in range(1, len(positions)):
+        left, right = positions[i - 1], positions[i]
+        midpoint = midpoints[i]
+        if right > left and abs(midpoint - 0.5) > 1e-3:
+            out_positions.append(left + (right - left) * midpoint)
+            out_values.append((np.asarray(values[i - 1]) + np.asarray(values[i])) / 2.0)
+        out_positions.append(right)
+        out_values.append(values[i])
+    return np.asarray(out_positions, dtype=np.float64), np.asarray(out_values, dtype=np.float64)
+
+
+def _merge_color_and_alpha(color_positions, colors, alpha_positions, alphas):
+    """Combine separate color and opacity stop lists into RGBA stops."""
+    positions = np.union1d(color_positions, alpha_positions)
+    rgba = np.empty((len(positions), 4))
+    for channel in range(3):
+        rgba[:, channel] = np.interp(positions, color_positions, colors[:, channel])
+    rgba[:, 3] = np.interp(positions, alpha_positions, alphas)
+    return positions, rgba
+
+
+# GIMP .ggr
+
+def _ggr_blend(blending, t, middle):
+    """Blend factor of GIMP's segment blending functions at local positions t."""
+    middle = min(max(middle, 1e-6), 1.0 - 1e-6)
+    linear = np.where(t <= middle, 0.5 * t / middle, 0.5 + 0.5 * (t - middle) / (1.0 - middle))
+    if blending == 1:
+        return np.power(t, np.log(0.5) / np.log(middle))
+    if blending == 2:
+        return (np.sin(-np.pi / 2.0 + np.pi * linear) + 1.0) / 2.0
+    if blending == 3:
+        return np.sqrt(1.0 - (linear - 1.0) ** 2)
+    if blending == 4:
+        return 1.0 - np.sqrt(1.0 - linear ** 2)
+    if blending == 5:
+        return np.where(t < middle, 0.0, 1.0)
+    return linear
+
+
+def _ggr_segment_stops(fields):
+    left, middle, right = fields[0:3]
+    color0 = np.array(fields[3:7])
+    color1 = np.array(fields[7:11])
+    blending = int(fields[11]) if len(fields) > 11 else 0
+    coloring = int(fields[12]) if len(fields) > 12 else 0
+    width = right - left
+    rel_middle = (middle - left) / width if width > 0 else 0.5
+
+    if blending == 0 and coloring == 0:
+        # Linear RGB segments are exact with a stop at the midpoint
+        t = np.array([0.0, rel_middle, 1.0]) if 0.0 < rel_middle < 1.0 else np.array([0.0, 1.0])
+    else:
+        t = np.linspace(0.0, 1.0, _GGR_CURVE_SAMPLES + 1)
+    fac = _ggr_blend(blending, t, rel_middle)
+
+    if coloring == 0:
+        rgb = color0[:3] + fac[:, None] * (color1[:3] - color0[:3])
+    else:
+        # 1 goes counter-clockwise and 2 clockwise around the hue circle
+        hsv0 = rgb_to_hsv(color0[:3])
+        hsv1 = rgb_to_hsv(color1[:3])
+        h0, h1 = hsv0[0], hsv1[0]
+        if coloring == 1 and h1 < h0:
+            h1 += 1.0
+        elif coloring == 2 and h1 > h0:
+            h1 -= 1.0
+        hsv = hsv0 + fac[:, None] * (hsv1 - hsv0)
+        hsv[:, 0] = (h0 + fac * (h1 - h0)) % 1.0
+        rgb = hsv_to_rgb(hsv)
+    alpha = color0[3] + fac * (color1[3] - color0[3])
+    return left + t * width, np.concatenate((rgb, alpha[:, None]), axis=1)
+
+
+def read_ggr(path):
+    """Yield the single gradient of a GIMP .ggr file."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        lines = (line.strip() for line in f)
+        lines = (line for line in lines if line)
+        if next(lines, "") != "GIMP Gradient":
+            raise GradientFormatError(f"{path} is not a GIMP gradient")
+        line = next(lines, "")
+        name = os.path.splitext(os.path.basename(path))[0]
+        if line.startswith("Name:"):
+            name = line[5:].strip() or name
+            line = next(lines, "")
+        try:
+            segment_count = int(line)
+        except ValueError:
+            raise GradientFormatError(f"{path} has no segment count")
+
+        positions = []
+        colors = []
+        for _ in range(segment_count):
+            fields = next(lines, "").split()
+            if len(fields) < 11:
+                raise GradientFormatError(f"{path} has a truncated segment")
+            segment_positions, segment_colors = _ggr_segment_stops([float(field) for field in fields[:13]])
+            positions.append(segment_positions)
+            colors.append(segment_colors)
+
+    if not positions:
+        raise GradientFormatError(f"{path} has no segments")
+    colors = np.concatenate(colors)
+    colors[:, :3] = srgb_to_linear(np.clip(colors[:, :3], 0.0, 1.0))
+    yield name, Gradient(np.concatenate(positions), colors)
+
+
+# GMT / cpt-city .cpt
+
+def _cpt_color(tokens, color_model):
+    """Parse one color token group of a .cpt line: "r g b", "r/g/b", "h-s-v" or a gray level."""
+    if len(tokens) == 3:
+        values = [float(value) for value in tokens]
+    elif "/" in tokens[0]:
+        values = [float(value) for value in tokens[0].split("/")]
+    elif color_model.endswith("HSV") and "-" in tokens[0][1:]:
+        values = [float(value) for value in tokens[0].split("-")]
+    else:
+        values = [float(tokens[0])] * 3
+    if color_model.endswith("HSV"):
+        return hsv_to_rgb(np.array([values[0] / 360.0, values[1], values[2]]))
+    return np.array(values[:3]) / 255.0
+
+
+def read_cpt(path):
+    """Yield the gradient of a GMT/cpt-city color palette table."""
+    color_model = "RGB"
+    positions = []
+    colors = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("#"):
+                if "COLOR_MODEL" in line:
+                    color_model = line.split("=")[-1].strip().upper()
+                continue
+            tokens = line.split()
+            # Background, foreground and NaN colors are not part of the ramp
+            if tokens[0] in ("B", "F", "N"):
+                continue
+            # "z0 r g b z1 r g b" or "z0 color z1 color", optionally followed by an annotation
+            width = 3 if len(tokens) >= 8 else 1
+            try:
+                z0 = float(tokens[0])
+                color0 = _cpt_color(tokens[1:1 + width], color_model)
+                z1 = float(tokens[1 + width])
+                color1 = _cpt_color(tokens[2 + width:2 + 2 * width], color_model)
+            except (ValueError, IndexError):
+                raise GradientFormatError(f"{path} has an unreadable line: {line}")
+            positions.extend((z0, z1))
+            colors.extend((color0, color1))
+
+    if not positions:
+        raise GradientFormatError(f"{path} has no color slices")
+    positions = np.asarray(positions)
+    z_min, z_max = positions.min(), positions.max()
+    positions = (positions - z_min) / (z_max - z_min) if z_max > z_min else np.zeros_like(positions)
+    colors = srgb_to_linear(np.clip(np.asarray(colors), 0.0, 1.0))
+    name = os.path.splitext(os.path.basename(path))[0]
+    yield name, Gradient(positions, colors)
+
+
+# Photoshop .grd (version 5 descriptor format)
+
+class _DescriptorReader:
+    """Minimal reader for the Photoshop action descriptor structures in .grd files."""
+
+    def __init__(self, f, path):
+        self.f = f
+        self.path = path
+
+    def read(self, size):
+        data = self.f.read(size)
+        if len(data) != size:
+            raise GradientFormatError(f"{self.path} is truncated")
+        return data
+
+    def u32(self):
+        return struct.unpack(">I", self.read(4))[0]
+
+    def i32(self):
+        return struct.unpack(">i", self.read(4))[0]
+
+    def double(self):
+        return struct.unpack(">d", self.read(8))[0]
+
+    def unicode(self):
+        length = self.u32()
+        return self.read(length * 2).decode("utf-16-be").rstrip("\0")
+
+    def key(self):
+        length = self.u32()
+        return self.read(length if length else 4).decode("latin-1")
+
+    def descriptor_header(self):
+        self.unicode()
+        class_id = self.key()
+        return class_id, self.u32()
+
+    def descriptor(self):
+        """Read a whole descriptor into a dict of key -> value."""
+        _class_id, count = self.descriptor_header()
+        items = {}
+        for _ in range(count):
+            key = self.key()
+            items[key] = self.value(self.read(4).decode("latin-1"))
+        return items
+
+    def value(self, os_type):
+        if os_type in ("Objc", "GlbO"):
+            return self.descriptor()
+        if os_type == "VlLs":
+            return [self.value(self.read(4).decode("latin-1")) for _ in range(self.u32())]
+        if os_type == "doub":
+            return self.double()
+        if os_type == "UntF":
+            self.read(4)
+            return self.double()
+        if os_type == "UnFl":
+            self.read(4)
+            return [self.double() for _ in range(self.u32())]
+        if os_type == "TEXT":
+            return self.unicode()
+        if os_type == "enum":
+            self.key()
+            return self.key()
+        if os_type == "long":
+            return self.i32()
+        if os_type == "comp":
+            return struct.unpack(">q", self.read(8))[0]
+        if os_type == "bool":
+            return self.read(1) != b"\0"
+        if os_type in ("type", "GlbC"):
+            self.unicode()
+            return self.key()
+        if os_type in ("alis", "tdta"):
+            return self.read(self.u32())
+        raise GradientFormatError(f"{self.path} uses unsupported descriptor type '{os_type}'")
+
+
+def _lab_to_srgb(lab):
+    """CIE L*a*b* (D50, as Photoshop stores it) to sRGB display values."""
+    lightness, a, b = lab
+    fy = (lightness + 16.0) / 116.0
+    fx = fy + a / 500.0
+    fz = fy - b / 200.0
+    f = np.array([fx, fy, fz])
+    xyz = np.where(f ** 3 > 216.0 / 24389.0, f ** 3, (116.0 * f - 16.0) * 27.0 / 24389.0)
+    xyz *= np.array([0.96422, 1.0, 0.82521])
+    # Bradford-adapted D50 XYZ to linear sRGB, then encoded
+    matrix = np.array([
+        [3.1338561, -1.6168667, -0.4906146],
+        [-0.9787684, 1.9161415, 0.0334540],
+        [0.0719453, -0.2289914, 1.4052427],
+    ])
+    linear = np.clip(matrix @ xyz, 0.0, 1.0)
+    return np.where(linear <= 0.0031308, linear * 12.92, 1.055 * np.power(linear, 1.0 / 2.4) - 0.055)
+
+
+def _grd_color(color):
+    """sRGB display values of a Photoshop color descriptor."""
+    if "Rd  " in color:
+        return np.array([color["Rd  "], color["Grn "], color["Bl  "]]) / 255.0
+    if "H   " in color:
+        return hsv_to_rgb(np.array([color["H   "] / 360.0, color["Strt"] / 100.0, color["Brgh"] / 100.0]))
+    if "Gry " in color:
+        return np.full(3, 1.0 - color["Gry "] / 100.0)
+    if "Cyn " in color:
+        key = 1.0 - color["Blck"] / 100.0
+        return np.array([1.0 - color["Cyn "] / 100.0, 1.0 - color["Mgnt"] / 100.0, 1.0 - color["Ylw "] / 100.0]) * key
+    if "Lmnc" in color:
+        return _lab_to_srgb((color["Lmnc"], color["A   "], color["B   "]))
+    return np.zeros(3)
+
+
+def _grd_gradient(gradient):
+    """Convert one 'Grad' descriptor to a Gradient, or None for noise gradients."""
+    color_stops = gradient.get("Clrs")
+    if gradient.get("GrdF") == "ClNs" or not color_stops:
+        return None
+    color_stops = sorted(color_stops, key=lambda stop: stop.get("Lctn", 0))
+    color_positions, colors = _midpoint_stops(
+        [stop.get("Lctn", 0) / 4096.0 for stop in color_stops],
+        [_grd_color(stop.get("Clr ", {})) for stop in color_stops],
+        [stop.get("Mdpn", 50) / 100.0 for stop in color_stops],
+    )
+
+    alpha_stops = sorted(gradient.get("Trns") or [{"Opct": 100.0, "Lctn": 0}], key=lambda stop: stop.get("Lctn", 0))
+    alpha_positions, alphas = _midpoint_stops(
+        [stop.get("Lctn", 0) / 4096.0 for stop in alpha_stops],
+        [stop.get("Opct", 100.0) / 100.0 for stop in alpha_stops],
+        [stop.get("Mdpn", 50) / 100.0 for stop in alpha_stops],
+    )
+
+    positions, rgba = _merge_color_and_alpha(color_positions, colors, alpha_positions, alphas)
+    rgba[:, :3] = srgb_to_linear(np.clip(rgba[:, :3], 0.0, 1.0))
+    return Gradient(positions, rgba)
+
+
+def _grd_name(name, index):
+    # Built-in gradients store a localization key like "$$$/DefaultGradient/Name=Display Name"
+    if name.startswith("$$$") and "=" in name:
+        name = name.split("=", 1)[1]
+    return name.strip() or f"Gradient {index + 1}"
+
+
+def read_grd(path):
+    """Yield every gradient of a Photoshop .grd file, one at a time."""
+    with open(path, "rb") as f:
+        reader = _DescriptorReader(f, path)
+        if reader.read(4) != b"8BGR":
+            raise GradientFormatError(f"{path} is not a Photoshop gradient file")
+        version = struct.unpack(">H", reader.read(2))[0]
+        if version != 5:
+            raise GradientFormatError(f"{path} uses .grd version {version}, only version 5 (Photoshop 6 and later) is supported")
+        reader.read(4)
+
+        _class_id, count = reader.descriptor_header()
+        for _ in range(count):
+            key = reader.key()
+            os_type = reader.read(4).decode("latin-1")
+            if key != "GrdL" or os_type != "VlLs":
+                reader.value(os_type)
+                continue
+            # Stream the gradient list instead of reading it as a whole
+            for index in range(reader.u32()):
+                item = reader.value(reader.read(4).decode("latin-1"))
+                gradient = item.get("Grad", item) if isinstance(item, dict) else {}
+                converted = _grd_gradient(gradient)
+                if converted is not None:
+                    yield _grd_name(gradient.get("Nm  ", ""), index), converted
+
+
+READERS = {
+    ".ggr": read_ggr,
+    ".grd": read_grd,
+    ".cpt": read_cpt,
+}
+
+
+def read_gradients(path):
+    """Yield (name, Gradient) from any supported gradient file, picked by extension."""
+    extension = os.path.splitext(path)[1].lower()
+    reader = READERS.get(extension)
+    if reader is None:
+        raise GradientFormatError(f"Unsupported gradient file type '{extension}'")
+    return reader(path)
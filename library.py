@@ -0,0 +1,161 @@
+"""Reader and writer for .g2c gradient library files, which are memory-mapped so only the entries asked for are loaded."""
+import json
+import mmap
+import struct
+
+import numpy as np
+
+from .gradient_core import Gradient, FalloffCurve
+
+
+MAGIC = b"G2C\0"
+VERSION = 1
+FILE_EXTENSION = ".g2c"
+
+# Magic, version, entry count, index offset, index size
+_HEADER = struct.Struct("<4sIIQQ")
+
+GRADIENT = 'GRADIENT'
+CURVE = 'CURVE'
+
+# One letter per handle type keeps the index small
+_HANDLE_CODES = {'AUTO': "A", 'AUTO_CLAMPED': "C", 'VECTOR': "V"}
+_HANDLE_TYPES = {code: handle_type for handle_type, code in _HANDLE_CODES.items()}
+
+
+class LibraryError(Exception):
+    """Raised for files that are not valid .g2c libraries."""
+
+
+def write_library(path, entries):
+    """Write (category, name, Gradient or FalloffCurve) entries to a .g2c file.
+
+    Returns the number of entries written.
+    """
+    index = []
+    blobs = []
+    offset = _HEADER.size
+    for category, name, item in entries:
+        if isinstance(item, Gradient):
+            blob = np.concatenate((item.positions, item.colors.ravel())).astype("<f4")
+            index.append({
+                "kind": GRADIENT,
+                "category": category,
+                "name": name,
+                "offset": offset,
+                "count": len(item),
+                "interpolation": item.interpolation,
+                "color_mode": item.color_mode,
+                "hue_interpolation": item.hue_interpolation,
+            })
+        elif isinstance(item, FalloffCurve):
+            blob = item.locations.ravel().astype("<f4")
+            index.append({
+                "kind": CURVE,
+                "category": category,
+                "name": name,
+                "offset": offset,
+                "count": len(item),
+                "handles": "".join(_HANDLE_CODES[handle_type] for handle_type in item.handle_types),
+            })
+        else:
+            raise TypeError(f"Cannot store {type(item).__name__} in a gradient library")
+        blobs.append(blob)
+        offset += blob.nbytes
+
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(index), offset, len(index_bytes)))
+        for blob in blobs:
+            f.write(blob.tobytes())
+        f.write(index_bytes)
+    return len(index)
+
+
+class LibraryReader:
+    """Memory-mapped view of a .g2c file that loads entries on demand.
+
+    Use it as a context manager so the mapping is closed when done:
+
+        with LibraryReader(path) as library:
+            for entry in library.entries(category="Skin"):
+                gradient = library.load(entry)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise LibraryError(f"{path} is empty")
+        try:
+            self._index = self._read_index()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_index(self):
+        if len(self._map) < _HEADER.size:
+            raise LibraryError(f"{self.path} is too short to be a gradient library")
+        magic, version, count, index_offset, index_size = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise LibraryError(f"{self.path} is not a gradient library")
+        if version > VERSION:
+            raise LibraryError(f"{self.path} was written by a newer version ({version})")
+        if index_offset + index_size > len(self._map):
+            raise LibraryError(f"{self.path} is truncated")
+        index = json.loads(self._map[index_offset:index_offset + index_size].decode("utf-8"))
+        if len(index) != count:
+            raise LibraryError(f"{self.path} has a damaged index")
+        return index
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._index)
+
+    def categories(self):
+        """Category names in file order, without duplicates."""
+        return list(dict.fromkeys(entry["category"] for entry in self._index))
+
+    def entries(self, category=None, kind=None):
+        """Index entries, optionally limited to one category and/or kind."""
+        return [
+            entry for entry in self._index
+            if (category is None or entry["category"] == category) and (kind is None or entry["kind"] == kind)
+        ]
+
+    def _floats(self, entry, per_item):
+        return np.frombuffer(self._map, dtype="<f4", count=entry["count"] * per_item, offset=entry["offset"])
+
+    def load(self, entry):
+        """Build the Gradient or FalloffCurve stored for an index entry."""
+        count = entry["count"]
+        if entry["kind"] == GRADIENT:
+            floats = self._floats(entry, 5)
+            return Gradient(
+                floats[:count],
+                floats[count:].reshape(count, 4),
+                entry["interpolation"],
+                entry["color_mode"],
+                entry["hue_interpolation"],
+            )
+        if entry["kind"] == CURVE:
+            floats = self._floats(entry, 2)
+            handle_types = [_HANDLE_TYPES[code] for code in entry["handles"]]
+            return FalloffCurve(floats.reshape(count, 2), handle_types)
+        raise LibraryError(f"Unknown entry kind '{entry['kind']}' in {self.path}")
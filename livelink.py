@@ -0,0 +1,111 @@
+"""Live link: push edits of the active ramp or curve to the brush as they happen.
+
+Property edits of color ramp stops and curve points arrive through bpy.msgbus,
+drags in the ramp and curve widgets (which bypass RNA) through the depsgraph.
+Either only schedules a push. The push runs from a bpy.app.timers callback at
+most every PUSH_INTERVAL seconds and writes nothing unless the content hash of
+the source changed, so a slider drag costs a handful of writes instead of one
+per redraw. Subscriptions last for the session: file load switches the link off.
+"""
+import bpy
+from bpy.app.handlers import persistent
+
+from . import registry
+
+
+PUSH_INTERVAL = 0.1
+
+TARGETS = ('OFF', 'GRADIENT', 'FALLOFF', 'CAVITY')
+
+# Any instance of these properties changing may be the linked ramp or curve
+_SUBSCRIBED_KEYS = (
+    (bpy.types.ColorRampElement, "position"),
+    (bpy.types.ColorRampElement, "color"),
+    (bpy.types.ColorRamp, "interpolation"),
+    (bpy.types.ColorRamp, "color_mode"),
+    (bpy.types.ColorRamp, "hue_interpolation"),
+    (bpy.types.CurveMapPoint, "location"),
+    (bpy.types.CurveMapPoint, "handle_type"),
+)
+
+# msgbus owner token, subscriptions are cleared through it
+_owner = object()
+
+target = 'OFF'
+_source = None
+_push = None
+# (node name, content hash) of the last push
+_pushed = None
+
+
+def is_linked():
+    return target != 'OFF'
+
+
+def start(link_target, source, push):
+    """Link the node returned by source(context) to push(context, node).
+
+    Pushes once right away, then again after edits, at most every PUSH_INTERVAL.
+    """
+    global target, _source, _push
+    stop()
+    target, _source, _push = link_target, source, push
+    for key in _SUBSCRIBED_KEYS:
+        bpy.msgbus.subscribe_rna(key=key, owner=_owner, args=(), notify=schedule)
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+    schedule()
+
+
+def stop():
+    global target, _source, _push, _pushed
+    bpy.msgbus.clear_by_owner(_owner)
+    if on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
+    if bpy.app.timers.is_registered(_flush):
+        bpy.app.timers.unregister(_flush)
+    target, _source, _push, _pushed = 'OFF', None, None, None
+
+
+def schedule(*args):
+    """Coalesce an edit into the next push."""
+    if _source is not None and not bpy.app.timers.is_registered(_flush):
+        bpy.app.timers.register(_flush, first_interval=PUSH_INTERVAL)
+
+
+def _flush():
+    global _pushed
+    if _source is None:
+        return None
+    context = bpy.context
+    node = _source(context)
+    if node is None:
+        return None
+    # The brush writes land here again as msgbus notifications, the hash stops the loop
+    content = (node.name, registry.node_content_hash(node))
+    if content != _pushed:
+        _push(context, node)
+        _pushed = content
+    return None
+
+
+@persistent
+def on_depsgraph_update(scene, depsgraph):
+    for update in depsgraph.updates:
+        if isinstance(update.id, (bpy.types.Material, bpy.types.NodeTree)):
+            schedule()
+            return
+
+
+@persistent
+def on_file_changed(*args):
+    stop()
+
+
+def register():
+    bpy.app.handlers.load_post.append(on_file_changed)
+
+
+def unregister():
+    stop()
+    if on_file_changed in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_file_changed)
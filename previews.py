@@ -0,0 +1,67 @@
+"""Baked preview strips for the gradient list.
+
+Each ColorRamp is baked once into a small preview icon keyed by a hash of its
+stops and settings, so list rows only pay for an icon draw. The icons live in a
+bounded LRU so long sessions do not grow the preview collection without limit.
+"""
+from collections import OrderedDict
+
+import bpy
+import bpy.utils.previews
+import numpy as np
+
+from .gradient_core import Gradient
+
+
+ICON_SIZE = 32
+MAX_ICONS = 512
+
+_collection = None
+# Content hash -> icon_id, least recently drawn first
+_icons = OrderedDict()
+
+
+def bake_gradient_pixels(gradient, width=ICON_SIZE, height=ICON_SIZE):
+    """Sample a Gradient into a flat RGBA float buffer, one strip per row."""
+    strip = gradient.sample(width).astype(np.float32)
+    return np.ascontiguousarray(np.tile(strip, (height, 1)).ravel())
+
+
+def ramp_icon(color_ramp):
+    """Return the icon_id of the baked preview for a ColorRamp, baking it on a miss."""
+    if _collection is None:
+        return 0
+
+    gradient = Gradient.from_color_ramp(color_ramp)
+    key = gradient.content_hash()
+    icon_id = _icons.get(key)
+    if icon_id is not None:
+        _icons.move_to_end(key)
+        return icon_id
+
+    pixels = bake_gradient_pixels(gradient)
+    preview = _collection.new(key)
+    preview.icon_size = (ICON_SIZE, ICON_SIZE)
+    preview.icon_pixels_float.foreach_set(pixels)
+    preview.image_size = (ICON_SIZE, ICON_SIZE)
+    preview.image_pixels_float.foreach_set(pixels)
+    _icons[key] = preview.icon_id
+
+    while len(_icons) > MAX_ICONS:
+        old_key, _old_icon = _icons.popitem(last=False)
+        del _collection[old_key]
+
+    return preview.icon_id
+
+
+def register():
+    global _collection
+    _collection = bpy.utils.previews.new()
+
+
+def unregister():
+    global _collection
+    if _collection is not None:
+        bpy.utils.previews.remove(_collection)
+        _collection = None
+    _icons.clear()
@@ -0,0 +1,110 @@
+"""Color quantization of image pixels into a few representative colors, by median cut or k-means in OKLab."""
+import numpy as np
+
+from .gradient_core import linear_to_oklab, oklab_to_linear, srgb_to_linear
+
+
+MEDIAN_CUT = 'MEDIAN_CUT'
+KMEANS = 'KMEANS'
+
+METHOD_ITEMS = [
+    (KMEANS, "K-Means", "Mini-batch k-means started from median cut, closest to the image's colors"),
+    (MEDIAN_CUT, "Median Cut", "Split the colors at their median until there are enough groups, the fastest"),
+]
+
+# Pixels clustered at most; larger images are randomly subsampled down to this
+DEFAULT_MAX_SAMPLES = 1 << 18
+# Pixels more transparent than this are left out
+ALPHA_THRESHOLD = 0.5
+
+
+def sample_pixels(pixels, max_samples=DEFAULT_MAX_SAMPLES, seed=0):
+    """Opaque RGB rows of an [n, 4] RGBA array, randomly subsampled to at most max_samples."""
+    if max_samples and len(pixels) > max_samples:
+        # Sampling with replacement needs no permutation of the whole image
+        pixels = pixels[np.random.default_rng(seed).integers(0, len(pixels), max_samples)]
+    return pixels[pixels[:, 3] >= ALPHA_THRESHOLD, :3]
+
+
+def _box(colors):
+    # (colors, squared error around the mean per channel); the total is what a split can reduce
+    return colors, colors.var(axis=0) * len(colors)
+
+
+def median_cut(colors, count):
+    """(centers[k, d], weights[k]) of up to count boxes of colors, k less when colors run out."""
+    boxes = [_box(colors)]
+    while len(boxes) < count:
+        # Split the box with the largest squared error, across its channel of largest variance
+        index = max(range(len(boxes)), key=lambda i: boxes[i][1].sum())
+        box, error = boxes[index]
+        if len(box) < 2 or error.sum() <= 0.0:
+            break
+        del boxes[index]
+        half = len(box) // 2
+        order = np.argpartition(box[:, int(np.argmax(error))], half)
+        boxes += [_box(box[order[:half]]), _box(box[order[half:]])]
+    centers = np.array([box.mean(axis=0) for box, _error in boxes])
+    weights = np.array([len(box) for box, _error in boxes], dtype=np.float64)
+    return centers, weights / weights.sum()
+
+
+def _nearest(colors, centers):
+    # |a - b|^2 = |a|^2 - 2ab + |b|^2, the |a|^2 term does not change the argmin
+    distances = (centers * centers).sum(axis=1) - 2.0 * colors @ centers.T
+    return distances.argmin(axis=1)
+
+
+def kmeans(colors, count, iterations=32, batch_size=4096, seed=0):
+    """(centers[k, d], weights[k]) from mini-batch k-means seeded by median cut."""
+    centers, _weights = median_cut(colors, count)
+    rng = np.random.default_rng(seed)
+    seen = np.zeros(len(centers))
+    for _ in range(iterations):
+        batch = colors[rng.integers(0, len(colors), min(batch_size, len(colors)))]
+        labels = _nearest(batch, centers)
+        # Each center moves towards the mean of its batch members, by less the more it has seen
+        hits = np.bincount(labels, minlength=len(centers))
+        sums = np.stack([np.bincount(labels, batch[:, d], minlength=len(centers)) for d in range(batch.shape[1])], axis=1)
+        moved = hits > 0
+        seen[moved] += hits[moved]
+        rate = (hits[moved] / seen[moved])[:, None]
+        centers[moved] += rate * (sums[moved] / hits[moved][:, None] - centers[moved])
+    hits = np.bincount(_nearest(colors, centers), minlength=len(centers)).astype(np.float64)
+    used = hits > 0
+    return centers[used], hits[used] / hits.sum()
+
+
+def extract_colors(pixels, count, method=KMEANS, max_samples=DEFAULT_MAX_SAMPLES, is_linear=True, seed=0):
+    """The count most representative linear RGB colors of [n, 4] RGBA pixels, darkest first.
+
+    Returns (colors[k, 3], weights[k]) with the share of pixels each color
+    stands for; k is less than count for images with fewer distinct colors,
+    and 0 when every pixel is transparent. Byte images hold sRGB display
+    values, pass is_linear=False for them.
+    """
+    rgb = sample_pixels(np.asarray(pixels, dtype=np.float32), max_samples, seed)
+    if not len(rgb):
+        return np.empty((0, 3)), np.empty(0)
+    if not is_linear:
+        rgb = srgb_to_linear(rgb)
+    lab = linear_to_oklab(np.clip(rgb, 0.0, None))
+    if method == MEDIAN_CUT:
+        centers, weights = median_cut(lab, count)
+    else:
+        centers, weights = kmeans(lab, count, seed=seed)
+    order = np.argsort(centers[:, 0], kind="stable")
+    colors = np.clip(oklab_to_linear(centers[order]), 0.0, 1.0)
+    return colors, weights[order]
+
+
+def stop_positions(weights, by_coverage=False):
+    """Ramp positions for colors in order: evenly spaced, or centered on each color's share."""
+    count = len(weights)
+    if count == 1:
+        return np.full(1, 0.5)
+    if not by_coverage:
+        return np.linspace(0.0, 1.0, count)
+    edges = np.concatenate(([0.0], np.cumsum(weights)))
+    edges /= edges[-1]
+    return (edges[:-1] + edges[1:]) * 0.5
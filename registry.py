@@ -0,0 +1,332 @@
+"""Cached lookups the manager UI and operators hit repeatedly.
+
+Scanning bpy.data.objects from enum callbacks and poll functions gets slow in
+big scenes, so the horcrux index is built once and only rebuilt after the
+depsgraph, file load or undo handlers below notice that it went stale. The
+content index works the same way per category: only materials the depsgraph
+reports as edited get their nodes hashed again, the node lookup forgets the
+node references of those categories and the search index reads their tags and
+hues again. Categories are looked up through the storage module, so both
+storage backends share these caches.
+"""
+import hashlib
+
+import bpy
+from bpy.app.handlers import persistent
+
+from . import search, storage
+from .gradient_core import Gradient, FalloffCurve
+
+
+NO_HORCRUX_ITEMS = [("NONE", "No Horcrux Found", "")]
+
+# Blender needs Python to keep the strings of dynamic enum items alive,
+# so the item lists are module level and only replaced on rebuild
+_horcrux_names = set()
+_horcrux_items = NO_HORCRUX_ITEMS
+_object_count = -1
+_horcrux_dirty = True
+
+# Horcrux name -> (material slot signature, enum items)
+_material_items = {}
+_NO_MATERIAL_ITEMS = []
+# (node group names, enum items) of the node group categories
+_group_items = ((), [])
+# (category item names, library names, enum items) once the library file adds to them
+_library_items = ((), (), [])
+
+
+def is_horcrux(obj):
+    """True for mesh objects that hold gradient and falloff categories."""
+    return obj.type == 'MESH' and "horcrux" in obj.name.lower()
+
+
+def invalidate_horcruxes():
+    """Mark the horcrux index stale so the next lookup rebuilds it."""
+    global _horcrux_dirty
+    _horcrux_dirty = True
+
+
+def _rebuild_horcruxes():
+    global _horcrux_names, _horcrux_items, _object_count, _horcrux_dirty
+    objects = bpy.data.objects
+    names = [obj.name for obj in objects if is_horcrux(obj)]
+    _horcrux_names = set(names)
+    _horcrux_items = [(name, name, "") for name in names] or NO_HORCRUX_ITEMS
+    _object_count = len(objects)
+    _horcrux_dirty = False
+    # Drop material items of horcruxes that no longer exist
+    for name in [name for name in _material_items if name not in _horcrux_names]:
+        del _material_items[name]
+
+
+def horcrux_enum_items():
+    """Enum items for the horcrux dropdown, rebuilt only when stale."""
+    if _horcrux_dirty:
+        _rebuild_horcruxes()
+    return _horcrux_items
+
+
+def has_horcrux():
+    """True if the blend file already holds at least one horcrux object."""
+    if _horcrux_dirty:
+        _rebuild_horcruxes()
+    return bool(_horcrux_names)
+
+
+def _material_names(materials):
+    return tuple(mat.name if mat else "" for mat in materials)
+
+
+def _signature_matches(signature, materials):
+    if len(signature) != len(materials):
+        return False
+    for name, mat in zip(signature, materials):
+        if (mat.name if mat else "") != name:
+            return False
+    return True
+
+
+def material_enum_items(horcrux_object):
+    """Enum items for the horcrux's material categories.
+
+    The items are rebuilt only when the material slot names or count change,
+    which also keeps their strings referenced for as long as Blender shows them.
+    """
+    if horcrux_object is None or horcrux_object.type != 'MESH':
+        return _NO_MATERIAL_ITEMS
+    materials = horcrux_object.data.materials
+    cached = _material_items.get(horcrux_object.name)
+    if cached is not None and _signature_matches(cached[0], materials):
+        return cached[1]
+    signature = _material_names(materials)
+    items = [(name, name, "") for name in signature if name]
+    _material_items[horcrux_object.name] = (signature, items)
+    return items
+
+
+def category_enum_items(color_ramp_manager):
+    """Enum items for the categories of the manager's storage backend.
+
+    The categories of the external library file come after the local ones,
+    whether they are linked already or get linked once chosen.
+    """
+    global _group_items, _library_items
+    library_names = tuple(storage.library_category_names(color_ramp_manager))
+    if storage.uses_horcrux(color_ramp_manager):
+        items = material_enum_items(bpy.data.objects.get(color_ramp_manager.selected_horcrux))
+    else:
+        # Groups linked from the library file stay among its items, so linking one renumbers nothing
+        signature = tuple(
+            group.name for group in storage.categories(color_ramp_manager)
+            if not (storage.is_linked(group) and group.name in library_names)
+        )
+        if signature != _group_items[0]:
+            _group_items = (signature, [(name, name, "") for name in signature])
+        items = _group_items[1]
+
+    if not library_names:
+        return items
+    signature = tuple(item[0] for item in items)
+    if (signature, library_names) != _library_items[:2]:
+        names = set(signature)
+        extra = [(name, name, "From the library file") for name in library_names if name not in names]
+        _library_items = (signature, library_names, items + extra)
+    return _library_items[2]
+
+
+def node_content_hash(node):
+    """Content hash of a ColorRamp or RGB Curve node, None for other nodes."""
+    if node.type == 'VALTORGB':
+        return Gradient.from_color_ramp(node.color_ramp).content_hash()
+    if node.type == 'CURVE_RGB':
+        # All four channels count, so curves that only share the composite stay apart
+        digest = hashlib.blake2b(digest_size=16)
+        for curve_map in node.mapping.curves:
+            digest.update(FalloffCurve.from_curve_map(curve_map).content_hash().encode())
+        return digest.hexdigest()
+    return None
+
+
+class ContentIndex:
+    """Content hash index over the ramps and curves of horcrux categories.
+
+    Keys are (category name, node name). Categories are rehashed only when
+    they are new to the index, marked dirty, or their node count changed.
+    """
+
+    def __init__(self):
+        self.hashes = {}
+        self.groups = {}
+        self._materials = {}
+        self._node_counts = {}
+        self._dirty = set()
+
+    def clear(self):
+        self.hashes.clear()
+        self.groups.clear()
+        self._materials.clear()
+        self._node_counts.clear()
+        self._dirty.clear()
+
+    def mark_dirty(self, material_name):
+        if material_name in self._materials:
+            self._dirty.add(material_name)
+
+    def _forget_material(self, material_name):
+        for key in self._materials.pop(material_name, ()):
+            content = self.hashes.pop(key, None)
+            group = self.groups.get(content)
+            if group is not None:
+                group.discard(key)
+                if not group:
+                    del self.groups[content]
+
+    def add(self, material_name, node_name, content):
+        key = (material_name, node_name)
+        self.hashes[key] = content
+        self.groups.setdefault(content, set()).add(key)
+        self._materials.setdefault(material_name, set()).add(key)
+
+    def update_material(self, material):
+        """Rehash every ramp and curve node of one category."""
+        self._forget_material(material.name)
+        self._dirty.discard(material.name)
+        self._materials[material.name] = set()
+        node_tree = storage.node_tree(material)
+        if node_tree:
+            for node in node_tree.nodes:
+                content = node_content_hash(node)
+                if content is not None:
+                    self.add(material.name, node.name, content)
+
+    def refresh(self, materials):
+        """Bring the index up to date for the given categories."""
+        names = set()
+        for material in materials:
+            if not material:
+                continue
+            names.add(material.name)
+            known = self._materials.get(material.name)
+            node_tree = storage.node_tree(material)
+            node_count = len(node_tree.nodes) if node_tree else 0
+            if known is None or material.name in self._dirty or node_count != self._node_counts.get(material.name):
+                self.update_material(material)
+                self._node_counts[material.name] = node_count
+        for name in [name for name in self._materials if name not in names]:
+            self._forget_material(name)
+            self._node_counts.pop(name, None)
+        return self
+
+    def find(self, content):
+        """(material, node) keys holding this content, empty if it is new."""
+        return self.groups.get(content, set())
+
+    def duplicate_groups(self):
+        """Lists of keys that share the same content, only where there is more than one."""
+        return [sorted(keys) for keys in self.groups.values() if len(keys) > 1]
+
+
+content_index = ContentIndex()
+
+
+class NodeLookup:
+    """(category name, node name) -> ColorRamp or RGB Curve node.
+
+    Each category is indexed in one pass over its node tree the first time
+    one of its nodes is asked for, and again when a node is missing from it.
+    Node references must not outlive the nodes, so a category is forgotten
+    whenever its node tree is reported changed or nodes are removed from it,
+    and everything is forgotten when categories are added or removed.
+    """
+
+    def __init__(self):
+        self._categories = {}
+        self._counts = None
+
+    def clear(self):
+        self._categories.clear()
+
+    def invalidate(self, category_name):
+        self._categories.pop(category_name, None)
+
+    def _index(self, color_ramp_manager, category_name):
+        node_tree = storage.get_category_tree(color_ramp_manager, category_name)
+        if node_tree is None:
+            return None
+        nodes = {node.name: node for node in node_tree.nodes if node.type in {'VALTORGB', 'CURVE_RGB'}}
+        self._categories[category_name] = nodes
+        return nodes
+
+    def get(self, color_ramp_manager, category_name, node_name):
+        counts = (len(bpy.data.materials), len(bpy.data.node_groups))
+        if counts != self._counts:
+            self._categories.clear()
+            self._counts = counts
+        nodes = self._categories.get(category_name)
+        if nodes is None or node_name not in nodes:
+            nodes = self._index(color_ramp_manager, category_name)
+        return nodes.get(node_name) if nodes else None
+
+
+node_lookup = NodeLookup()
+
+
+def category_content_index(color_ramp_manager):
+    """The content index, refreshed for the categories of the manager's storage backend."""
+    return content_index.refresh(storage.categories(color_ramp_manager))
+
+
+def _horcruxes_changed(depsgraph):
+    objects = bpy.data.objects
+    if len(objects) != _object_count:
+        return True
+    # Renamed away from a horcrux name, or deleted and replaced in one step
+    for name in _horcrux_names:
+        if name not in objects:
+            return True
+    for update in depsgraph.updates:
+        obj = update.id
+        if isinstance(obj, bpy.types.Object) and is_horcrux(obj) != (obj.name in _horcrux_names):
+            return True
+    return False
+
+
+@persistent
+def on_depsgraph_update(scene, depsgraph):
+    if not _horcrux_dirty and _horcruxes_changed(depsgraph):
+        invalidate_horcruxes()
+    for update in depsgraph.updates:
+        if isinstance(update.id, (bpy.types.Material, bpy.types.NodeTree)):
+            content_index.mark_dirty(update.id.name)
+            node_lookup.invalidate(update.id.name)
+            search.index.mark_category_stale(update.id.name)
+
+
+@persistent
+def on_file_changed(*args):
+    invalidate_horcruxes()
+    _material_items.clear()
+    content_index.clear()
+    node_lookup.clear()
+    search.index.clear()
+    storage.forget_library_listing()
+
+
+def register():
+    invalidate_horcruxes()
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+    bpy.app.handlers.load_post.append(on_file_changed)
+    bpy.app.handlers.undo_post.append(on_file_changed)
+    bpy.app.handlers.redo_post.append(on_file_changed)
+
+
+def unregister():
+    for handlers, handler in (
+        (bpy.app.handlers.depsgraph_update_post, on_depsgraph_update),
+        (bpy.app.handlers.load_post, on_file_changed),
+        (bpy.app.handlers.undo_post, on_file_changed),
+        (bpy.app.handlers.redo_post, on_file_changed),
+    ):
+        if handler in handlers:
+            handlers.remove(handler)
@@ -0,0 +1,232 @@
+"""Inverted index for finding gradients and curves by name, tag or hue, with prefix and typo-tolerant matching."""
+import bisect
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from .gradient_core import rgb_to_hsv
+
+
+TAGS_PROPERTY = "g2c_tags"
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Scores of the ways a query word can match a token
+EXACT = 3
+PREFIX = 2
+FUZZY = 1
+
+# Hue names by upper bound of their hue range, in degrees
+_HUES = (
+    (15.0, "red"),
+    (45.0, "orange"),
+    (70.0, "yellow"),
+    (160.0, "green"),
+    (200.0, "cyan"),
+    (260.0, "blue"),
+    (290.0, "purple"),
+    (335.0, "magenta"),
+    (360.0, "red"),
+)
+_HUE_EDGES = np.array([edge for edge, _name in _HUES])
+# Samples taken along a gradient to find its dominant hues
+HUE_SAMPLES = 32
+
+
+def words(text):
+    return _WORD.findall(text.lower())
+
+
+def parse_tags(text):
+    """Comma or space separated tags as a sorted list of lowercase words."""
+    return sorted(set(words(text)))
+
+
+def dominant_hues(colors, share=0.2):
+    """Names of the hues covering at least share of the sampled RGBA colors.
+
+    Colors with little saturation count as "gray", and the "dark" and "light"
+    words are added when most samples are very dark or very bright.
+    """
+    rgb = np.clip(np.asarray(colors, dtype=np.float64)[:, :3], 0.0, 1.0)
+    total = len(rgb)
+    if not total:
+        return []
+    hsv = rgb_to_hsv(rgb)
+    colorful = (hsv[:, 1] > 0.2) & (hsv[:, 2] > 0.1)
+
+    counts = defaultdict(int)
+    buckets = np.searchsorted(_HUE_EDGES, hsv[colorful, 0] * 360.0, side='right').clip(0, len(_HUES) - 1)
+    for bucket, count in zip(*np.unique(buckets, return_counts=True)):
+        counts[_HUES[bucket][1]] += int(count)
+    counts["gray"] = int((~colorful).sum())
+    names = {name for name, count in counts.items() if count >= share * total}
+    if (hsv[:, 2] < 0.2).sum() >= total / 2:
+        names.add("dark")
+    if (rgb.min(axis=1) > 0.8).sum() >= total / 2:
+        names.add("light")
+    return sorted(names)
+
+
+def row_tokens(key, tags=(), hues=()):
+    """Tokens of a row: the words of its name and category, its tags and hues."""
+    _kind, category, name = key
+    return {*words(name), *words(category), *tags, *hues}
+
+
+def _trigrams(token):
+    padded = f"^{token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _within_distance(a, b, limit):
+    """True if the edit distance between a and b is at most limit."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class SearchIndex:
+    """Token postings over list rows, updated one row at a time."""
+
+    def __init__(self):
+        self._postings = defaultdict(set)
+        self._tokens = {}
+        self._by_category = defaultdict(set)
+        self._counts = defaultdict(int)
+        self._trigrams = defaultdict(set)
+        self._vocabulary = []
+        self._vocabulary_stale = False
+        # Rows whose tags and hues need reading again, because they are new or their category changed
+        self.stale = set()
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def __contains__(self, key):
+        return key in self._tokens
+
+    def clear(self):
+        self._postings.clear()
+        self._tokens.clear()
+        self._by_category.clear()
+        self._counts.clear()
+        self._trigrams.clear()
+        self._vocabulary = []
+        self._vocabulary_stale = False
+        self.stale.clear()
+
+    def keys(self):
+        return self._tokens.keys()
+
+    def count(self, kind):
+        return self._counts[kind]
+
+    def set(self, key, tokens):
+        """Index key under tokens, replacing whatever it was indexed under."""
+        tokens = set(tokens)
+        old = self._tokens.get(key)
+        if old is None:
+            old = set()
+            self._counts[key[0]] += 1
+        for token in old - tokens:
+            postings = self._postings[token]
+            postings.discard(key)
+            if not postings:
+                del self._postings[token]
+                for trigram in _trigrams(token):
+                    self._trigrams[trigram].discard(token)
+                self._vocabulary_stale = True
+        for token in tokens - old:
+            if token not in self._postings:
+                for trigram in _trigrams(token):
+                    self._trigrams[trigram].add(token)
+                self._vocabulary_stale = True
+            self._postings[token].add(key)
+        self._tokens[key] = tokens
+        self._by_category[key[1]].add(key)
+
+    def add(self, key):
+        """Index a new row by name, its tags and hues follow on the next refresh."""
+        if key not in self._tokens:
+            self.set(key, row_tokens(key))
+        self.stale.add(key)
+
+    def remove(self, key):
+        if key in self._tokens:
+            self.set(key, ())
+            del self._tokens[key]
+            self._counts[key[0]] -= 1
+            keys = self._by_category[key[1]]
+            keys.discard(key)
+            if not keys:
+                del self._by_category[key[1]]
+        self.stale.discard(key)
+
+    def mark_category_stale(self, category):
+        self.stale.update(self._by_category.get(category, ()))
+
+    def refresh(self, describe):
+        """Re-index the stale rows, describe(key) returning their (tags, hues)."""
+        for key in self.stale:
+            if key in self._tokens:
+                self.set(key, row_tokens(key, *describe(key)))
+        self.stale.clear()
+
+    def _vocabulary_sorted(self):
+        if self._vocabulary_stale:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_stale = False
+        return self._vocabulary
+
+    def _matching_tokens(self, word):
+        """token -> score for every token the query word matches."""
+        matches = {}
+        vocabulary = self._vocabulary_sorted()
+        start = bisect.bisect_left(vocabulary, word)
+        for token in vocabulary[start:]:
+            if not token.startswith(word):
+                break
+            matches[token] = EXACT if token == word else PREFIX
+        if len(word) >= 3:
+            limit = 1 if len(word) < 6 else 2
+            counts = defaultdict(int)
+            for trigram in _trigrams(word):
+                for token in self._trigrams.get(trigram, ()):
+                    counts[token] += 1
+            # Each edit spoils at most three trigrams
+            needed = max(1, len(word) - 3 * limit)
+            for token, shared in counts.items():
+                if token not in matches and shared >= needed and _within_distance(word, token, limit):
+                    matches[token] = FUZZY
+        return matches
+
+    def query(self, text, kind=None):
+        """key -> score of the rows matching every word of text, optionally of one kind."""
+        result = None
+        for word in words(text):
+            scores = {}
+            for token, score in self._matching_tokens(word).items():
+                for key in self._postings[token]:
+                    if kind is None or key[0] == kind:
+                        if scores.get(key, 0) < score:
+                            scores[key] = score
+            if result is None:
+                result = scores
+            else:
+                result = {key: total + scores[key] for key, total in result.items() if key in scores}
+            if not result:
+                return {}
+        return result or {}
+
+
+index = SearchIndex()
@@ -0,0 +1,152 @@
+"""Opt-in timing of operators and panel draws, kept in per-class log-scale histograms."""
+import functools
+import logging
+import math
+import time
+
+
+log = logging.getLogger("gradient2colorramp")
+
+# Histogram buckets: 10 per decade from 10 microseconds to 100 seconds
+_BUCKETS_PER_DECADE = 10
+_MIN_MS = 0.01
+_BUCKET_COUNT = 7 * _BUCKETS_PER_DECADE + 1
+
+_TIMED_METHODS = ("execute", "draw")
+
+_instrumented = []
+_originals = {}
+_enabled = False
+
+
+class Timing:
+    """Call count and latency histogram of one operator or panel."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * _BUCKET_COUNT
+
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[_bucket(ms)] += 1
+
+    def percentile(self, fraction):
+        """Upper edge of the bucket holding the given fraction of calls, in ms."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, hits in enumerate(self.buckets):
+            seen += hits
+            if seen >= rank:
+                return min(_bucket_edge(index), self.max_ms)
+        return self.max_ms
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+
+timings = {}
+
+
+def _bucket(ms):
+    if ms <= _MIN_MS:
+        return 0
+    return min(int(math.log10(ms / _MIN_MS) * _BUCKETS_PER_DECADE) + 1, _BUCKET_COUNT - 1)
+
+
+def _bucket_edge(index):
+    return _MIN_MS * 10.0 ** (index / _BUCKETS_PER_DECADE)
+
+
+def record(name, ms, **fields):
+    """Add one timed call to the histogram of name and log it."""
+    timing = timings.get(name)
+    if timing is None:
+        timing = timings[name] = Timing()
+    timing.add(ms)
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("%s took %.3f ms", name, ms, extra={"g2c_name": name, "g2c_ms": ms, **fields})
+
+
+def _timed(name, method):
+    @functools.wraps(method)
+    def wrapper(self, context, *args):
+        start = time.perf_counter()
+        try:
+            result = method(self, context, *args)
+        except Exception:
+            record(name, (time.perf_counter() - start) * 1000.0, g2c_result="EXCEPTION")
+            raise
+        record(name, (time.perf_counter() - start) * 1000.0, g2c_result=result)
+        return result
+    return wrapper
+
+
+def stat_name(cls, method_name):
+    idname = getattr(cls, "bl_idname", cls.__name__)
+    return idname if method_name == "execute" else f"{idname} ({method_name})"
+
+
+def _patch(cls):
+    for method_name in _TIMED_METHODS:
+        method = cls.__dict__.get(method_name)
+        if method is not None:
+            _originals[(cls, method_name)] = method
+            setattr(cls, method_name, _timed(stat_name(cls, method_name), method))
+
+
+def _unpatch():
+    for (cls, method_name), method in _originals.items():
+        setattr(cls, method_name, method)
+    _originals.clear()
+
+
+def instrument(classes):
+    """Remember the classes whose execute and draw methods get timed."""
+    _instrumented.extend(cls for cls in classes if cls not in _instrumented)
+    if _enabled:
+        _unpatch()
+        for cls in _instrumented:
+            _patch(cls)
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_enabled(enabled):
+    """Swap the timed wrappers in or out of every instrumented class."""
+    global _enabled
+    enabled = bool(enabled)
+    if enabled == _enabled:
+        return
+    _enabled = enabled
+    if enabled:
+        for cls in _instrumented:
+            _patch(cls)
+    else:
+        _unpatch()
+    log.info("Operator timing %s", "enabled" if enabled else "disabled")
+
+
+def reset():
+    timings.clear()
+
+
+def clear():
+    """Restore the original methods and forget every instrumented class."""
+    set_enabled(False)
+    _instrumented.clear()
+    reset()
+
+
+def summary():
+    """(name, count, p50 ms, p95 ms) rows sorted by total time spent."""
+    ordered = sorted(timings.items(), key=lambda item: item[1].total_ms, reverse=True)
+    return [(name, timing.count, timing.percentile(0.5), timing.percentile(0.95)) for name, timing in ordered]
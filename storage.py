@@ -0,0 +1,218 @@
+"""Where the gradient and falloff categories keep their nodes.
+
+A category is a data-block holding a node tree of ColorRamp and RGB Curve
+nodes, found by name. The MATERIAL backend uses the materials on the horcrux
+object, which is how the add-on always stored them. The NODE_GROUP backend uses
+shader node groups tagged with CATEGORY_PROPERTY and kept alive by a fake
+user: no material uses them, so editing a stored gradient never makes a shader
+recompile, and no horcrux object is needed at all. The tag holds the order the
+groups were created in, so they are listed in the same order as the material
+slots they would have filled.
+
+Either backend can also draw categories from an external library file, a
+shared .blend named by the manager's library_filepath. Its categories are
+listed from the data-block names alone, which bpy.data.libraries.load reads
+without loading anything, and each one is linked on its own the first time it
+is displayed. Linked categories are read-only, and a local category of the
+same name takes precedence.
+"""
+import os
+
+import bpy
+
+
+MATERIAL = 'MATERIAL'
+NODE_GROUP = 'NODE_GROUP'
+
+BACKEND_ITEMS = [
+    (MATERIAL, "Horcrux Materials", "Keep each category in a material on the horcrux object"),
+    (NODE_GROUP, "Node Groups", "Keep each category in a node group no shader uses, without a horcrux object"),
+]
+
+CATEGORY_PROPERTY = "g2c_category"
+
+# ((library_filepath, bpy.data collection name), modification time, category names) of the last library listing
+_library_listing = (None, None, [])
+
+
+def node_tree(category):
+    """Node tree holding the nodes of a category, None when it has none."""
+    if category is None:
+        return None
+    if isinstance(category, bpy.types.NodeTree):
+        return category
+    return category.node_tree if category.use_nodes else None
+
+
+def is_category_group(node_group):
+    return node_group.bl_idname == 'ShaderNodeTree' and bool(node_group.get(CATEGORY_PROPERTY))
+
+
+def _category_order(node_group):
+    # Groups tagged before the tag held an order read back as True, that is 1
+    return int(node_group.get(CATEGORY_PROPERTY))
+
+
+def uses_horcrux(color_ramp_manager):
+    return color_ramp_manager.storage_backend == MATERIAL
+
+
+def has_library(color_ramp_manager):
+    """True when categories can be stored: always with node groups, with a horcrux for materials."""
+    return color_ramp_manager.storage_backend == NODE_GROUP or bool(bpy.data.objects.get(color_ramp_manager.selected_horcrux))
+
+
+def has_categories(color_ramp_manager):
+    """True when there may be categories to show, stored here or in the library file."""
+    return has_library(color_ramp_manager) or bool(library_path(color_ramp_manager))
+
+
+def is_linked(category):
+    """True for categories linked from a library file, whose nodes cannot be edited."""
+    return category is not None and category.library is not None
+
+
+def library_path(color_ramp_manager):
+    """Absolute path of the external library file, "" when there is none."""
+    if not color_ramp_manager.library_filepath:
+        return ""
+    return os.path.normpath(bpy.path.abspath(color_ramp_manager.library_filepath))
+
+
+def _data_name(color_ramp_manager):
+    return "node_groups" if color_ramp_manager.storage_backend == NODE_GROUP else "materials"
+
+
+def _in_library(id_data, path):
+    return id_data.library is not None and os.path.normpath(bpy.path.abspath(id_data.library.filepath)) == path
+
+
+def library_category_names(color_ramp_manager):
+    """Names of the categories in the external library file, sorted.
+
+    Only the data-block names are read. The listing is kept until the library
+    path or the backend changes, or refresh_library_listing finds the file
+    changed on disk, so drawing the category enum never touches the disk.
+    With node groups every group in the file is listed, as its category tag
+    cannot be seen without loading it.
+    """
+    if (color_ramp_manager.library_filepath, _data_name(color_ramp_manager)) != _library_listing[0]:
+        refresh_library_listing(color_ramp_manager)
+    return _library_listing[2]
+
+
+def refresh_library_listing(color_ramp_manager):
+    """List the library file's categories again if it is another file or changed on disk."""
+    global _library_listing
+    key = (color_ramp_manager.library_filepath, _data_name(color_ramp_manager))
+    path = library_path(color_ramp_manager)
+    try:
+        mtime = os.path.getmtime(path) if path else None
+    except OSError:
+        mtime = None
+    if (key, mtime) == _library_listing[:2]:
+        return
+    names = []
+    if mtime is not None:
+        try:
+            with bpy.data.libraries.load(path, link=True) as (data_from, _data_to):
+                names = sorted(getattr(data_from, key[1]))
+        except OSError:
+            pass
+    _library_listing = (key, mtime, names)
+
+
+def forget_library_listing():
+    """Drop the library listing, for a file whose relative library path may point elsewhere."""
+    global _library_listing
+    _library_listing = (None, None, [])
+
+
+def link_category(color_ramp_manager, name):
+    """The category of that name, linked from the external library file if it is not loaded yet.
+
+    Links nothing but the one material or node group; returns None when
+    neither the file nor the loaded categories have it. A node group that
+    turns out to have no category tag is unlinked again and dropped from the
+    library listing.
+    """
+    global _library_listing
+    category = get_category(color_ramp_manager, name)
+    if category is not None or name not in library_category_names(color_ramp_manager):
+        return category
+    data_name = _data_name(color_ramp_manager)
+    with bpy.data.libraries.load(library_path(color_ramp_manager), link=True) as (_data_from, data_to):
+        setattr(data_to, data_name, [name])
+    linked = [id_data for id_data in getattr(data_to, data_name) if id_data is not None]
+    if not linked:
+        return None
+    if data_name == "node_groups" and not is_category_group(linked[0]):
+        # The tag can only be seen once the group is linked
+        bpy.data.node_groups.remove(linked[0])
+        key, mtime, names = _library_listing
+        _library_listing = (key, mtime, [other for other in names if other != name])
+        return None
+    return get_category(color_ramp_manager, linked[0].name)
+
+
+def categories(color_ramp_manager):
+    """Category data-blocks of the manager's backend, in display order."""
+    if color_ramp_manager.storage_backend == NODE_GROUP:
+        groups = [group for group in bpy.data.node_groups if is_category_group(group)]
+        # Local groups in the order they were created, like material slots, then the linked ones by name
+        return (
+            sorted((group for group in groups if not is_linked(group)), key=lambda group: (_category_order(group), group.name))
+            + sorted((group for group in groups if is_linked(group)), key=lambda group: group.name)
+        )
+    horcrux_object = bpy.data.objects.get(color_ramp_manager.selected_horcrux)
+    materials = [material for material in horcrux_object.data.materials if material] if horcrux_object else []
+    path = library_path(color_ramp_manager)
+    if path:
+        names = {material.name for material in materials}
+        materials += sorted(
+            (material for material in bpy.data.materials if material.name not in names and _in_library(material, path)),
+            key=lambda material: material.name,
+        )
+    return materials
+
+
+def get_category(color_ramp_manager, name):
+    """The category of that name in the manager's backend, or None."""
+    if not name:
+        return None
+    if color_ramp_manager.storage_backend == NODE_GROUP:
+        node_group = bpy.data.node_groups.get(name)
+        return node_group if node_group and is_category_group(node_group) else None
+    return bpy.data.materials.get(name)
+
+
+def get_category_tree(color_ramp_manager, name):
+    return node_tree(get_category(color_ramp_manager, name))
+
+
+def get_or_create_category(color_ramp_manager, name, horcrux_object=None, backend=None):
+    """Return the category of that name, creating it if needed.
+
+    backend defaults to the manager's. Material categories are added to
+    horcrux_object; node group categories need no horcrux, and get a fake
+    user so saving the file keeps them.
+    """
+    if (backend or color_ramp_manager.storage_backend) == NODE_GROUP:
+        node_group = bpy.data.node_groups.get(name)
+        if node_group is None or not is_category_group(node_group):
+            # A node group of the user's that has the same name gets left alone
+            order = max((_category_order(group) for group in bpy.data.node_groups if is_category_group(group) and not is_linked(group)), default=0)
+            node_group = bpy.data.node_groups.new(name, 'ShaderNodeTree')
+            node_group[CATEGORY_PROPERTY] = order + 1
+            node_group.use_fake_user = True
+        return node_group
+
+    if name not in bpy.data.materials:
+        material = bpy.data.materials.new(name=name)
+    else:
+        material = bpy.data.materials[name]
+    material.use_nodes = True
+
+    if horcrux_object is not None and material.name not in horcrux_object.data.materials:
+        horcrux_object.data.materials.append(material)
+    return material
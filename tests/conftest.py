@@ -0,0 +1,62 @@
+"""Load the add-on against the in-memory bpy stand-in in fakebpy/.
+
+The add-on is imported from this checkout as the gradient2colorramp package,
+so tests import its modules from there. Every test starts from an empty file.
+"""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDON_NAME = "gradient2colorramp"
+
+sys.path.insert(0, os.path.join(REPO_DIR, "fakebpy"))
+
+import bpy  # noqa: E402
+
+
+def load_addon():
+    if ADDON_NAME in sys.modules:
+        return sys.modules[ADDON_NAME]
+    spec = importlib.util.spec_from_file_location(
+        ADDON_NAME, os.path.join(REPO_DIR, "__init__.py"), submodule_search_locations=[REPO_DIR],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_addon = load_addon()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def registered():
+    _addon.register()
+    yield _addon
+    _addon.unregister()
+
+
+@pytest.fixture(autouse=True)
+def empty_file(registered):
+    # load_post clears the add-on's caches, like opening another file in Blender
+    bpy.ops.wm.read_homefile(use_empty=True)
+    yield
+
+
+@pytest.fixture
+def addon():
+    return _addon
+
+
+@pytest.fixture
+def context():
+    return bpy.context
+
+
+@pytest.fixture
+def manager(context):
+    return context.scene.color_ramp_manager
@@ -0,0 +1,100 @@
+import bpy
+import numpy as np
+import pytest
+
+from gradient2colorramp.gradient_core import FalloffCurve, Gradient
+
+
+ITEMS = []
+
+
+class EnumHolder(bpy.types.PropertyGroup):
+    value: bpy.props.EnumProperty(items=lambda self, context: [(name, name, "") for name in ITEMS])
+
+
+@pytest.fixture
+def holder():
+    ITEMS[:] = ["A", "B"]
+    bpy.utils.register_class(EnumHolder)
+    bpy.types.Scene.enum_holder = bpy.props.PointerProperty(type=EnumHolder)
+    yield bpy.context.scene.enum_holder
+    del bpy.types.Scene.enum_holder
+    bpy.utils.unregister_class(EnumHolder)
+
+
+def test_dynamic_enum_keeps_item_number(holder):
+    holder.value = "B"
+    ITEMS.insert(0, "Z")
+    assert holder.value == "A"
+    ITEMS[:] = ["Z"]
+    assert holder.value == ""
+
+
+def test_enum_checks_values(holder):
+    with pytest.raises(TypeError):
+        holder.value = "C"
+
+
+def test_collections_and_attributes():
+    material = bpy.data.materials.new("Skin")
+    assert "Skin" in bpy.data.materials
+    assert bpy.data.materials.new("Skin").name == "Skin.001"
+    with pytest.raises(TypeError):
+        material in bpy.data.materials
+    with pytest.raises(AttributeError):
+        material.bogus = 1
+
+
+def test_color_ramp_round_trip():
+    material = bpy.data.materials.new("Skin")
+    material.use_nodes = True
+    node = material.node_tree.nodes.new('ShaderNodeValToRGB')
+    gradient = Gradient([0.0, 0.3, 1.0], [[1, 0, 0, 1], [0, 1, 0, 0.5], [0, 0, 1, 1]], 'EASE')
+    gradient.to_color_ramp(node.color_ramp)
+    assert len(node.color_ramp.elements) == 3
+    read = Gradient.from_color_ramp(node.color_ramp)
+    np.testing.assert_allclose(read.positions, gradient.positions, atol=1e-7)
+    np.testing.assert_allclose(read.colors, gradient.colors, atol=1e-7)
+    assert read.interpolation == 'EASE'
+
+
+def test_curve_map_round_trip():
+    material = bpy.data.materials.new("Falloff")
+    material.use_nodes = True
+    node = material.node_tree.nodes.new('ShaderNodeRGBCurve')
+    curve = FalloffCurve([[0.0, 1.0], [0.4, 0.8], [1.0, 0.0]], ['AUTO', 'VECTOR', 'AUTO'])
+    curve.to_curve_map(node.mapping.curves[3])
+    node.mapping.update()
+    read = FalloffCurve.from_curve_map(node.mapping.curves[3])
+    np.testing.assert_allclose(read.locations, curve.locations, atol=1e-7)
+    assert read.handle_types == curve.handle_types
+
+
+GGR = """GIMP Gradient
+Name: {name}
+1
+0.0 0.5 1.0 {r} 0.0 0.0 1.0 0.0 0.0 1.0 1.0 0 0
+"""
+
+
+def test_operator_collection_keywords(tmp_path, manager):
+    for name, r in (("Red", 1.0), ("Pink", 0.5)):
+        (tmp_path / f"{name}.ggr").write_text(GGR.format(name=name, r=r))
+    manager.material_name = "Imported"
+    bpy.ops.object.create_horcrux()
+    assert manager.selected_material == "Imported"
+    files = [{"name": "Red.ggr"}, {"name": "Pink.ggr"}]
+    assert bpy.ops.material.import_gradients(directory=str(tmp_path), files=files) == {'FINISHED'}
+    assert [item.name for item in manager.ramp_list] == ["Red", "Pink"]
+
+
+def test_library_write_and_load(tmp_path):
+    path = str(tmp_path / "library.blend")
+    bpy.data.materials.new("Skin")
+    bpy.data.libraries.write(path, {bpy.data.materials["Skin"]}, fake_user=True)
+    bpy.ops.wm.read_homefile(use_empty=True)
+    with bpy.data.libraries.load(path, link=True) as (data_from, data_to):
+        assert list(data_from.materials) == ["Skin"]
+        data_to.materials = ["Skin"]
+    linked = bpy.data.materials["Skin"]
+    assert linked.library is not None and linked.library.filepath == path
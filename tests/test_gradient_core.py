@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from gradient2colorramp.gradient_core import FalloffCurve, Gradient, linear_to_oklab, oklab_to_linear
+
+
+def two_stop(interpolation='LINEAR'):
+    return Gradient([0.25, 0.75], [[0.0, 0.0, 0.0, 1.0], [1.0, 0.5, 0.0, 1.0]], interpolation)
+
+
+def test_evaluate_linear_between_and_outside_stops():
+    colors = two_stop().evaluate([0.0, 0.25, 0.5, 0.75, 1.0])
+    np.testing.assert_allclose(colors[:, 0], [0.0, 0.0, 0.5, 1.0, 1.0])
+    np.testing.assert_allclose(colors[:, 1], [0.0, 0.0, 0.25, 0.5, 0.5])
+
+
+def test_evaluate_constant_holds_left_stop():
+    colors = two_stop('CONSTANT').evaluate([0.5, 0.74, 0.75])
+    np.testing.assert_allclose(colors[:, 0], [0.0, 0.0, 1.0])
+
+
+def test_evaluate_keeps_sample_shape():
+    assert two_stop().evaluate(np.zeros((3, 5))).shape == (3, 5, 4)
+
+
+def test_single_stop_is_flat():
+    gradient = Gradient([0.5], [[0.2, 0.3, 0.4]])
+    np.testing.assert_allclose(gradient.evaluate([0.0, 1.0]), [[0.2, 0.3, 0.4, 1.0]] * 2)
+
+
+def test_rejects_unknown_settings():
+    with pytest.raises(ValueError):
+        Gradient([0.0], [[0.0, 0.0, 0.0, 1.0]], interpolation='SMOOTH')
+    with pytest.raises(ValueError):
+        Gradient([], np.empty((0, 4)))
+
+
+def test_reduce_drops_redundant_stops():
+    x = np.linspace(0.0, 1.0, 100)
+    dense = Gradient(x, np.stack((x, 1.0 - x, np.zeros_like(x), np.ones_like(x)), axis=1))
+    reduced, error = dense.reduce(0.01)
+    assert len(reduced) == 2
+    assert error <= 0.01
+    np.testing.assert_allclose(reduced.evaluate(x), dense.evaluate(x), atol=0.01)
+
+
+def test_reduce_keeps_hard_edges():
+    edge = Gradient([0.0, 0.5, 0.5, 1.0], [[0, 0, 0, 1], [0, 0, 0, 1], [1, 1, 1, 1], [1, 1, 1, 1]])
+    reduced, error = edge.reduce(0.01)
+    assert error <= 0.01
+    np.testing.assert_allclose(reduced.evaluate([0.49, 0.51])[:, 0], [0.0, 1.0], atol=0.01)
+
+
+def test_reduce_respects_max_stops():
+    x = np.linspace(0.0, 1.0, 64)
+    noisy = Gradient(x, np.random.default_rng(0).random((64, 4)))
+    reduced, error = noisy.reduce(0.0, max_stops=8)
+    assert len(reduced) <= 8
+    assert error > 0.0
+
+
+def test_oklab_round_trip():
+    rgb = np.random.default_rng(2).random((16, 3))
+    np.testing.assert_allclose(oklab_to_linear(linear_to_oklab(rgb)), rgb, atol=1e-6)
+
+
+def test_perceptual_keeps_stop_colors():
+    gradient = two_stop()
+    for space in ('OKLAB', 'OKLCH'):
+        dense = gradient.perceptual(space)
+        assert len(dense) > len(gradient)
+        np.testing.assert_allclose(dense.evaluate(gradient.positions), gradient.colors, atol=1e-5)
+
+
+def dense_curve(count=120):
+    x = np.linspace(0.0, 1.0, count)
+    return FalloffCurve(np.stack((x, 1.0 - x * x), axis=1))
+
+
+def test_curve_sorts_points_and_checks_handles():
+    curve = FalloffCurve([[1.0, 0.0], [0.0, 1.0]], ['VECTOR', 'AUTO'])
+    np.testing.assert_allclose(curve.locations[:, 0], [0.0, 1.0])
+    assert curve.handle_types == ['AUTO', 'VECTOR']
+    with pytest.raises(ValueError):
+        FalloffCurve([[0.0, 0.0], [1.0, 1.0]], ['AUTO'])
+    with pytest.raises(ValueError):
+        FalloffCurve([[0.0, 0.0]])
+
+
+def test_curve_evaluate_holds_end_values():
+    curve = dense_curve()
+    np.testing.assert_allclose(curve.evaluate([-1.0, 0.0, 0.5, 1.0, 2.0]), [1.0, 1.0, 0.75, 0.0, 0.0], atol=1e-3)
+
+
+def test_gradient_hash_follows_content():
+    gradient = two_stop()
+    assert gradient.content_hash() == gradient.copy().content_hash()
+    moved = gradient.copy()
+    moved.positions[0] = 0.3
+    assert moved.content_hash() != gradient.content_hash()
+    assert two_stop('EASE').content_hash() != gradient.content_hash()
+
+
+def test_gradient_hash_ignores_hue_interpolation_in_rgb():
+    gradient = two_stop()
+    far = gradient.copy()
+    far.hue_interpolation = 'FAR'
+    assert far.content_hash() == gradient.content_hash()
+    far.color_mode = gradient.color_mode = 'HSV'
+    assert far.content_hash() != gradient.content_hash()
+
+
+def test_curve_hash_follows_content():
+    curve = dense_curve(8)
+    assert curve.content_hash() == curve.copy().content_hash()
+    vector = FalloffCurve(curve.locations, ['VECTOR'] * len(curve))
+    assert vector.content_hash() != curve.content_hash()
+
+
+def test_simplify_stays_within_tolerance():
+    curve = dense_curve()
+    simplified = curve.simplify(0.002)
+    assert len(simplified) < len(curve)
+    x = np.linspace(0.0, 1.0, 256)
+    assert np.abs(simplified.evaluate(x) - curve.evaluate(x)).max() <= 0.002
+
+
+def test_simplify_respects_max_points():
+    assert len(dense_curve().simplify(0.0, max_points=5)) == 5
+
+
+def test_resample_point_counts():
+    curve = dense_curve()
+    for adaptive in (False, True):
+        resampled = curve.resample(9, adaptive=adaptive)
+        assert len(resampled) == 9
+        np.testing.assert_allclose(resampled.locations[[0, -1], 0], [0.0, 1.0])
@@ -0,0 +1,152 @@
+import struct
+
+import numpy as np
+import pytest
+
+from gradient2colorramp import importers
+from gradient2colorramp.gradient_core import srgb_to_linear
+
+
+GGR = """GIMP Gradient
+Name: Sunset
+2
+0.0 0.25 0.5 1.0 0.0 0.0 1.0 1.0 1.0 0.0 1.0 0 0
+0.5 0.75 1.0 1.0 1.0 0.0 1.0 0.0 0.0 1.0 1.0 0 0
+"""
+
+
+def read_one(path):
+    (name, gradient), = list(importers.read_gradients(str(path)))
+    return name, gradient
+
+
+def test_ggr(tmp_path):
+    path = tmp_path / "sunset.ggr"
+    path.write_text(GGR)
+    name, gradient = read_one(path)
+    assert name == "Sunset"
+    np.testing.assert_allclose(gradient.evaluate([0.0, 0.5, 1.0])[:, :3], [[1, 0, 0], [1, 1, 0], [0, 0, 1]], atol=1e-6)
+    np.testing.assert_allclose(gradient.evaluate(0.25)[:3], srgb_to_linear(np.array([1.0, 0.5, 0.0])), atol=1e-6)
+
+
+def test_ggr_errors(tmp_path):
+    path = tmp_path / "bad.ggr"
+    path.write_text("Not a gradient\n")
+    with pytest.raises(importers.GradientFormatError):
+        read_one(path)
+    path.write_text(GGR.rsplit("\n", 2)[0])
+    with pytest.raises(importers.GradientFormatError, match="truncated"):
+        read_one(path)
+
+
+def test_cpt(tmp_path):
+    path = tmp_path / "ramp.cpt"
+    path.write_text("# test\n-10 0 0 0 0 255 255 255\n0 255/255/255 10 255/0/0\nB 0 0 0\nF 255 255 255\nN 128 128 128\n")
+    name, gradient = read_one(path)
+    assert name == "ramp"
+    np.testing.assert_allclose(gradient.positions[[0, -1]], [0.0, 1.0])
+    np.testing.assert_allclose(gradient.evaluate([0.0, 1.0])[:, :3], [[0, 0, 0], [1, 0, 0]], atol=1e-6)
+
+
+def test_cpt_hsv(tmp_path):
+    path = tmp_path / "hue.cpt"
+    path.write_text("# COLOR_MODEL = HSV\n0 0-1-1 1 120-1-1\n")
+    _name, gradient = read_one(path)
+    np.testing.assert_allclose(gradient.evaluate([0.0, 1.0])[:, :3], [[1, 0, 0], [0, 1, 0]], atol=1e-6)
+
+
+def test_cpt_errors(tmp_path):
+    path = tmp_path / "bad.cpt"
+    path.write_text("0 x y z 1 0 0 0\n")
+    with pytest.raises(importers.GradientFormatError):
+        read_one(path)
+    path.write_text("# only comments\n")
+    with pytest.raises(importers.GradientFormatError):
+        read_one(path)
+
+
+# A Photoshop .grd is a tree of action descriptors; these write the parts the reader needs
+
+def unicode(text):
+    text += "\0"
+    return struct.pack(">I", len(text)) + text.encode("utf-16-be")
+
+
+def key(name):
+    return struct.pack(">I", 0) + name.encode("latin-1")
+
+
+def descriptor(items, class_id="null"):
+    data = unicode("") + key(class_id) + struct.pack(">I", len(items))
+    for name, value in items:
+        data += key(name) + value
+    return data
+
+
+def objc(items):
+    return b"Objc" + descriptor(items)
+
+
+def long(value):
+    return b"long" + struct.pack(">i", value)
+
+
+def doub(value):
+    return b"doub" + struct.pack(">d", value)
+
+
+def value_list(values):
+    return b"VlLs" + struct.pack(">I", len(values)) + b"".join(values)
+
+
+def grd_gradient(name, stops):
+    colors = [
+        objc([
+            ("Clr ", objc([("Rd  ", doub(r)), ("Grn ", doub(g)), ("Bl  ", doub(b))])),
+            ("Lctn", long(location)),
+            ("Mdpn", long(50)),
+        ])
+        for location, (r, g, b) in stops
+    ]
+    gradient = objc([
+        ("Nm  ", b"TEXT" + unicode(name)),
+        ("GrdF", b"enum" + key("GrdF") + key("CstS")),
+        ("Clrs", value_list(colors)),
+    ])
+    return objc([("Grad", gradient)])
+
+
+def write_grd(path, gradients, version=5):
+    body = descriptor([("GrdL", value_list(gradients))])
+    path.write_bytes(b"8BGR" + struct.pack(">H", version) + struct.pack(">I", 16) + body)
+
+
+def test_grd(tmp_path):
+    path = tmp_path / "pack.grd"
+    write_grd(path, [
+        grd_gradient("$$$/DefaultGradient/BW=Black, White", [(0, (0, 0, 0)), (4096, (255, 255, 255))]),
+        grd_gradient("", [(0, (255, 0, 0)), (2048, (0, 0, 255))]),
+    ])
+    gradients = list(importers.read_gradients(str(path)))
+    assert [name for name, _gradient in gradients] == ["Black, White", "Gradient 2"]
+    np.testing.assert_allclose(gradients[0][1].evaluate([0.0, 1.0])[:, :3], [[0, 0, 0], [1, 1, 1]], atol=1e-6)
+    np.testing.assert_allclose(gradients[1][1].evaluate([0.0, 0.5])[:, :3], [[1, 0, 0], [0, 0, 1]], atol=1e-6)
+
+
+def test_grd_errors(tmp_path):
+    path = tmp_path / "bad.grd"
+    path.write_bytes(b"8BIM" + bytes(16))
+    with pytest.raises(importers.GradientFormatError):
+        read_one(path)
+    write_grd(path, [], version=3)
+    with pytest.raises(importers.GradientFormatError, match="version 3"):
+        read_one(path)
+    write_grd(path, [grd_gradient("Cut", [(0, (0, 0, 0)), (4096, (255, 255, 255))])])
+    path.write_bytes(path.read_bytes()[:-20])
+    with pytest.raises(importers.GradientFormatError, match="truncated"):
+        read_one(path)
+
+
+def test_unsupported_extension(tmp_path):
+    with pytest.raises(importers.GradientFormatError):
+        importers.read_gradients(str(tmp_path / "ramp.svg"))
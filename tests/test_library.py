@@ -0,0 +1,100 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from gradient2colorramp import library
+from gradient2colorramp.gradient_core import FalloffCurve, Gradient
+
+
+def entries():
+    return [
+        ("Skin", "Warm", Gradient([0.0, 0.4, 1.0], np.random.default_rng(1).random((3, 4)), 'EASE', 'HSV', 'FAR')),
+        ("Skin", "Soft", FalloffCurve([[0.0, 1.0], [0.5, 0.3], [1.0, 0.0]], ['AUTO', 'VECTOR', 'AUTO_CLAMPED'])),
+        ("Sky", "Blue", Gradient([0.5], [[0.1, 0.2, 0.9, 1.0]])),
+    ]
+
+
+@pytest.fixture
+def library_file(tmp_path):
+    path = tmp_path / "test.g2c"
+    assert library.write_library(str(path), entries()) == 3
+    return path
+
+
+def test_round_trip(library_file):
+    with library.LibraryReader(str(library_file)) as reader:
+        assert len(reader) == 3
+        assert reader.categories() == ["Skin", "Sky"]
+        loaded = [(entry["category"], entry["name"], reader.load(entry)) for entry in reader.entries()]
+    for (category, name, item), (read_category, read_name, read_item) in zip(entries(), loaded):
+        assert (read_category, read_name, type(read_item)) == (category, name, type(item))
+    gradient, curve = loaded[0][2], loaded[1][2]
+    np.testing.assert_allclose(gradient.colors, entries()[0][2].colors, atol=1e-7)
+    assert (gradient.interpolation, gradient.color_mode, gradient.hue_interpolation) == ('EASE', 'HSV', 'FAR')
+    assert curve.handle_types == ['AUTO', 'VECTOR', 'AUTO_CLAMPED']
+
+
+def test_entries_filter(library_file):
+    with library.LibraryReader(str(library_file)) as reader:
+        assert [entry["name"] for entry in reader.entries(category="Skin")] == ["Warm", "Soft"]
+        assert [entry["name"] for entry in reader.entries(kind=library.CURVE)] == ["Soft"]
+        assert reader.entries(category="Sky", kind=library.CURVE) == []
+
+
+def test_rejects_unknown_items(tmp_path):
+    with pytest.raises(TypeError):
+        library.write_library(str(tmp_path / "bad.g2c"), [("Skin", "Name", [0.0, 1.0])])
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.g2c"
+    path.write_bytes(b"")
+    with pytest.raises(library.LibraryError):
+        library.LibraryReader(str(path))
+
+
+def test_not_a_library(tmp_path):
+    path = tmp_path / "other.g2c"
+    path.write_bytes(b"PNG\0" + bytes(64))
+    with pytest.raises(library.LibraryError):
+        library.LibraryReader(str(path))
+
+
+def test_truncated_file(library_file):
+    data = library_file.read_bytes()
+    for size in (8, len(data) - 10):
+        library_file.write_bytes(data[:size])
+        with pytest.raises(library.LibraryError):
+            library.LibraryReader(str(library_file))
+
+
+def test_newer_version(library_file):
+    data = bytearray(library_file.read_bytes())
+    struct.pack_into("<I", data, 4, library.VERSION + 1)
+    library_file.write_bytes(bytes(data))
+    with pytest.raises(library.LibraryError, match="newer"):
+        library.LibraryReader(str(library_file))
+
+
+def rewrite_index(path, change):
+    data = path.read_bytes()
+    magic, version, count, offset, size = struct.unpack_from("<4sIIQQ", data)
+    index = change(json.loads(data[offset:offset + size]))
+    index_bytes = json.dumps(index).encode()
+    header = struct.pack("<4sIIQQ", magic, version, count, offset, len(index_bytes))
+    path.write_bytes(header + data[len(header):offset] + index_bytes)
+
+
+def test_damaged_index(library_file):
+    rewrite_index(library_file, lambda index: index[:-1])
+    with pytest.raises(library.LibraryError, match="damaged"):
+        library.LibraryReader(str(library_file))
+
+
+def test_unknown_entry_kind(library_file):
+    rewrite_index(library_file, lambda index: [dict(entry, kind="IMAGE") for entry in index])
+    with library.LibraryReader(str(library_file)) as reader:
+        with pytest.raises(library.LibraryError):
+            reader.load(reader.entries()[0])
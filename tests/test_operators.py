@@ -0,0 +1,154 @@
+import os
+
+import bpy
+import pytest
+
+from gradient2colorramp import registry, storage
+
+
+def add_categories(manager, names, backend=storage.NODE_GROUP):
+    manager.storage_backend = backend
+    if backend == storage.MATERIAL:
+        bpy.ops.object.create_horcrux()
+        manager.selected_horcrux = "horcrux"
+    for name in names:
+        manager.material_name = name
+        manager.curve_material_name = name
+        assert bpy.ops.object.add_material() == {'FINISHED'}
+
+
+def add_ramps(manager, category, count):
+    """Add count distinct ramps to category, returning the names of its rows."""
+    manager.selected_material = category
+    for _ in range(count):
+        assert bpy.ops.material.add_color_ramp() == {'FINISHED'}
+    node_tree = storage.get_category_tree(manager, category)
+    for i, item in enumerate(manager.ramp_list):
+        node_tree.nodes[item.name].color_ramp.elements[0].position = 0.1 * i
+    return [item.name for item in manager.ramp_list]
+
+
+@pytest.fixture
+def brush(context):
+    brush = bpy.data.brushes.new("Brush", mode='TEXTURE_PAINT')
+    context.tool_settings.image_paint.brush = brush
+    return brush
+
+
+def test_locked_row_is_not_active(addon, context, manager, brush):
+    add_categories(manager, ["Skin"])
+    add_ramps(manager, "Skin", 2)
+    manager.ramp_index = 1
+    assert addon.get_active_color_ramp(context).name == manager.ramp_list[1].name
+    manager.ramp_list[1].active = False
+    assert addon.get_active_color_ramp(context) is None
+    assert bpy.ops.object.copy_color_ramp_to_brush() == {'CANCELLED'}
+    manager.ramp_list[1].active = True
+    assert bpy.ops.object.copy_color_ramp_to_brush() == {'FINISHED'}
+
+
+def test_dedupe_keeps_index_in_list(addon, context, manager):
+    add_categories(manager, ["Skin"])
+    add_ramps(manager, "Skin", 3)
+    manager.ramp_index = 0
+    manager.ramp_list[0].selected = True
+    assert bpy.ops.material.duplicate_category_items(kind='RAMP') == {'FINISHED'}
+    manager.ramp_list[3].selected = False
+    manager.ramp_index = 3
+    assert bpy.ops.material.dedupe_gradient_library() == {'FINISHED'}
+    assert len(manager.ramp_list) == 3
+    assert manager.ramp_index == 2
+    assert addon.get_active_color_ramp(context) is not None
+
+
+def test_reconcile_keeps_selected_row(manager):
+    add_categories(manager, ["Skin"])
+    names = add_ramps(manager, "Skin", 4)
+    manager.ramp_index = 2
+    node_tree = storage.get_category_tree(manager, "Skin")
+    node_tree.nodes.remove(node_tree.nodes[names[0]])
+    manager.update_materials(bpy.context)
+    assert manager.ramp_list[manager.ramp_index].name == names[2]
+
+
+def test_remove_keeps_selection_on_its_row(manager):
+    add_categories(manager, ["Skin"])
+    names = add_ramps(manager, "Skin", 4)
+    manager.ramp_index = 2
+    manager.ramp_list[0].selected = True
+    assert bpy.ops.material.remove_color_ramp() == {'FINISHED'}
+    assert [item.name for item in manager.ramp_list] == names[1:]
+    assert manager.ramp_index == 1
+    assert manager.ramp_list[1].active
+
+
+def test_remove_selected_row_unlocks_the_next(addon, context, manager):
+    add_categories(manager, ["Skin"])
+    names = add_ramps(manager, "Skin", 3)
+    manager.ramp_index = 0
+    assert bpy.ops.material.remove_color_ramp() == {'FINISHED'}
+    assert manager.ramp_index == 0
+    assert addon.get_active_color_ramp(context).name == names[1]
+
+
+@pytest.mark.parametrize("backend", [storage.MATERIAL, storage.NODE_GROUP])
+def test_convert_keeps_displayed_categories(manager, backend):
+    add_categories(manager, ["Zeta", "Alpha", "Mid"], backend)
+    if backend == storage.NODE_GROUP:
+        # An empty horcrux to put the materials on
+        manager.material_name = manager.curve_material_name = ""
+        assert bpy.ops.object.create_horcrux() == {'FINISHED'}
+        manager.selected_horcrux = "horcrux"
+    manager.selected_material = "Alpha"
+    manager.selected_curve_material = "Mid"
+    assert bpy.ops.material.convert_category_storage() == {'FINISHED'}
+    assert manager.storage_backend != backend
+    assert [item[0] for item in registry.category_enum_items(manager)] == ["Zeta", "Alpha", "Mid"]
+    assert (manager.selected_material, manager.selected_curve_material) == ("Alpha", "Mid")
+
+
+def test_new_node_group_category_keeps_selection(manager):
+    add_categories(manager, ["Zeta", "Alpha"])
+    manager.selected_material = "Zeta"
+    add_categories(manager, ["Beta"])
+    assert manager.selected_material == "Zeta"
+
+
+def test_library_listing_is_not_read_on_draw(manager, tmp_path, monkeypatch):
+    add_categories(manager, ["Skin", "Sky"])
+    path = str(tmp_path / "library.blend")
+    bpy.data.libraries.write(path, set(storage.categories(manager)), fake_user=True)
+    bpy.ops.wm.read_homefile(use_empty=True)
+    manager = bpy.context.scene.color_ramp_manager
+    manager.storage_backend = storage.NODE_GROUP
+    manager.library_filepath = path
+    assert storage.library_category_names(manager) == ["Skin", "Sky"]
+
+    stats = []
+    getmtime = os.path.getmtime
+    monkeypatch.setattr(os.path, "getmtime", lambda name: stats.append(name) or getmtime(name))
+    for _ in range(10):
+        registry.category_enum_items(manager)
+    assert stats == []
+    assert bpy.ops.material.refresh_gradient_library_file() == {'FINISHED'}
+    assert len(stats) == 1
+
+
+def test_linking_a_plain_node_group_drops_it(manager, tmp_path, caplog):
+    add_categories(manager, ["Skin"])
+    bpy.data.node_groups.new("Plain", 'ShaderNodeTree').use_fake_user = True
+    path = str(tmp_path / "library.blend")
+    bpy.data.libraries.write(path, {bpy.data.node_groups["Skin"], bpy.data.node_groups["Plain"]}, fake_user=True)
+    bpy.ops.wm.read_homefile(use_empty=True)
+    manager = bpy.context.scene.color_ramp_manager
+    manager.storage_backend = storage.NODE_GROUP
+    manager.library_filepath = path
+    assert storage.library_category_names(manager) == ["Plain", "Skin"]
+
+    manager.selected_material = "Plain"
+    assert "Plain" not in bpy.data.node_groups
+    assert "'Plain' in the library file is not a gradient category" in caplog.text
+    assert storage.library_category_names(manager) == ["Skin"]
+    assert [item[0] for item in registry.category_enum_items(manager)] == ["Skin"]
+    manager.selected_material = "Skin"
+    assert storage.is_linked(storage.get_category(manager, "Skin"))
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from gradient2colorramp import quantize
+
+
+def two_color_pixels(opaque_alpha=1.0, dark=300):
+    # Dark red, by default on three quarters of the pixels, and light blue
+    pixels = np.empty((400, 4), dtype=np.float32)
+    pixels[:dark] = [0.3, 0.02, 0.02, opaque_alpha]
+    pixels[dark:] = [0.4, 0.6, 0.9, opaque_alpha]
+    return pixels
+
+
+@pytest.mark.parametrize("method", [quantize.KMEANS, quantize.MEDIAN_CUT])
+def test_extract_colors(method):
+    colors, weights = quantize.extract_colors(two_color_pixels(dark=200), 2, method=method)
+    np.testing.assert_allclose(colors, [[0.3, 0.02, 0.02], [0.4, 0.6, 0.9]], atol=1e-4)
+    np.testing.assert_allclose(weights, [0.5, 0.5])
+
+
+def test_kmeans_weights_follow_coverage():
+    colors, weights = quantize.extract_colors(two_color_pixels(), 2)
+    np.testing.assert_allclose(colors, [[0.3, 0.02, 0.02], [0.4, 0.6, 0.9]], atol=1e-4)
+    np.testing.assert_allclose(weights, [0.75, 0.25])
+
+
+def test_fewer_colors_than_asked():
+    colors, weights = quantize.extract_colors(two_color_pixels(), 8)
+    assert len(colors) == 2
+    assert weights.sum() == pytest.approx(1.0)
+
+
+def test_transparent_pixels_are_left_out():
+    pixels = two_color_pixels()
+    pixels[300:, 3] = 0.0
+    colors, weights = quantize.extract_colors(pixels, 2)
+    np.testing.assert_allclose(colors, [[0.3, 0.02, 0.02]], atol=1e-4)
+    colors, weights = quantize.extract_colors(two_color_pixels(opaque_alpha=0.0), 2)
+    assert colors.shape == (0, 3) and weights.shape == (0,)
+
+
+def test_byte_images_are_converted_to_linear():
+    pixels = np.tile([0.5, 0.5, 0.5, 1.0], (16, 1))
+    colors, _weights = quantize.extract_colors(pixels, 1, is_linear=False)
+    np.testing.assert_allclose(colors, [[0.214041] * 3], atol=1e-4)
+
+
+def test_sample_pixels_caps_the_count():
+    pixels = np.random.default_rng(0).random((5000, 4)).astype(np.float32)
+    pixels[:, 3] = 1.0
+    assert len(quantize.sample_pixels(pixels, max_samples=1000)) == 1000
+    assert len(quantize.sample_pixels(pixels, max_samples=0)) == 5000
+
+
+def test_stop_positions():
+    np.testing.assert_allclose(quantize.stop_positions([0.5, 0.25, 0.25]), [0.0, 0.5, 1.0])
+    np.testing.assert_allclose(quantize.stop_positions([0.5, 0.25, 0.25], by_coverage=True), [0.25, 0.625, 0.875])
+    np.testing.assert_allclose(quantize.stop_positions([1.0]), [0.5])
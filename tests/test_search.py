@@ -0,0 +1,77 @@
+import numpy as np
+
+from gradient2colorramp import search
+
+
+def test_parse_tags():
+    assert search.parse_tags("Skin, warm  skin;Portrait") == ["portrait", "skin", "warm"]
+    assert search.parse_tags("") == []
+
+
+def test_dominant_hues():
+    red = np.tile([0.9, 0.05, 0.05, 1.0], (32, 1))
+    assert search.dominant_hues(red) == ["red"]
+    gray = np.tile([0.5, 0.5, 0.5, 1.0], (32, 1))
+    assert search.dominant_hues(gray) == ["gray"]
+    dark_blue = np.concatenate((np.tile([0.0, 0.0, 0.15, 1.0], (24, 1)), np.tile([0.1, 0.2, 0.9, 1.0], (8, 1))))
+    assert search.dominant_hues(dark_blue) == ["blue", "dark"]
+    assert search.dominant_hues(np.empty((0, 4))) == []
+
+
+def make_index():
+    index = search.SearchIndex()
+    index.set(('RAMP', "Skin", "Warm Sunset"), search.row_tokens(('RAMP', "Skin", "Warm Sunset"), ["portrait"], ["orange"]))
+    index.set(('RAMP', "Sky", "Deep Blue"), search.row_tokens(('RAMP', "Sky", "Deep Blue"), (), ["blue"]))
+    index.set(('CURVE', "Falloff", "Soft Edge"), search.row_tokens(('CURVE', "Falloff", "Soft Edge")))
+    return index
+
+
+def test_query_exact_prefix_and_fuzzy():
+    index = make_index()
+    warm = ('RAMP', "Skin", "Warm Sunset")
+    assert index.query("sunset") == {warm: search.EXACT}
+    assert index.query("sun") == {warm: search.PREFIX}
+    assert index.query("sunsat") == {warm: search.FUZZY}
+    assert index.query("nothing") == {}
+
+
+def test_query_needs_every_word():
+    index = make_index()
+    assert set(index.query("blue sky")) == {('RAMP', "Sky", "Deep Blue")}
+    assert index.query("blue skin") == {}
+
+
+def test_query_by_kind():
+    index = make_index()
+    assert set(index.query("soft")) == {('CURVE', "Falloff", "Soft Edge")}
+    assert index.query("soft", kind='RAMP') == {}
+    assert (index.count('RAMP'), index.count('CURVE')) == (2, 1)
+
+
+def test_remove():
+    index = make_index()
+    index.remove(('RAMP', "Sky", "Deep Blue"))
+    assert index.query("deep") == {}
+    assert index.count('RAMP') == 1
+    assert ('RAMP', "Sky", "Deep Blue") not in index
+
+
+def test_refresh_reads_stale_rows_only():
+    index = search.SearchIndex()
+    key = ('RAMP', "Skin", "Gradient 1")
+    index.add(key)
+    assert set(index.query("gradient")) == {key}
+    described = []
+
+    def describe(stale_key):
+        described.append(stale_key)
+        return ["pastel"], ["pink"]
+
+    index.refresh(describe)
+    assert described == [key]
+    assert set(index.query("pastel")) == {key}
+    index.refresh(describe)
+    assert described == [key]
+    index.mark_category_stale("Skin")
+    index.refresh(describe)
+    assert described == [key, key]
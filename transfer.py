@@ -0,0 +1,123 @@
+"""Bulk copies of gradient stops, curve points and palette colors between RNA collections.
+
+Everything that moves stops between a ColorRamp node, a brush gradient or a
+palette, or points between curve mappings, and every read of image pixels
+goes through these helpers, so a copy costs a few foreach_get and foreach_set
+calls instead of one RNA round-trip per scalar.
+"""
+import numpy as np
+
+
+# Blender refuses to add more elements than this to a ColorRamp
+MAX_RAMP_ELEMENTS = 32
+
+
+def resize_ramp_elements(elements, count):
+    """Grow or shrink a ColorRamp element collection to exactly count items."""
+    current = len(elements)
+    if count > current:
+        for _ in range(count - current):
+            elements.new(0.0)
+    elif count < current:
+        # A ColorRamp always keeps at least one element
+        for _ in range(current - max(count, 1)):
+            elements.remove(elements[-1])
+
+
+def read_ramp(color_ramp):
+    """Return the stops of a ColorRamp as (positions[n], colors[n, 4]) arrays."""
+    elements = color_ramp.elements
+    count = len(elements)
+    positions = np.empty(count, dtype=np.float32)
+    colors = np.empty(count * 4, dtype=np.float32)
+    elements.foreach_get("position", positions)
+    elements.foreach_get("color", colors)
+    return positions, colors.reshape(count, 4)
+
+
+def write_ramp(color_ramp, positions, colors):
+    """Replace the stops of a ColorRamp with the given positions and RGBA colors."""
+    positions = np.ascontiguousarray(positions, dtype=np.float32).ravel()
+    colors = np.ascontiguousarray(colors, dtype=np.float32).reshape(-1, 4)
+    elements = color_ramp.elements
+    resize_ramp_elements(elements, len(positions))
+    elements.foreach_set("position", positions)
+    elements.foreach_set("color", colors.ravel())
+    return color_ramp
+
+
+def read_palette(palette):
+    """Return the colors of a palette as an [n, 3] RGB array."""
+    colors = palette.colors
+    count = len(colors)
+    rgb = np.empty(count * 3, dtype=np.float32)
+    colors.foreach_get("color", rgb)
+    return rgb.reshape(count, 3)
+
+
+def write_palette(palette, colors):
+    """Replace the colors of a palette, dropping alpha if RGBA colors are given."""
+    colors = np.asarray(colors, dtype=np.float32)
+    rgb = np.ascontiguousarray(colors.reshape(len(colors), -1)[:, :3])
+    palette_colors = palette.colors
+    current = len(palette_colors)
+    if len(rgb) > current:
+        for _ in range(len(rgb) - current):
+            palette_colors.new()
+    elif len(rgb) < current:
+        for _ in range(current - len(rgb)):
+            palette_colors.remove(palette_colors[-1])
+    palette_colors.foreach_set("color", rgb.ravel())
+    return palette
+
+
+def read_pixels(image):
+    """Return the pixels of an image as an [n, 4] RGBA array, in one foreach_get."""
+    width, height = image.size
+    channels = image.channels
+    pixels = np.empty(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(-1, channels)
+    if channels == 4:
+        return pixels
+    rgba = np.ones((len(pixels), 4), dtype=np.float32)
+    rgba[:, :3] = pixels[:, :3] if channels >= 3 else pixels[:, :1]
+    return rgba
+
+
+def resize_curve_points(points, count):
+    """Grow or shrink a CurveMap point collection to exactly count items."""
+    current = len(points)
+    if count > current:
+        for _ in range(count - current):
+            points.new(0.0, 0.0)
+    elif count < current:
+        # A CurveMap always keeps at least two points
+        for _ in range(current - max(count, 2)):
+            points.remove(points[-1])
+
+
+def read_curve(curve_map):
+    """Return the points of a CurveMap as a locations[n, 2] array and handle types."""
+    points = curve_map.points
+    count = len(points)
+    locations = np.empty(count * 2, dtype=np.float32)
+    points.foreach_get("location", locations)
+    return locations.reshape(count, 2), [point.handle_type for point in points]
+
+
+def write_curve(curve_map, locations, handle_types=None):
+    """Replace the points of a CurveMap; handle types default to AUTO.
+
+    The owning CurveMapping still needs an update() call afterwards.
+    """
+    locations = np.ascontiguousarray(locations, dtype=np.float32).reshape(-1, 2)
+    points = curve_map.points
+    resize_curve_points(points, len(locations))
+    points.foreach_set("location", locations.ravel())
+    if handle_types is None:
+        handle_types = ['AUTO'] * len(locations)
+    for point, handle_type in zip(points, handle_types):
+        if point.handle_type != handle_type:
+            point.handle_type = handle_type
+    return curve_map